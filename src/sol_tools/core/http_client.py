@@ -0,0 +1,322 @@
+"""
+Shared HTTP client layer for Sol Tools.
+
+Adapters borrow pooled sessions from here instead of opening a new client per
+call, so bulk runs reuse keep-alive connections (and their TLS handshakes)
+to each host. The module owns:
+
+- one aiohttp session and one httpx client per event loop, with DNS caching,
+  per-host connection limits and default timeouts
+- one process-wide ``requests`` session with a sized connection pool
+- a single ``RetryPolicy`` describing which responses to retry and how long
+  to back off between attempts
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Tuple
+
+import aiohttp
+
+# Create module-specific logger
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Configuration constants
+# ---------------------------------------------------------------------------
+class HttpConfig:
+    """Defaults shared by every pooled client."""
+
+    # Timeouts (seconds)
+    TOTAL_TIMEOUT = 30.0
+    CONNECT_TIMEOUT = 10.0
+
+    # Connection pool limits
+    MAX_CONNECTIONS = 100
+    MAX_CONNECTIONS_PER_HOST = 20
+
+    # Keep idle connections around long enough to span gaps between batches
+    KEEPALIVE_TIMEOUT = 30  # seconds
+    DNS_CACHE_TTL = 300  # seconds
+
+    # Retry defaults
+    MAX_RETRIES = 3
+    BACKOFF_MIN = 1.0  # seconds
+    BACKOFF_MAX = 3.0  # seconds
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+# ---------------------------------------------------------------------------
+# Retry policy
+# ---------------------------------------------------------------------------
+class RetryPolicy:
+    """Decides whether a request should be retried and how long to wait first."""
+
+    def __init__(self, max_retries: Optional[int] = None, backoff_min: Optional[float] = None,
+                 backoff_max: Optional[float] = None, retry_statuses: Optional[Iterable[int]] = None,
+                 max_retry_after: float = 60.0):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_retries: Total attempts per request (including the first)
+            backoff_min: Smallest delay before a retry (seconds)
+            backoff_max: Largest jittered delay for the first retry (seconds); later
+                retries scale this up exponentially
+            retry_statuses: HTTP statuses worth retrying
+            max_retry_after: Cap for server-provided Retry-After values (seconds)
+        """
+        self.max_retries = max_retries or HttpConfig.MAX_RETRIES
+        self.backoff_min = HttpConfig.BACKOFF_MIN if backoff_min is None else backoff_min
+        self.backoff_max = HttpConfig.BACKOFF_MAX if backoff_max is None else backoff_max
+        self.retry_statuses = frozenset(retry_statuses or HttpConfig.RETRY_STATUSES)
+        self.max_retry_after = max_retry_after
+
+    def attempts(self) -> range:
+        """Iterate over attempt numbers, starting at 0."""
+        return range(self.max_retries)
+
+    def is_last(self, attempt: int) -> bool:
+        """Whether ``attempt`` is the final attempt allowed."""
+        return attempt >= self.max_retries - 1
+
+    def should_retry(self, attempt: int, status: Optional[int] = None) -> bool:
+        """
+        Whether to try again after ``attempt`` failed.
+
+        Args:
+            attempt: Zero-based attempt number that just failed
+            status: HTTP status of the failure, or None for network errors
+        """
+        if self.is_last(attempt):
+            return False
+        return status is None or status in self.retry_statuses
+
+    def delay(self, attempt: int, retry_after: Optional[Any] = None) -> float:
+        """
+        Seconds to wait before the next attempt.
+
+        A valid Retry-After value from the server wins; otherwise the delay is a
+        random value between backoff_min and backoff_max, doubled per attempt.
+        """
+        if retry_after is not None:
+            try:
+                return min(self.max_retry_after, max(0.0, float(retry_after)))
+            except (TypeError, ValueError):
+                pass
+        jitter = random.uniform(self.backoff_min, self.backoff_max)
+        return jitter * (2 ** max(0, attempt))
+
+    async def wait(self, attempt: int, retry_after: Optional[Any] = None) -> None:
+        """Sleep asynchronously before the next attempt."""
+        await asyncio.sleep(self.delay(attempt, retry_after))
+
+    def wait_sync(self, attempt: int, retry_after: Optional[Any] = None) -> None:
+        """Sleep in the current thread before the next attempt."""
+        time.sleep(self.delay(attempt, retry_after))
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+# ---------------------------------------------------------------------------
+# Client pool
+# ---------------------------------------------------------------------------
+class HttpClientPool:
+    """
+    Owns the shared HTTP sessions.
+
+    Async sessions are bound to an event loop, so one is kept per loop and
+    reference counted: it stays open while any caller is borrowing it and is
+    closed when the last borrower returns it.
+    """
+
+    def __init__(self, max_connections: Optional[int] = None,
+                 max_connections_per_host: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            max_connections: Open connections allowed across all hosts
+            max_connections_per_host: Open connections allowed to a single host
+            timeout: Default total timeout per request (seconds)
+        """
+        self.max_connections = max_connections or HttpConfig.MAX_CONNECTIONS
+        self.max_connections_per_host = max_connections_per_host or HttpConfig.MAX_CONNECTIONS_PER_HOST
+        self.timeout = timeout or HttpConfig.TOTAL_TIMEOUT
+
+        # loop -> [client, borrow count]
+        self._aiohttp: Dict[asyncio.AbstractEventLoop, list] = {}
+        self._httpx: Dict[asyncio.AbstractEventLoop, list] = {}
+
+        self._requests_session = None
+        self._requests_lock = threading.Lock()
+
+        # Stats for logging
+        self.sessions_created = 0
+
+    # -- aiohttp ------------------------------------------------------------
+    def create_connector(self, limit: Optional[int] = None,
+                         limit_per_host: Optional[int] = None) -> aiohttp.TCPConnector:
+        """Create a keep-alive connector with DNS caching and per-host limits."""
+        return aiohttp.TCPConnector(limit=limit or self.max_connections,
+                                    limit_per_host=limit_per_host or self.max_connections_per_host,
+                                    ttl_dns_cache=HttpConfig.DNS_CACHE_TTL,
+                                    keepalive_timeout=HttpConfig.KEEPALIVE_TIMEOUT)
+
+    def create_timeout(self, total: Optional[float] = None) -> aiohttp.ClientTimeout:
+        """Create the default aiohttp timeout."""
+        return aiohttp.ClientTimeout(total=total or self.timeout, connect=HttpConfig.CONNECT_TIMEOUT)
+
+    @contextlib.asynccontextmanager
+    async def aiohttp_session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Borrow the current event loop's shared aiohttp session."""
+        loop = asyncio.get_running_loop()
+        self._forget_closed_loops(self._aiohttp)
+
+        entry = self._aiohttp.get(loop)
+        if entry is None or entry[0].closed:
+            session = aiohttp.ClientSession(connector=self.create_connector(), timeout=self.create_timeout())
+            entry = self._aiohttp[loop] = [session, 0]
+            self.sessions_created += 1
+        entry[1] += 1
+        try:
+            yield entry[0]
+        finally:
+            entry[1] -= 1
+            if entry[1] <= 0 and self._aiohttp.get(loop) is entry:
+                del self._aiohttp[loop]
+                await entry[0].close()
+
+    # -- httpx --------------------------------------------------------------
+    @contextlib.asynccontextmanager
+    async def httpx_client(self) -> AsyncIterator[Any]:
+        """Borrow the current event loop's shared httpx AsyncClient."""
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        self._forget_closed_loops(self._httpx)
+
+        entry = self._httpx.get(loop)
+        if entry is None or entry[0].is_closed:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections_per_host,
+                                  keepalive_expiry=HttpConfig.KEEPALIVE_TIMEOUT)
+            timeout = httpx.Timeout(self.timeout, connect=HttpConfig.CONNECT_TIMEOUT)
+            client = httpx.AsyncClient(limits=limits, timeout=timeout)
+            entry = self._httpx[loop] = [client, 0]
+            self.sessions_created += 1
+        entry[1] += 1
+        try:
+            yield entry[0]
+        finally:
+            entry[1] -= 1
+            if entry[1] <= 0 and self._httpx.get(loop) is entry:
+                del self._httpx[loop]
+                await entry[0].aclose()
+
+    @staticmethod
+    def _forget_closed_loops(clients: Dict[asyncio.AbstractEventLoop, list]) -> None:
+        # Clients left behind by loops that have since been closed can't be reused
+        for loop in [loop for loop in clients if loop.is_closed()]:
+            del clients[loop]
+
+    # -- requests -----------------------------------------------------------
+    def requests_session(self):
+        """Return the process-wide ``requests`` session with a sized connection pool."""
+        with self._requests_lock:
+            if self._requests_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.max_connections_per_host,
+                                      pool_maxsize=self.max_connections_per_host)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._requests_session = session
+                self.sessions_created += 1
+            return self._requests_session
+
+
+_default_pool: Optional[HttpClientPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_http_pool() -> HttpClientPool:
+    """Return the process-wide HTTP client pool."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = HttpClientPool()
+        return _default_pool
+
+
+def shared_aiohttp_session() -> "contextlib.AbstractAsyncContextManager[aiohttp.ClientSession]":
+    """Borrow the shared aiohttp session for the running event loop."""
+    return get_http_pool().aiohttp_session()
+
+
+def shared_httpx_client() -> "contextlib.AbstractAsyncContextManager[Any]":
+    """Borrow the shared httpx AsyncClient for the running event loop."""
+    return get_http_pool().httpx_client()
+
+
+def get_requests_session():
+    """Return the shared ``requests`` session."""
+    return get_http_pool().requests_session()
+
+
+# ---------------------------------------------------------------------------
+# Request helpers
+# ---------------------------------------------------------------------------
+async def get_json(session: aiohttp.ClientSession, url: str, params: Optional[Dict[str, Any]] = None,
+                   headers: Optional[Dict[str, str]] = None,
+                   retry: Optional[RetryPolicy] = None) -> Tuple[Optional[int], Any]:
+    """
+    GET a JSON document, retrying according to ``retry``.
+
+    Args:
+        session: Session to send the request on (usually the shared one)
+        url: URL to request
+        params: Query parameters
+        headers: Extra request headers
+        retry: Retry policy (defaults to DEFAULT_RETRY_POLICY)
+
+    Returns:
+        (status, parsed JSON) for the last attempt; status is None and the
+        body is the error message if no response was received
+    """
+    retry = retry or DEFAULT_RETRY_POLICY
+    status: Optional[int] = None
+    body: Any = None
+
+    for attempt in retry.attempts():
+        retry_after = None
+        try:
+            async with session.get(url, params=params, headers=headers) as response:
+                status = response.status
+                if status == 200:
+                    try:
+                        return status, await response.json(content_type=None)
+                    except (aiohttp.ContentTypeError, ValueError) as e:
+                        body = f"JSON parse error: {e}"
+                        status = None
+                else:
+                    body = (await response.text())[:200]
+                    retry_after = response.headers.get('Retry-After')
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status, body = None, str(e) or type(e).__name__
+
+        if not retry.should_retry(attempt, status):
+            break
+        logger.debug(f"Retrying {url} after {status or body} (attempt {attempt + 1}/{retry.max_retries})")
+        await retry.wait(attempt, retry_after)
+
+    return status, body
@@ -0,0 +1,264 @@
+"""
+Shared, health-scored proxy pool for Sol Tools.
+
+The proxy file (``INPUT_DATA_DIR/proxies/proxies.txt`` by default) is parsed once
+and only re-read when its modification time changes. Every request reports back
+how it went, and the pool keeps per-proxy latency, error and rate-limit (429)
+stats. Proxies are picked at random weighted by health, and a proxy that keeps
+failing is quarantined for a backoff period that doubles each time it happens
+again.
+"""
+
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .config import INPUT_DATA_DIR
+
+# Create module-specific logger
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Configuration constants
+# ---------------------------------------------------------------------------
+class ProxyConfig:
+    """Defaults for the proxy pool."""
+
+    PROXY_FILE = INPUT_DATA_DIR / "proxies" / "proxies.txt"
+
+    # How often to check the proxy file for changes (seconds)
+    RELOAD_CHECK_INTERVAL = 5.0
+
+    # Consecutive failures before a proxy is quarantined
+    FAILURE_THRESHOLD = 3
+
+    # Quarantine backoff (seconds); doubles with each repeat offence
+    QUARANTINE_BASE = 30.0
+    QUARANTINE_MAX = 900.0
+    RATE_LIMIT_QUARANTINE = 10.0
+
+    # Weight of the newest sample in the latency moving average
+    LATENCY_ALPHA = 0.3
+
+
+def parse_proxy_line(line: str) -> Optional[Dict[str, str]]:
+    """
+    Parse one line of the proxy file into a requests-style proxies dict.
+
+    Accepts ``ip:port``, ``ip:port:username:password`` and plain host strings.
+    Blank lines and ``#`` comments yield None.
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    if ':' in line:
+        parts = line.split(':')
+        if len(parts) == 4:  # ip:port:username:password
+            ip, port, username, password = parts
+            url = f"http://{username}:{password}@{ip}:{port}"
+        elif len(parts) == 2:  # ip:port
+            ip, port = parts
+            url = f"http://{ip}:{port}"
+        else:
+            return None
+    else:
+        url = f"http://{line}"
+    return {'http': url, 'https': url}
+
+
+class ProxyHealth:
+    """Running stats for a single proxy."""
+
+    def __init__(self, proxy: Dict[str, str]):
+        self.proxy = proxy
+        self.latency: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.consecutive_failures = 0
+        self.quarantines = 0
+        self.quarantined_until = 0.0
+
+    def is_available(self, now: float) -> bool:
+        """Whether the proxy is outside its quarantine."""
+        return now >= self.quarantined_until
+
+    def weight(self) -> float:
+        """
+        Selection weight: smoothed success rate divided by latency, with 429s
+        counting against the proxy. Untested proxies get a neutral weight so
+        they are tried.
+        """
+        attempts = self.successes + self.failures + self.rate_limited
+        success_rate = (self.successes + 1) / (attempts + 2)
+        latency = self.latency if self.latency is not None else 1.0
+        return success_rate / (0.1 + latency)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Stats snapshot for logging."""
+        return {
+            "latency": self.latency,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rate_limited": self.rate_limited,
+            "quarantined": not self.is_available(time.time()),
+        }
+
+
+class ProxyPool:
+    """Proxies from one file with health tracking and weighted selection."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            path: Proxy file to read (defaults to ProxyConfig.PROXY_FILE)
+        """
+        self.path = Path(path) if path else ProxyConfig.PROXY_FILE
+        self._lock = threading.Lock()
+        self._health: Dict[str, ProxyHealth] = {}
+        self._order: List[str] = []
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+
+        # Stats
+        self.reloads = 0
+
+    # -- loading ------------------------------------------------------------
+    def _refresh(self, force: bool = False) -> None:
+        """Re-read the proxy file if its mtime changed. Caller holds the lock."""
+        now = time.monotonic()
+        if not force and now - self._last_check < ProxyConfig.RELOAD_CHECK_INTERVAL:
+            return
+        self._last_check = now
+
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._mtime and not force:
+            return
+        self._mtime = mtime
+
+        proxies: List[Dict[str, str]] = []
+        if mtime is not None:
+            try:
+                with open(self.path, 'r') as file:
+                    proxies = [proxy for proxy in map(parse_proxy_line, file) if proxy]
+            except OSError as e:
+                logger.error(f"Error loading proxies: {e}")
+
+        # Keep the stats of proxies that are still listed
+        health = {}
+        for proxy in proxies:
+            key = proxy['http']
+            health[key] = self._health.get(key) or ProxyHealth(proxy)
+        self._health = health
+        self._order = list(health)
+        self.reloads += 1
+        logger.debug(f"Loaded {len(self._order)} proxies from {self.path}")
+
+    def proxies(self) -> List[Dict[str, str]]:
+        """All proxies currently listed in the file."""
+        with self._lock:
+            self._refresh()
+            return [self._health[key].proxy for key in self._order]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._order)
+
+    # -- selection ----------------------------------------------------------
+    def acquire(self) -> Optional[Dict[str, str]]:
+        """
+        Pick a proxy, weighted by health.
+
+        Quarantined proxies are skipped; if every proxy is quarantined the one
+        whose quarantine ends first is returned.
+
+        Returns:
+            A proxies dict, or None if the file lists no proxies
+        """
+        with self._lock:
+            self._refresh()
+            if not self._order:
+                return None
+
+            now = time.time()
+            candidates = [self._health[key] for key in self._order if self._health[key].is_available(now)]
+            if not candidates:
+                return min(self._health.values(), key=lambda h: h.quarantined_until).proxy
+
+            chosen = random.choices(candidates, weights=[h.weight() for h in candidates])[0]
+            return chosen.proxy
+
+    # -- feedback -----------------------------------------------------------
+    def report(self, proxy: Optional[Dict[str, str]], ok: bool, latency: Optional[float] = None,
+               status: Optional[int] = None) -> None:
+        """
+        Record the outcome of a request made through ``proxy``.
+
+        Args:
+            proxy: The proxies dict returned by acquire (None is ignored)
+            ok: Whether the request succeeded
+            latency: Request duration in seconds
+            status: HTTP status, if a response was received
+        """
+        if not proxy:
+            return
+        with self._lock:
+            health = self._health.get(proxy.get('http', ''))
+            if health is None:
+                return
+
+            now = time.time()
+            if latency is not None:
+                alpha = ProxyConfig.LATENCY_ALPHA
+                health.latency = latency if health.latency is None else (1 - alpha) * health.latency + alpha * latency
+
+            if ok:
+                health.successes += 1
+                health.consecutive_failures = 0
+                health.quarantines = max(0, health.quarantines - 1)
+                return
+
+            if status == 429:
+                # The proxy works but is being throttled; rest it briefly
+                health.rate_limited += 1
+                health.quarantined_until = now + ProxyConfig.RATE_LIMIT_QUARANTINE
+                return
+
+            health.failures += 1
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= ProxyConfig.FAILURE_THRESHOLD:
+                backoff = min(ProxyConfig.QUARANTINE_MAX, ProxyConfig.QUARANTINE_BASE * 2 ** health.quarantines)
+                health.quarantined_until = now + backoff
+                health.quarantines += 1
+                health.consecutive_failures = 0
+                logger.debug(f"Quarantined proxy for {backoff:.0f}s after repeated failures")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-proxy stats keyed by proxy URL."""
+        with self._lock:
+            return {key: self._health[key].to_dict() for key in self._order}
+
+
+_pools: Dict[Path, ProxyPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_proxy_pool(path: Optional[Union[str, Path]] = None) -> ProxyPool:
+    """Return the process-wide pool for a proxy file (defaults to ProxyConfig.PROXY_FILE)."""
+    path = Path(path) if path else ProxyConfig.PROXY_FILE
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ProxyPool(path)
+        return pool
@@ -0,0 +1,100 @@
+"""
+Shared request-rate budgets for Sol Tools.
+
+APIs such as Etherscan cap calls per second per key, not per coroutine. Sleeping
+a fixed delay before every call wastes that budget when one caller is idle and
+still overshoots it when many callers run at once. A ``RateLimiter`` is a token
+bucket that every caller of an API draws from: callers reserve a slot and wait
+only as long as the bucket needs to refill. It is thread-safe and works from
+any event loop (or none), so the worker threads and per-thread loops used by
+the modules all share one budget.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+# Create module-specific logger
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` calls per second with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Initialize the bucket full.
+
+        Args:
+            rate: Calls allowed per second on average
+            burst: Calls allowed back to back after an idle period (defaults to ``rate``)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst if burst is not None else rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Stats
+        self.calls = 0
+        self.waited = 0.0
+
+    def reserve(self) -> float:
+        """
+        Take one call from the budget.
+
+        Returns:
+            Seconds the caller must wait before making the call
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going negative queues the caller behind everyone already waiting
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.calls += 1
+            self.waited += delay
+            return delay
+
+    def ready_in(self) -> float:
+        """Seconds until a call would go through without waiting (0 if it would now)."""
+        with self._lock:
+            tokens = min(self.burst, self._tokens + (time.monotonic() - self._updated) * self.rate)
+            return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Wait until a call fits the budget."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self) -> None:
+        """Blocking variant of ``acquire`` for threaded callers."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, burst: Optional[int] = None) -> RateLimiter:
+    """
+    Return the process-wide limiter for an API, creating it on first use.
+
+    Args:
+        name: Budget name shared by every caller of the API (e.g. "etherscan")
+        rate: Calls per second, used only when the limiter is created
+        burst: Burst size, used only when the limiter is created
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = RateLimiter(rate, burst)
+        return limiter
@@ -0,0 +1,114 @@
+"""
+Micro-batching of single-item lookups for Sol Tools.
+
+Some APIs answer many items in one call (Etherscan's ``balancemulti`` takes up
+to 20 addresses) while callers naturally ask for one item at a time. A
+``RequestBatcher`` collects the lookups submitted within a short window, sends
+them as one batch call and resolves each caller's future with its own item.
+A batch is sent early as soon as it is full, so busy callers never wait for
+the window to close.
+
+Batchers are tied to the event loop they are first used on, like the pooled
+aiohttp sessions they usually call through.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+# Create module-specific logger
+logger = logging.getLogger(__name__)
+
+BatchFetcher = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class RequestBatcher:
+    """Groups concurrent single-key lookups into calls of up to ``max_batch`` keys."""
+
+    def __init__(self, fetch_batch: BatchFetcher, max_batch: int = 20, window: float = 0.05):
+        """
+        Initialize the batcher.
+
+        Args:
+            fetch_batch: Coroutine function taking a list of unique keys and
+                returning a mapping from key to result
+            max_batch: Most keys sent in one call
+            window: Seconds to wait for more lookups before sending a partial batch
+        """
+        self.fetch_batch = fetch_batch
+        self.max_batch = max(1, max_batch)
+        self.window = window
+
+        self._pending: List[Tuple[Hashable, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Keep running batch calls referenced until they finish
+        self._running: Set[asyncio.Task] = set()
+
+        # Stats
+        self.items = 0
+        self.batches = 0
+
+    async def submit(self, key: Hashable) -> Any:
+        """
+        Look up one key as part of the next batch.
+
+        Raises:
+            KeyError: If the batch result has no entry for the key
+            Exception: Whatever the batch call raised
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((key, future))
+        self.items += 1
+
+        if self._unique_pending() >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _unique_pending(self) -> int:
+        return len({key for key, _ in self._pending})
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            # Take up to max_batch distinct keys (and every future waiting on them)
+            keys: List[Hashable] = []
+            batch: List[Tuple[Hashable, asyncio.Future]] = []
+            rest: List[Tuple[Hashable, asyncio.Future]] = []
+            for key, future in self._pending:
+                if key in keys or len(keys) < self.max_batch:
+                    if key not in keys:
+                        keys.append(key)
+                    batch.append((key, future))
+                else:
+                    rest.append((key, future))
+            self._pending = rest
+            self.batches += 1
+            task = asyncio.ensure_future(self._run(keys, batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            # A partial remainder waits for the next window
+            if self._pending and self._unique_pending() < self.max_batch:
+                self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+                return
+
+    async def _run(self, keys: List[Hashable], batch: List[Tuple[Hashable, asyncio.Future]]) -> None:
+        try:
+            results = await self.fetch_batch(keys)
+        except Exception as e:
+            logger.debug(f"Batch of {len(keys)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch:
+            if future.done():
+                continue
+            if key in results:
+                future.set_result(results[key])
+            else:
+                future.set_exception(KeyError(key))
@@ -0,0 +1,148 @@
+"""
+In-flight request coalescing for Sol Tools.
+
+When several callers ask for the same thing at the same time (overlapping token
+lists, several handlers in one process) only the first one - the leader -
+actually makes the request. Everyone else asking for the same ``(endpoint, key)``
+while it is in flight waits for the leader's result instead of sending a
+duplicate request.
+
+Calls are tracked with ``concurrent.futures.Future`` objects, so threads and
+coroutines (on any event loop) can wait on the same flight.
+"""
+
+import asyncio
+import copy
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+# Create module-specific logger
+logger = logging.getLogger(__name__)
+
+FlightKey = Tuple[str, Hashable]
+
+
+class _Flight:
+    """One in-flight call and the number of callers waiting on it."""
+
+    __slots__ = ("future", "waiters")
+
+    def __init__(self):
+        self.future: Future = Future()
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share an ``(endpoint, key)``."""
+
+    def __init__(self):
+        """Initialize an empty flight table."""
+        self._flights: Dict[FlightKey, _Flight] = {}
+        self._lock = threading.Lock()
+
+        # Stats
+        self.calls = 0
+        self.coalesced = 0
+
+    def _join(self, endpoint: str, key: Hashable) -> Tuple[_Flight, bool]:
+        """Return the flight for a key and whether the caller leads it."""
+        flight_key = (endpoint, key)
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(flight_key)
+            if flight is not None:
+                flight.waiters += 1
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[flight_key] = _Flight()
+            return flight, True
+
+    def _land(self, endpoint: str, key: Hashable, flight: _Flight) -> bool:
+        """Retire a flight so new callers start a fresh one; returns whether anyone waited on it."""
+        with self._lock:
+            if self._flights.get((endpoint, key)) is flight:
+                del self._flights[(endpoint, key)]
+            return flight.waiters > 0
+
+    def _finish(self, endpoint: str, key: Hashable, flight: _Flight, result: Any) -> Any:
+        # Each caller gets its own copy so one can't mutate another's result.
+        # Without waiters the leader can keep the original.
+        shared = self._land(endpoint, key, flight)
+        if not flight.future.done():
+            flight.future.set_result(result)
+        return copy.deepcopy(result) if shared else result
+
+    def _fail(self, endpoint: str, key: Hashable, flight: _Flight, error: BaseException) -> None:
+        self._land(endpoint, key, flight)
+        if flight.future.done():
+            return
+        flight.future.set_exception(error)
+        # Waiters retrieve the exception; don't warn about it going unobserved
+        flight.future.exception()
+
+    def do(self, endpoint: str, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call ``fn(*args, **kwargs)`` unless the same call is already in flight.
+
+        Args:
+            endpoint: Name of the endpoint or operation being called
+            key: What is being looked up (address, wallet, ...)
+            fn: Function making the request
+
+        Returns:
+            The result of ``fn``, shared with every caller that joined the flight
+        """
+        flight, leader = self._join(endpoint, key)
+        if not leader:
+            return copy.deepcopy(flight.future.result())
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._fail(endpoint, key, flight, e)
+            raise
+        return self._finish(endpoint, key, flight, result)
+
+    async def do_async(self, endpoint: str, key: Hashable,
+                       coro_fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await ``coro_fn(*args, **kwargs)`` unless the same call is already in flight.
+
+        Flights are shared with ``do``, so a coroutine can wait on a call that a
+        worker thread is making and the other way round.
+
+        Args:
+            endpoint: Name of the endpoint or operation being called
+            key: What is being looked up (address, wallet, ...)
+            coro_fn: Coroutine function making the request
+
+        Returns:
+            The result of ``coro_fn``, shared with every caller that joined the flight
+        """
+        flight, leader = self._join(endpoint, key)
+        if not leader:
+            # Shielded so a waiter that is cancelled (e.g. by a timeout) only
+            # stops waiting instead of cancelling the flight for everyone else
+            return copy.deepcopy(await asyncio.shield(asyncio.wrap_future(flight.future)))
+
+        try:
+            result = await coro_fn(*args, **kwargs)
+        except BaseException as e:
+            self._fail(endpoint, key, flight, e)
+            raise
+        return self._finish(endpoint, key, flight, result)
+
+    def in_flight(self) -> int:
+        """Number of calls currently in flight."""
+        with self._lock:
+            return len(self._flights)
+
+
+_default_group: SingleFlight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight group."""
+    return _default_group
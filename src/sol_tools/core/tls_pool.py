@@ -0,0 +1,200 @@
+"""
+Warm pool of tls_client sessions for Sol Tools.
+
+Building a ``tls_client.Session`` per call (or per retry) throws its connection
+pool away, so every request paid a full TLS handshake. This pool keeps
+pre-built sessions with rotated browser fingerprints. Callers check one out per
+request and return it afterwards, so its keep-alive connections are reused.
+A session is only retired (and replaced by one with a fresh fingerprint) after
+a failure or once it has served ``max_uses`` requests.
+"""
+
+import contextlib
+import logging
+import random
+import threading
+from typing import Iterator, List, Optional
+
+# Create module-specific logger
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Configuration constants
+# ---------------------------------------------------------------------------
+class TlsPoolConfig:
+    """Defaults for the TLS session pool."""
+
+    # Browser fingerprints to rotate through
+    CLIENT_IDENTIFIERS = (
+        "chrome_103", "chrome_104", "chrome_105", "chrome_106", "chrome_107",
+        "chrome_108", "chrome_109", "chrome_110", "chrome_111", "chrome_112",
+        "firefox_102", "firefox_104", "safari_15_6_1", "opera_89", "opera_90",
+    )
+
+    # Requests a session serves before it is replaced with a new fingerprint
+    MAX_USES = 200
+
+    # Idle sessions kept warm
+    MAX_IDLE = 16
+
+
+# User agents matching each fingerprint family, so headers and TLS agree
+USER_AGENTS = {
+    "chrome": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{version}.0.0.0 Safari/537.36",
+    "opera": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/103.0.0.0 Safari/537.36 OPR/{version}.0.0.0",
+    "firefox": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:{version}.0) Gecko/20100101 Firefox/{version}.0",
+    "safari": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.6.1 Safari/605.1.15",
+}
+
+
+def user_agent_for(identifier: str) -> str:
+    """Return a user agent string that matches a tls_client identifier."""
+    family, _, version = identifier.partition("_")
+    template = USER_AGENTS.get(family, USER_AGENTS["chrome"])
+    version = version.split("_")[0] if version else "103"
+    return template.format(version=version)
+
+
+class PooledSession:
+    """A tls_client session on loan from a TlsSessionPool."""
+
+    def __init__(self, session, identifier: str):
+        self.session = session
+        self.identifier = identifier
+        self.user_agent = user_agent_for(identifier)
+        self.uses = 0
+        self.failed = False
+
+    def get(self, url: str, **kwargs):
+        """Send a GET through the session."""
+        return self.session.get(url, **kwargs)
+
+    def mark_failed(self) -> None:
+        """Retire the session when it is returned, so the next request gets a fresh fingerprint."""
+        self.failed = True
+
+
+class TlsSessionPool:
+    """Keeps warm tls_client sessions and hands them out one request at a time."""
+
+    def __init__(self, identifiers: Optional[List[str]] = None, max_uses: Optional[int] = None,
+                 max_idle: Optional[int] = None):
+        """
+        Initialize the pool. Sessions are created lazily on first checkout.
+
+        Args:
+            identifiers: Browser fingerprints to rotate through
+            max_uses: Requests a session serves before it is replaced
+            max_idle: Idle sessions kept warm between requests
+        """
+        self.identifiers = list(identifiers or TlsPoolConfig.CLIENT_IDENTIFIERS)
+        self.max_uses = max_uses or TlsPoolConfig.MAX_USES
+        self.max_idle = max_idle or TlsPoolConfig.MAX_IDLE
+
+        self._idle: List[PooledSession] = []
+        self._lock = threading.Lock()
+        self._next_identifier = random.randrange(len(self.identifiers))
+
+        # Stats
+        self.created = 0
+        self.reused = 0
+        self.retired = 0
+
+    def _create(self) -> PooledSession:
+        import tls_client
+
+        with self._lock:
+            identifier = self.identifiers[self._next_identifier % len(self.identifiers)]
+            self._next_identifier += 1
+            self.created += 1
+        session = tls_client.Session(client_identifier=identifier,  # type: ignore
+                                     random_tls_extension_order=True)
+        return PooledSession(session, identifier)
+
+    def checkout(self) -> PooledSession:
+        """
+        Take a session out of the pool, creating one if none are idle.
+
+        Raises:
+            ImportError: If tls_client is not installed
+        """
+        with self._lock:
+            if self._idle:
+                # Most recently used first; its connections are the likeliest to still be open
+                pooled = self._idle.pop()
+                self.reused += 1
+                return pooled
+        return self._create()
+
+    def checkin(self, pooled: PooledSession) -> None:
+        """Return a session to the pool, retiring it if it failed or is used up."""
+        pooled.uses += 1
+        # Don't leak one caller's proxy to the next
+        pooled.session.proxies = {}
+        with self._lock:
+            if not pooled.failed and pooled.uses < self.max_uses and len(self._idle) < self.max_idle:
+                self._idle.append(pooled)
+                return
+            self.retired += 1
+        _close(pooled)
+
+    @contextlib.contextmanager
+    def session(self) -> Iterator[PooledSession]:
+        """Check a session out for one request; exceptions mark it failed."""
+        pooled = self.checkout()
+        try:
+            yield pooled
+        except BaseException:
+            pooled.mark_failed()
+            raise
+        finally:
+            self.checkin(pooled)
+
+    def get(self, url: str, **kwargs):
+        """
+        Send one GET on a pooled session.
+
+        Lets the pool stand in for a ``tls_client.Session``. Errors and
+        non-404 error statuses retire the session that served them.
+        """
+        with self.session() as pooled:
+            response = pooled.get(url, **kwargs)
+            if response.status_code >= 400 and response.status_code != 404:
+                pooled.mark_failed()
+            return response
+
+    def close(self) -> None:
+        """Close every idle session."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            _close(pooled)
+
+    def idle_count(self) -> int:
+        """Number of warm sessions waiting to be checked out."""
+        with self._lock:
+            return len(self._idle)
+
+
+def _close(pooled: PooledSession) -> None:
+    # Older tls_client releases have no close()
+    close = getattr(pooled.session, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception as e:
+            logger.debug(f"Error closing TLS session: {e}")
+
+
+_default_pool: Optional[TlsSessionPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_tls_pool() -> TlsSessionPool:
+    """Return the process-wide TLS session pool."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = TlsSessionPool()
+        return _default_pool
@@ -0,0 +1,281 @@
+"""
+Token metadata cache for Sol Tools.
+
+Token lookups are keyed by chain and address. Each entry remembers when it was
+fetched, so static fields (name, symbol, decimals, supply) can be served for far
+longer than market fields (price, market cap, volume). The cache is an LRU with
+both an entry and a size bound, survives restarts through a JSON file under
+``CACHE_DIR/token_metadata`` and counts hits and misses.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .config import CACHE_DIR
+
+# Create module-specific logger
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Configuration constants
+# ---------------------------------------------------------------------------
+class TokenCacheConfig:
+    """Defaults for token metadata caches."""
+
+    # How long each kind of field stays fresh (seconds)
+    STATIC_TTL = 7 * 24 * 3600
+    MARKET_TTL = 120
+
+    # Memory bounds
+    MAX_ENTRIES = 20000
+    MAX_BYTES = 32 * 1024 * 1024
+
+    # Write the cache file at most this often while it is being updated (seconds)
+    FLUSH_INTERVAL = 30
+
+
+# Fields that don't change once a token exists, in both the normalized and raw
+# GeckoTerminal shapes. Everything else is treated as market data.
+STATIC_FIELDS = frozenset({
+    "id", "type", "name", "symbol", "address", "decimals", "network",
+    "total_supply", "totalSupply", "supply", "image_url", "coingecko_coin_id",
+})
+
+
+def static_view(value: Any) -> Any:
+    """Project a cached token value onto its static fields (recursing into ``attributes``)."""
+    if not isinstance(value, dict):
+        return value
+    view = {key: item for key, item in value.items() if key in STATIC_FIELDS}
+    if isinstance(value.get("attributes"), dict):
+        view["attributes"] = static_view(value["attributes"])
+    return view
+
+
+class TokenMetadataCache:
+    """TTL + LRU cache of token metadata keyed by chain and address."""
+
+    def __init__(self, name: str, root: Optional[Path] = None,
+                 static_ttl: Optional[float] = None, market_ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 persist: bool = True):
+        """
+        Initialize the cache and load any persisted entries.
+
+        Args:
+            name: Cache name; also the file name of the persisted cache
+            root: Directory for the cache file (defaults to CACHE_DIR/token_metadata)
+            static_ttl: Seconds static fields stay fresh
+            market_ttl: Seconds market fields stay fresh
+            max_entries: Most entries kept in memory
+            max_bytes: Approximate most bytes of serialized values kept in memory
+            persist: Whether to read and write the cache file
+        """
+        self.name = name
+        self.static_ttl = TokenCacheConfig.STATIC_TTL if static_ttl is None else static_ttl
+        self.market_ttl = TokenCacheConfig.MARKET_TTL if market_ttl is None else market_ttl
+        self.max_entries = max_entries or TokenCacheConfig.MAX_ENTRIES
+        self.max_bytes = max_bytes or TokenCacheConfig.MAX_BYTES
+        self.path = (Path(root) if root else CACHE_DIR / "token_metadata") / f"{name}.json" if persist else None
+
+        # key -> (value, fetched_at, size)
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_flush = time.time()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load()
+
+    @staticmethod
+    def make_key(chain: str, address: str) -> str:
+        """Build the cache key; EVM addresses are case-insensitive, Solana ones are not."""
+        chain = (chain or "unknown").lower()
+        if address.startswith("0x"):
+            address = address.lower()
+        return f"{chain}:{address}"
+
+    # -- lookups ------------------------------------------------------------
+    def get(self, chain: str, address: str, include_market: bool = True) -> Optional[Any]:
+        """
+        Look up a token.
+
+        Args:
+            chain: Chain/network name (e.g. 'solana', 'ethereum')
+            address: Token address
+            include_market: Require market fields to be fresh too; when False only
+                the static fields are returned and the longer static TTL applies
+
+        Returns:
+            The cached value (or its static fields), or None on a miss
+        """
+        key = self.make_key(chain, address)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fetched_at, _ = entry
+                age = time.time() - fetched_at
+                ttl = self.market_ttl if include_market else self.static_ttl
+                if age <= ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copy(value) if include_market else static_view(value)
+                if age > self.static_ttl:
+                    # Nothing in the entry is usable any more
+                    self._remove(key)
+                    self._dirty = True
+            self.misses += 1
+            return None
+
+    def put(self, chain: str, address: str, value: Any, fetched_at: Optional[float] = None) -> None:
+        """Store a freshly fetched token value. Error responses are not cached."""
+        if not value or (isinstance(value, dict) and "error" in value):
+            return
+        key = self.make_key(chain, address)
+        try:
+            size = len(json.dumps(value, default=str))
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Not caching unserializable token data for {key}: {e}")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (_copy(value), fetched_at or time.time(), size)
+            self._bytes += size
+            self._dirty = True
+            self._evict()
+        self._maybe_flush()
+
+    def invalidate(self, chain: str, address: str) -> None:
+        """Drop one token from the cache."""
+        with self._lock:
+            if self._remove(self.make_key(chain, address)):
+                self._dirty = True
+
+    def clear(self) -> None:
+        """Drop every entry and reset the stats."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+            self._dirty = True
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -- internals ----------------------------------------------------------
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    # -- persistence --------------------------------------------------------
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable token cache {self.path}: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            # Entries are stored least recently used first
+            for key, value, fetched_at in data.get("entries", []):
+                if now - fetched_at <= self.static_ttl:
+                    size = len(json.dumps(value, default=str))
+                    self._entries[key] = (value, fetched_at, size)
+                    self._bytes += size
+            self._evict()
+
+    def _maybe_flush(self) -> None:
+        if self.path is not None and time.time() - self._last_flush >= TokenCacheConfig.FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the cache file if anything changed since the last write."""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = [[key, value, fetched_at] for key, (value, fetched_at, _) in self._entries.items()]
+            self._dirty = False
+            self._last_flush = time.time()
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".json.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({"entries": entries}, f, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write token cache {self.path}: {e}")
+
+
+def _copy(value: Any) -> Any:
+    # Callers routinely add fields (fetch_time, ...) to the dicts they get back
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+_caches: Dict[str, TokenMetadataCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_token_cache(name: str) -> TokenMetadataCache:
+    """Return the process-wide token cache called ``name``, loading it from disk on first use."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = TokenMetadataCache(name)
+        return cache
+
+
+@atexit.register
+def flush_token_caches() -> None:
+    """Persist every open token cache."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.flush()
@@ -14,9 +14,13 @@ from concurrent.futures import ThreadPoolExecutor
 
 # Import BaseAdapter
 from ...core.base_adapter import BaseAdapter, ConfigError, OperationError, ResourceNotFoundError
+from ...core.http_client import get_requests_session
+from ...core.proxy_pool import get_proxy_pool
+from ...core.single_flight import get_single_flight
+from ...core.tls_pool import PooledSession, get_tls_pool, user_agent_for
+from ...core.token_cache import get_token_cache
 
 # Import necessary libraries
-import tls_client
 import httpx
 try:
     # Import the UserAgent class directly
@@ -60,6 +64,10 @@ from ...core.config import CACHE_DIR
 LOGS_DIR = CACHE_DIR / "logs" / "dragon"
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Raw GeckoTerminal token payloads returned by GMGN_Client.getTokenInfo are cached
+# under their own name, since they are shaped differently from the normalized data
+RAW_TOKEN_CACHE_NAME = "geckoterminal_raw"
+
 # Import Dragon modules
 from typing import TYPE_CHECKING
 
@@ -214,123 +222,53 @@ class GMGN_Client:
     def __init__(self, use_proxies: bool = False):
         """Initialize GMGN client with browser fingerprinting evasion."""
         self.use_proxies = use_proxies
-        self.proxy_position = 0
         self.max_retries = 5
         self.timeout_sec = 10.0
-        self.randomize_session()
-    
-    def randomize_session(self):
-        """Create a new TLS session with randomized browser fingerprint."""
-        try:
-            # Use a list of identifiers directly instead of accessing tls_client.settings
-            identifier_options = [
-                "chrome103", "chrome104", "chrome105", "chrome106", 
-                "safari15_3", "safari15_5", "firefox102", "firefox104", 
-                "opera89", "opera90"
-            ]
-            
-            # Select random browser
-            self.identifier = random.choice(identifier_options)
-            self.session = tls_client.Session(
-                random_tls_extension_order=True,
-                client_identifier=self.identifier  # type: ignore
-            )
-            
-            # Use a fixed user agent to avoid errors with fake_useragent
-            self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/103.0.0.0 Safari/537.36"
-            
-        except Exception:
-            # Create a dummy session if tls_client fails
-            self.identifier = "chrome_103"
-            self.session = None
-            self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/103.0.0.0 Safari/537.36"
         
-        # Set headers to mimic browser
-        self.headers = {
+        # Warm TLS sessions with rotated fingerprints are checked out per request
+        self.tls_pool = get_tls_pool()
+        self.user_agent = user_agent_for("chrome_103")
+        self.headers = self._build_headers(self.user_agent)
+    
+    def _build_headers(self, user_agent: str) -> Dict[str, str]:
+        """Headers that mimic a browser with the given user agent."""
+        return {
             'Host': 'gmgn.ai',
             'accept': 'application/json, text/plain, */*',
             'accept-language': 'en-US,en;q=0.9',
             'dnt': '1',
             'priority': 'u=1, i',
             'referer': 'https://gmgn.ai/?chain=sol',
-            'user-agent': self.user_agent,
+            'user-agent': user_agent,
         }
     
-    def load_proxies(self) -> List[Dict[str, str]]:
-        """Load proxies from the proxies.txt file."""
-        from ...core.config import INPUT_DATA_DIR
-        proxies_file = INPUT_DATA_DIR / "proxies" / "proxies.txt"
-        
-        if not proxies_file.exists():
-            return []
-        
+    def _checkout_session(self) -> Optional[PooledSession]:
+        """Borrow a warm TLS session, or None if tls_client can't create one."""
         try:
-            with open(proxies_file, 'r') as file:
-                proxy_lines = file.read().splitlines()
-            
-            formatted_proxies = []
-            for proxy in proxy_lines:
-                if not proxy or proxy.startswith('#'):
-                    continue
-                    
-                if ':' in proxy:  
-                    parts = proxy.split(':')
-                    if len(parts) == 4:  # ip:port:username:password
-                        ip, port, username, password = parts
-                        formatted_proxies.append({
-                            'http': f"http://{username}:{password}@{ip}:{port}",
-                            'https': f"http://{username}:{password}@{ip}:{port}"
-                        })
-                    elif len(parts) == 2:  # ip:port
-                        ip, port = parts
-                        formatted_proxies.append({
-                            'http': f"http://{ip}:{port}",
-                            'https': f"http://{ip}:{port}"
-                        })
-                else:
-                    formatted_proxies.append({
-                        'http': f"http://{proxy}",
-                        'https': f"http://{proxy}"
-                    })
-                    
-            return formatted_proxies
+            return self.tls_pool.checkout()
         except Exception as e:
-            logger.error(f"Error loading proxies: {e}")
-            return []
+            logger.warning(f"Failed to create TLS session: {e}")
+            return None
+    
+    def load_proxies(self) -> List[Dict[str, str]]:
+        """Return the proxies listed in proxies.txt (parsed once, reloaded when the file changes)."""
+        return get_proxy_pool().proxies()
     
     def get_next_proxy(self) -> Optional[Dict[str, str]]:
-        """Get the next proxy from the rotation."""
-        proxies = self.load_proxies()
-        if not proxies:
-            return None
-            
-        proxy = proxies[self.proxy_position % len(proxies)]
-        self.proxy_position += 1
-        return proxy
+        """Pick a proxy from the shared pool, favouring healthy ones."""
+        return get_proxy_pool().acquire()
     
-    def configure_proxy(self):
-        """Configure session with the next proxy if enabled."""
-        if not self.use_proxies or self.session is None:
-            if hasattr(self, 'session') and self.session is not None:
-                self.session.proxies = {}
-            return
-            
-        proxy = self.get_next_proxy()
-        if not proxy or self.session is None:
-            if hasattr(self, 'session') and self.session is not None:
-                self.session.proxies = {}
-            return
-            
-        if isinstance(proxy, dict):
-            self.session.proxies = {
-                'http': proxy.get('http', ''),
-                'https': proxy.get('https', '')
-            }
-        elif isinstance(proxy, str):
-            self.session.proxies = {
-                'http': proxy,
-                'https': proxy
-            }
+    def report_proxy(self, proxy: Optional[Dict[str, str]], ok: bool, latency: Optional[float] = None,
+                     status: Optional[int] = None) -> None:
+        """Tell the proxy pool how a request through ``proxy`` went."""
+        if self.use_proxies:
+            get_proxy_pool().report(proxy, ok, latency, status)
+    
+    def configure_proxy(self, session) -> Optional[Dict[str, str]]:
+        """Route a session through the next proxy if enabled, returning the proxy used."""
+        proxy = self.get_next_proxy() if self.use_proxies else None
+        session.proxies = proxy or {}
+        return proxy
     
     def getTokenInfo(self, contract_addr: str) -> Dict[str, Any]:
         """Get token information from GMGN."""
@@ -350,14 +288,17 @@ class GMGN_Client:
             for attempt in range(self.max_retries):
                 logger.debug(f"Attempt {attempt+1}/{self.max_retries} to get token info for {contract_addr}")
                 
+                pooled = self._checkout_session()
                 try:
-                    # Use httpx for requests with timeout if tls_client fails
-                    if self.session:
+                    # Use the pooled requests session with timeout if tls_client fails
+                    if pooled is not None:
                         # Don't pass timeout parameter to session.get
-                        response = self.session.get(url)
+                        response = pooled.get(url)
+                        if response.status_code not in (200, 404):
+                            pooled.mark_failed()
                     else:
-                        # Fall back to httpx with timeout
-                        response = httpx.get(url, timeout=5)
+                        # Fall back to the pooled requests session with timeout
+                        response = get_requests_session().get(url, timeout=5)
                     
                     if response and response.status_code == 200:
                         data = response.json().get("data", {}) or {}
@@ -374,13 +315,18 @@ class GMGN_Client:
                 except Exception as req_error:
                     logger.warning(f"Request error on attempt {attempt+1}: {req_error}")
                     response = None
+                    if pooled is not None:
+                        pooled.mark_failed()
+                finally:
+                    # A failed session is retired, so the retry gets a fresh fingerprint
+                    if pooled is not None:
+                        self.tls_pool.checkin(pooled)
                     
                 # If we get here, the request failed
                 error_msg = f"Status: {response.status_code}" if response else "No response"
                 logger.warning(f"Failed to get token info: {error_msg} (attempt {attempt+1}/{self.max_retries})")
                 
                 time.sleep(random.uniform(1.0, 2.0))  # Backoff on failure
-                self.randomize_session()  # Try with new session
                 
             # If we've exhausted all retries
             if response and response.status_code == 404:
@@ -430,23 +376,32 @@ class GMGN_Client:
         if not url:
             return []
         
-        # Refresh session and proxy
-        self.randomize_session()
-        self.configure_proxy()
-        
         max_attempts = 3
         tokens = []
         
         for attempt in range(max_attempts):
+            pooled = self._checkout_session()
+            if pooled is None:
+                logger.warning("Session is None, cannot make request")
+                time.sleep(random.uniform(1, 2))
+                continue
+            
+            # Pick a proxy for every attempt so a failing one isn't retried
+            proxy = self.configure_proxy(pooled.session)
+            started = time.monotonic()
+            response = None
             try:
-                response = None
-                if self.session is not None:
-                    response = self.session.get(url, headers=self.headers)
-                else:
-                    logger.warning("Session is None, cannot make request")
-                    time.sleep(random.uniform(1, 2))
-                    continue
+                try:
+                    response = pooled.get(url, headers=self._build_headers(pooled.user_agent))
+                    if response.status_code != 200:
+                        pooled.mark_failed()
+                except Exception:
+                    pooled.mark_failed()
+                    raise
+                finally:
+                    self.tls_pool.checkin(pooled)
                 
+                self.report_proxy(proxy, response.status_code == 200, time.monotonic() - started, response.status_code)
                 if response.status_code != 200:
                     logger.warning(f"Error {response.status_code} fetching {token_type} tokens, attempt {attempt+1}/{max_attempts}")
                     time.sleep(random.uniform(1, 2))
@@ -492,6 +447,8 @@ class GMGN_Client:
                 return tokens
                 
             except Exception as e:
+                if response is None:
+                    self.report_proxy(proxy, False, time.monotonic() - started)
                 logger.error(f"Error fetching {token_type} tokens, attempt {attempt+1}/{max_attempts}: {e}")
                 time.sleep(random.uniform(1, 3))
         
@@ -522,13 +479,30 @@ class TokenDataHandler:
         self.gmgn = GMGN_Client(use_proxies=use_proxies)
         self.max_retries = 5
         self.timeout_sec = 30.0
+        self.token_cache = get_token_cache(RAW_TOKEN_CACHE_NAME)
         self.logger = logging.getLogger(__name__)
     
-    def _get_token_info_sync(self, address: str) -> Dict[str, Any]:
-        """Get token info with retries and timeout."""
+    def _get_token_info_sync(self, address: str, include_market: bool = True) -> Dict[str, Any]:
+        """Get token info, sharing the request with any concurrent lookup of the same token."""
+        return get_single_flight().do("gmgn_token_info", (address, include_market),
+                                      self._fetch_token_info_sync, address, include_market)
+    
+    def _fetch_token_info_sync(self, address: str, include_market: bool = True) -> Dict[str, Any]:
+        """
+        Get token info with retries and timeout, serving fresh results from the token cache.
+        
+        With ``include_market`` off only the static fields (name, symbol, decimals,
+        supply) have to be fresh, so a cached token is served for the static TTL.
+        """
         if not hasattr(self, 'gmgn') or self.gmgn is None:
             self.logger.error("GMGN client not initialized in TokenDataHandler")
             return {"error": "GMGN client not initialized properly"}
+        
+        network = "solana" if len(address) in [43, 44] else "ethereum"
+        cached = self.token_cache.get(network, address, include_market=include_market)
+        if cached is not None:
+            self.logger.debug(f"Token data for {address} served from cache")
+            return cached
             
         start_time = time.time()
         fail_count = 0
@@ -583,6 +557,7 @@ class TokenDataHandler:
                 
                 # Success
                 self.logger.info(f"Successfully fetched token data for {address}")
+                self.token_cache.put(network, address, token_data)
                 return token_data
                 
             except Exception as e:
@@ -597,14 +572,45 @@ class TokenDataHandler:
         save_dragon_log("gmgn", address, error_response)
         return error_response
     
-    async def get_token_data(self, address: str) -> Dict[str, Any]:
+    async def get_token_data(self, address: str, include_market: bool = True) -> Dict[str, Any]:
         """Get token data asynchronously."""
         loop = asyncio.get_running_loop()
         start_time = time.time()
-        result = await loop.run_in_executor(_gmgn_threadpool, self._get_token_info_sync, address)
+        # Concurrent lookups of the same token (from any thread or loop) share one request
+        result = await get_single_flight().do_async(
+            "gmgn_token_info", (address, include_market),
+            loop.run_in_executor, _gmgn_threadpool, self._fetch_token_info_sync, address, include_market)
         result["fetch_time"] = time.time() - start_time
         save_dragon_log("gmgn", address, result)
         return result
+    
+    async def get_token_data_batch(self, addresses: List[str],
+                                   include_market: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Get token data for many addresses with batched GeckoTerminal lookups.
+        
+        Addresses are grouped by network and fetched through the multi-token
+        endpoint, so a watchlist costs one request per network and batch instead
+        of one per address.
+        
+        Args:
+            addresses: Token addresses to look up
+            include_market: Whether price and market fields are needed
+            
+        Returns:
+            Dictionary mapping each address to its normalized token data
+            (name, symbol, priceUsd, marketCap, ...) or error information
+        """
+        from ..gmgn.standalone_token_data import fetch_multiple_tokens_async
+        
+        start_time = time.time()
+        results = await fetch_multiple_tokens_async(addresses, use_proxies=self.gmgn.use_proxies,
+                                                    include_market=include_market)
+        fetch_time = time.time() - start_time
+        for address, result in results.items():
+            result["fetch_time"] = fetch_time
+            save_dragon_log("gmgn", address, result, result.get("error"))
+        return results
 
 
 # Helper to safely check and create directories
@@ -836,26 +842,28 @@ class DragonAdapter(BaseAdapter):
         return len(address) == 40 and all(c in "0123456789abcdefABCDEF" for c in address)
     
     # GMGN Implementation
-    async def get_token_info(self, contract_address: str) -> Dict[str, Any]:
+    async def get_token_info(self, contract_address: str, include_market: bool = True) -> Dict[str, Any]:
         """
         Get token information for a contract address.
         
         Args:
             contract_address: Contract address to get information for
+            include_market: Whether price and market fields are needed
             
         Returns:
             Token information
         """
         if self.get_token_data_handler() is None:
             return {}
-        return await self.get_token_data_handler().get_token_data(contract_address)  # type: ignore
+        return await self.get_token_data_handler().get_token_data(contract_address, include_market)  # type: ignore
     
-    def get_token_info_sync(self, contract_address: str) -> Dict[str, Any]:
+    def get_token_info_sync(self, contract_address: str, include_market: bool = True) -> Dict[str, Any]:
         """
         Synchronous version of get_token_info.
         
         Args:
             contract_address: Contract address to get information for
+            include_market: Whether price and market fields are needed
             
         Returns:
             Token information
@@ -868,7 +876,7 @@ class DragonAdapter(BaseAdapter):
             # Check if we have a method to get token info
             token_data_handler = self.get_token_data_handler()
             if token_data_handler is not None and hasattr(token_data_handler, '_get_token_info_sync'):
-                return token_data_handler._get_token_info_sync(contract_address)
+                return token_data_handler._get_token_info_sync(contract_address, include_market)
             else:
                 self.logger.error("No _get_token_info_sync method available")
                 return {}
@@ -876,6 +884,33 @@ class DragonAdapter(BaseAdapter):
             self.logger.error(f"Error getting token info for {contract_address}: {e}")
             return {}
     
+    def get_token_info_batch_sync(self, contract_addresses: List[str],
+                                  include_market: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Get token information for many contract addresses in batched requests.
+        
+        Args:
+            contract_addresses: Contract addresses to get information for
+            include_market: Whether price and market fields are needed
+            
+        Returns:
+            Dictionary mapping each address to its token information
+        """
+        token_data_handler = self.get_token_data_handler()
+        if token_data_handler is None:
+            self.logger.warning("Token data handler is not initialized")
+            return {}
+        
+        # Run the batch in its own event loop, like the other sync wrappers
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(token_data_handler.get_token_data_batch(contract_addresses, include_market))
+        except Exception as e:
+            self.logger.error(f"Error getting token info for {len(contract_addresses)} tokens: {e}")
+            return {}
+        finally:
+            loop.close()
+    
     def get_new_tokens(self) -> List[Dict[str, Any]]:
         """Get new token listings."""
         if self.gmgn_client is None:
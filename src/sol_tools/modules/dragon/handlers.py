@@ -1126,10 +1126,12 @@ def gmgn_token_data():
             success_count = 0
             error_count = 0
             
-            # Fetch data for each token
+            # Fetch all tokens in batched multi-token requests
+            print(f"  ⏳ Fetching data for {token_count} tokens...")
+            batch_results = adapter.get_token_info_batch_sync(contract_addresses)
+            
             for token_address in contract_addresses:
-                print(f"  ⏳ Fetching data for {token_address}...")
-                token_info = adapter.get_token_info_sync(token_address)
+                token_info = batch_results.get(token_address)
                 
                 if token_info and "error" not in token_info:
                     all_results[token_address] = token_info
@@ -0,0 +1,189 @@
+"""
+Local timestamp-to-block index for the Ethereum modules.
+
+Turning a time into a block used to cost an Etherscan round trip (plus retries)
+for every window boundary. A ``BlockTimeIndex`` keeps a sorted array of known
+(block, timestamp) samples in ``CACHE_DIR/ethereum/block_times.npz``. A lookup
+binary-searches the samples around the timestamp; when those are neighbouring
+blocks the answer is known without any call. Otherwise the block is estimated
+by interpolating between them (blocks arrive at a near-constant rate), the
+timestamp of that one block is fetched, and the new sample narrows the bracket.
+Every fetched sample is kept, so later lookups near earlier ones resolve locally.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Tuple
+
+import numpy as np
+
+from ...core.config import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Where the samples are kept
+BLOCK_INDEX_PATH = CACHE_DIR / "ethereum" / "block_times.npz"
+
+# Most blocks fetched for one lookup before giving up on the index
+MAX_PROBES = 24
+
+# A (block, timestamp) pair
+BlockSample = Tuple[int, int]
+
+# Fetches the timestamp of a block (None for the latest block): -> (block, timestamp) or None
+BlockProbe = Callable[[Optional[int]], Awaitable[Optional[BlockSample]]]
+
+
+class BlockTimeIndex:
+    """Sorted (block, timestamp) samples with local and probed lookups."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: File the samples are loaded from and saved to (None keeps them in memory)
+        """
+        self.path = Path(path) if path else None
+        self.blocks = np.empty(0, dtype=np.int64)
+        self.timestamps = np.empty(0, dtype=np.int64)
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        # Stats
+        self.local_hits = 0
+        self.probes = 0
+
+        if self.path is not None and self.path.exists():
+            try:
+                with np.load(self.path) as data:
+                    self.blocks, self.timestamps = data["blocks"], data["timestamps"]
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable block index {self.path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def add(self, block: int, timestamp: int) -> None:
+        """Record a block's timestamp."""
+        with self._lock:
+            i = int(np.searchsorted(self.blocks, block))
+            if i < len(self.blocks) and self.blocks[i] == block:
+                return
+            self.blocks = np.insert(self.blocks, i, block)
+            self.timestamps = np.insert(self.timestamps, i, timestamp)
+            self._dirty = True
+
+    def bracket(self, timestamp: int) -> Tuple[Optional[BlockSample], Optional[BlockSample]]:
+        """
+        Return the samples around a timestamp.
+
+        Returns:
+            (latest sample at or before ``timestamp``, earliest sample after it);
+            either is None when no such sample is known
+        """
+        with self._lock:
+            i = int(np.searchsorted(self.timestamps, timestamp, side='right'))
+            lower = (int(self.blocks[i - 1]), int(self.timestamps[i - 1])) if i > 0 else None
+            upper = (int(self.blocks[i]), int(self.timestamps[i])) if i < len(self.blocks) else None
+            return lower, upper
+
+    def lookup(self, timestamp: int, closest: str = "before") -> Optional[int]:
+        """
+        Answer from the samples alone.
+
+        Args:
+            timestamp: UNIX timestamp
+            closest: "before" for the last block at or before the timestamp,
+                     "after" for the first block at or after it
+
+        Returns:
+            The block, or None if the samples do not pin it down
+        """
+        lower, upper = self.bracket(timestamp)
+        if lower is not None and lower[1] == timestamp:
+            return lower[0]
+        if lower is None or upper is None or upper[0] - lower[0] > 1:
+            return None
+        return lower[0] if closest == "before" else upper[0]
+
+    async def resolve(self, timestamp: int, closest: str, probe: BlockProbe,
+                      max_probes: int = MAX_PROBES) -> Optional[int]:
+        """
+        Find the block for a timestamp, fetching block timestamps only as needed.
+
+        Probes go to the block interpolated between the bracketing samples. After
+        two probes in a row that fail to halve the bracket the next one bisects
+        it, so badly spaced blocks cannot make the search crawl.
+
+        Returns:
+            The block, or None if it could not be found within ``max_probes``
+        """
+        previous_width = None
+        slow_probes = 0
+        for probes in range(max_probes + 1):
+            answer = self.lookup(timestamp, closest)
+            if answer is not None:
+                if not probes:
+                    self.local_hits += 1
+                return answer
+            if probes == max_probes:
+                break
+
+            lower, upper = self.bracket(timestamp)
+            if lower is None:
+                block = 0
+            elif upper is None:
+                block = None
+            else:
+                width = upper[0] - lower[0]
+                # An accurate probe lands next to the answer without shrinking the far side,
+                # so only a second probe in a row that fails to halve the bracket means trouble
+                slow_probes = slow_probes + 1 if previous_width is not None and width * 2 > previous_width else 0
+                if slow_probes >= 2:
+                    block = lower[0] + width // 2
+                    slow_probes = 0
+                else:
+                    fraction = (timestamp - lower[1]) / (upper[1] - lower[1])
+                    block = lower[0] + int(round(fraction * width))
+                block = min(max(block, lower[0] + 1), upper[0] - 1)
+                previous_width = width
+
+            self.probes += 1
+            sample = await probe(block)
+            if sample is None:
+                return None
+            self.add(*sample)
+
+            if block is None and sample[1] < timestamp:
+                # Past the chain head: the head is the last block before it, nothing is after it yet
+                return sample[0] if closest == "before" else None
+            if block == 0 and sample[1] > timestamp:
+                return None
+        return None
+
+    def save(self) -> None:
+        """Write the samples if any were added since the last save."""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.stem + ".tmp.npz")
+            np.savez(tmp_path, blocks=self.blocks, timestamps=self.timestamps)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+_default_index: Optional[BlockTimeIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_block_index() -> BlockTimeIndex:
+    """Return the process-wide block index stored in CACHE_DIR/ethereum."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = BlockTimeIndex(BLOCK_INDEX_PATH)
+        return _default_index
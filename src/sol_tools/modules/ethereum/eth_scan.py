@@ -4,23 +4,22 @@ This module can be imported directly without dependencies on other modules.
 """
 
 import random
-import tls_client
 import cloudscraper
 from fake_useragent import UserAgent
-import concurrent.futures
 import time
 import os
 import sys
 from pathlib import Path
-import json
 from typing import List, Union
 
+from ...core.tls_pool import get_tls_pool
+from .trade_crawler import CrawlCheckpoint, TradeStreamWriter, crawl_trade_pages
+
 ua = UserAgent(os='linux', browsers=['firefox'])
 
 class Config:
     """Configuration for Ethereum API calls."""
     # API settings
-    ETH_API_KEY = os.environ.get("ETHEREUM_API_KEY", "")
     ETH_ENDPOINT = "https://api.etherscan.io/api"
     
     # Request settings
@@ -96,7 +95,7 @@ class EthScanAllTx:
         self.addresses = addresses or []
         self.output_dir = Path(output_dir) if output_dir else Config.get_output_dir()
         self.test_mode = test_mode
-        self.scanner = EthScan()
+        self.scanner = EthScan(output_dir=output_dir)
     
     def run(self) -> bool:
         """Run the transaction scanner and save results."""
@@ -115,8 +114,10 @@ class EthScanAllTx:
         return True
 
 class EthScan:
-    def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
+    def __init__(self, output_dir=None):
+        self.output_dir = Path(output_dir) if output_dir else None
+        # Warm TLS sessions shared across threads; each request checks one out
+        self.sendRequest = get_tls_pool()
         self.cloudScraper = cloudscraper.create_scraper()
         self.shorten = lambda s: f"{s[:4]}...{s[-5:]}" if len(s) >= 9 else s
 
@@ -128,12 +129,13 @@ class EthScan:
                 return response
             except Exception:
                 print(f"[🐲] Error fetching data, trying backup...")
-            finally:
-                try:
-                    response = self.cloudScraper.get(url, headers=headers).json()
-                    return response
-                except Exception:
-                    print(f"[🐲] Backup scraper failed, retrying...")
+            
+            # Only fall back to the scraper when the TLS session failed
+            try:
+                response = self.cloudScraper.get(url, headers=headers).json()
+                return response
+            except Exception:
+                print(f"[🐲] Backup scraper failed, retrying...")
             
             time.sleep(1)
         
@@ -141,58 +143,72 @@ class EthScan:
         return {}
 
     def scanAllTx(self, contractAddress, threads=10):
-        base_url = f"https://gmgn.ai/defi/quotation/v1/trades/eth/{contractAddress}?limit=100"
-        paginator = None
-        urls = []
-        all_trades = []
-
+        """
+        Crawl every GMGN trade of a contract, streaming makers and trades to disk.
+        
+        Each page is fetched once, with the next page in flight while the current
+        one is written. The cursor is checkpointed after every page, so running
+        the scan again after an interruption resumes it. ``threads`` is kept for
+        compatibility; cursor pages can only be fetched one after another.
+        """
         headers = {
             "User-Agent": ua.random
         }
         
-        print(f"[🐲] Starting... please wait.")
-
-        while True:
-            url = f"{base_url}&cursor={paginator}" if paginator else base_url
-            urls.append(url)
-            
-            response = self.fetch_url(url, headers)
-            trades = response.get('data', {}).get('history', [])
-            
-            if not trades:
-                break
-
-            paginator = response['data'].get('next')
-            if not paginator:
-                break
+        # Use our project's data structure
+        output_dir = self.output_dir or Path(os.getcwd()) / "data" / "output-data" / "ethereum" / "scan-txns"
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
-            future_to_url = {executor.submit(self.fetch_url, url, headers): url for url in urls}
-            for future in concurrent.futures.as_completed(future_to_url):
-                response = future.result()
-                trades = response.get('data', {}).get('history', [])
-                all_trades.extend(trades)
-
-        wallets = []
+        checkpoint = CrawlCheckpoint.for_contract("scan", contractAddress)
+        state = checkpoint.load()
         
-        # Use our project's data structure
-        output_dir = Path(os.getcwd()) / "data" / "output-data" / "ethereum" / "scan-txns"
-        output_dir.mkdir(parents=True, exist_ok=True)
+        # Only a scan that was writing to this run's output directory is resumed
+        if (state and state.get("output_dir") == str(output_dir)
+                and Path(state["wallets_file"]).exists() and Path(state["trades_file"]).exists()):
+            filename = Path(state["wallets_file"])
+            json_filename = Path(state["trades_file"])
+            cursor = state.get("cursor")
+            print(f"[🐲] Resuming scan after {state['offsets']['count']} trades.")
+        else:
+            state = None
+            cursor = None
+            output_dir.mkdir(parents=True, exist_ok=True)
+            
+            filename = output_dir / f"txns_{self.shorten(contractAddress)}__{random.randint(1111, 9999)}.txt"
+            json_filename = output_dir / f"txns_{self.shorten(contractAddress)}__{random.randint(1111, 9999)}.json"
+            print(f"[🐲] Starting... please wait.")
         
-        filename = output_dir / f"txns_{self.shorten(contractAddress)}__{random.randint(1111, 9999)}.txt"
-        json_filename = output_dir / f"txns_{self.shorten(contractAddress)}__{random.randint(1111, 9999)}.json"
-
-        for trade in all_trades:
-            wallets.append(trade.get("maker"))
-
-        with open(filename, 'a') as f:
-            for wallet in wallets:
-                f.write(f"{wallet}\n")
-                
-        with open(json_filename, 'w') as f:
-            json.dump(all_trades, f, indent=2)
+        writer = TradeStreamWriter(filename, json_filename, resume_from=state["offsets"] if state else None)
+        complete = False
+        # Whether a checkpoint for these files exists to resume from
+        resumable = state is not None
+        try:
+            for page in crawl_trade_pages(lambda url: self.fetch_url(url, headers), contractAddress, cursor):
+                if page.failed:
+                    break
+                writer.write_trades(page.trades)
+                if not page.next_cursor:
+                    complete = True
+                    break
+                checkpoint.save({
+                    "contract": contractAddress,
+                    "output_dir": str(output_dir),
+                    "cursor": page.next_cursor,
+                    "wallets_file": str(filename),
+                    "trades_file": str(json_filename),
+                    "offsets": writer.offsets(),
+                })
+                resumable = True
+        finally:
+            writer.close()
+        
+        if complete:
+            checkpoint.clear()
+        elif resumable:
+            print(f"[🐲] Scan interrupted; run it again to resume from the last page.")
+        else:
+            print(f"[🐲] Scan failed before the first page was saved.")
         
-        print(f"[🐲] {len(wallets)} trades successfully saved to {filename}")
+        print(f"[🐲] {writer.trades_written} trades successfully saved to {filename}")
         print(f"[🐲] Full trade data saved to {json_filename}")
         return True
 
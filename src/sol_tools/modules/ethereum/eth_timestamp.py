@@ -19,10 +19,16 @@ from typing import Dict, List, Any, Optional, Union, Tuple
 
 import aiohttp
 import httpx
-import tls_client
+import numpy as np
 import cloudscraper
 from fake_useragent import UserAgent
-import concurrent.futures
+
+from ...core.http_client import shared_aiohttp_session
+from ...core.tls_pool import get_tls_pool
+from .block_index import get_block_index
+from .etherscan_keys import RETRY_POLICY, get_etherscan_keys
+from .trade_crawler import TradeStreamWriter, crawl_trade_pages, get_trade_page_cache
+from .wallet_history import HISTORY_PAGE_SIZE, LATEST_BLOCK, get_wallet_history_store, refresh_history
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -71,7 +77,6 @@ ua = UserAgent(os='linux', browsers=['firefox'])
 class Config:
     """Configuration for Ethereum API calls."""
     # API settings
-    ETH_API_KEY = os.environ.get("ETHEREUM_API_KEY", "")
     ETH_ENDPOINT = "https://api.etherscan.io/api"
     
     # Request settings
@@ -83,8 +88,8 @@ class Config:
     # Thread settings
     DEFAULT_THREADS = 10
     
-    # Rate limiting
-    RATE_LIMIT_DELAY = 0.2  # seconds between API calls
+    # Addresses whose history is fetched at the same time
+    MAX_CONCURRENT_ADDRESSES = 8
     
     # Data directories
     @staticmethod
@@ -125,6 +130,8 @@ class Config:
         directory.mkdir(parents=True, exist_ok=True)
         return directory
 
+ETHERSCAN_KEYS = get_etherscan_keys()
+
 # Show progress bar
 def show_progress_bar(iteration, total, prefix='', suffix='', length=30, fill='█'):
     """Display a progress bar in the console."""
@@ -153,63 +160,143 @@ def is_valid_eth_address(address: str) -> bool:
         return False
 
 async def get_block_by_timestamp(session: aiohttp.ClientSession, timestamp: int, closest: str = "before") -> Dict[str, Any]:
-    """Get the block number closest to a specific timestamp."""
+    """
+    Get the block number closest to a specific timestamp.
+    
+    The local block index answers directly when it already holds the blocks
+    around the timestamp; otherwise it fetches a few interpolated block
+    timestamps to close in on the answer. Etherscan's own lookup is the
+    fallback if that fails.
+    """
+    index = get_block_index()
+    
+    async def probe(block: Optional[int]) -> Optional[Tuple[int, int]]:
+        return await fetch_block_sample(session, block)
+    
+    block_number = await index.resolve(int(timestamp), closest, probe)
+    try:
+        index.save()
+    except OSError as e:
+        logger.warning(f"Could not save the block index: {e}")
+    
+    if block_number is None:
+        return await fetch_block_by_timestamp(session, timestamp, closest)
+    return {
+        "status": "success",
+        "block_number": block_number,
+        "timestamp": timestamp
+    }
+
+async def fetch_block_sample(session: aiohttp.ClientSession, block: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """
+    Get a block's timestamp through Etherscan's RPC proxy.
+    
+    Args:
+        block: Block number (None for the latest block)
+        
+    Returns:
+        (block number, timestamp), or None if the block could not be fetched
+    """
+    params = {
+        'module': 'proxy',
+        'action': 'eth_getBlockByNumber',
+        'tag': 'latest' if block is None else hex(block),
+        'boolean': 'false',
+    }
+    
+    for retry in range(Config.MAX_RETRIES):
+        try:
+            timeout = aiohttp.ClientTimeout(total=Config.REQUEST_TIMEOUT)
+            
+            response, data = await ETHERSCAN_KEYS.get(session, Config.ETH_ENDPOINT, params, timeout)
+            
+            if response.status != 200:
+                logger.error(f"HTTP {response.status} getting block {params['tag']}")
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return None
+            
+            # Proxy answers are JSON-RPC: the block, null if it does not exist, or an error string
+            result = data.get("result")
+            if not isinstance(result, dict):
+                logger.error(f"No block {params['tag']}: {result}")
+                if retry < Config.MAX_RETRIES - 1 and isinstance(result, str):
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return None
+            
+            return int(result["number"], 16), int(result["timestamp"], 16)
+            
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout getting block {params['tag']}")
+            if retry < Config.MAX_RETRIES - 1:
+                await RETRY_POLICY.wait(retry)
+                continue
+            return None
+            
+        except Exception as e:
+            logger.error(f"Error getting block {params['tag']}: {str(e)}")
+            if retry < Config.MAX_RETRIES - 1:
+                await RETRY_POLICY.wait(retry)
+                continue
+            return None
+    
+    return None
+
+async def fetch_block_by_timestamp(session: aiohttp.ClientSession, timestamp: int, closest: str = "before") -> Dict[str, Any]:
+    """Ask Etherscan for the block number closest to a specific timestamp."""
     params = {
         'module': 'block',
         'action': 'getblocknobytime',
         'timestamp': str(timestamp),
         'closest': closest,  # 'before' or 'after'
-        'apikey': Config.ETH_API_KEY
     }
     
     url = Config.ETH_ENDPOINT
     
     for retry in range(Config.MAX_RETRIES):
         try:
-            # Add delay for rate limiting
-            await asyncio.sleep(Config.RATE_LIMIT_DELAY)
-            
             # Use the proper timeout object
             timeout = aiohttp.ClientTimeout(total=Config.REQUEST_TIMEOUT)
             
-            async with session.get(url, params=params, timeout=timeout) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"HTTP {response.status}: {error_text[:200]}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        await asyncio.sleep(Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random())
-                        continue
-                    return {"status": "error", "error": f"HTTP {response.status}"}
-                
-                data = await response.json()
-                
-                if data.get("status") != "1":
-                    error_msg = data.get("message", "Unknown error")
-                    logger.error(f"API error getting block by timestamp: {error_msg}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        await asyncio.sleep(Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random())
-                        continue
-                    return {"status": "error", "error": error_msg}
-                
-                # The result is the block number
-                block_number = int(data.get("result", "0"))
-                return {
-                    "status": "success",
-                    "block_number": block_number,
-                    "timestamp": timestamp
-                }
-                
+            response, data = await ETHERSCAN_KEYS.get(session, url, params, timeout)
+            
+            if response.status != 200:
+                error_text = await response.text()
+                logger.error(f"HTTP {response.status}: {error_text[:200]}")
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return {"status": "error", "error": f"HTTP {response.status}"}
+            
+            if data.get("status") != "1":
+                error_msg = data.get("message", "Unknown error")
+                logger.error(f"API error getting block by timestamp: {error_msg}")
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return {"status": "error", "error": error_msg}
+            
+            # The result is the block number
+            block_number = int(data.get("result", "0"))
+            return {
+                "status": "success",
+                "block_number": block_number,
+                "timestamp": timestamp
+            }
+            
         except asyncio.TimeoutError:
             logger.error("Timeout getting block by timestamp")
             if retry < Config.MAX_RETRIES - 1:
-                await asyncio.sleep(Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random())
+                await RETRY_POLICY.wait(retry)
                 continue
             return {"status": "error", "error": "Timeout"}
             
         except Exception as e:
             logger.error(f"Error getting block by timestamp: {str(e)}")
             if retry < Config.MAX_RETRIES - 1:
-                await asyncio.sleep(Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random())
+                await RETRY_POLICY.wait(retry)
                 continue
             return {"status": "error", "error": str(e)}
     
@@ -226,171 +313,187 @@ async def get_transactions_by_address(session: aiohttp.ClientSession,
         'address': address,
         'startblock': str(start_block),
         'endblock': str(end_block),
-        'sort': 'asc',
-        'apikey': Config.ETH_API_KEY
+        'sort': 'asc'
     }
     
     url = Config.ETH_ENDPOINT
     
     for retry in range(Config.MAX_RETRIES):
         try:
-            # Add delay for rate limiting
-            await asyncio.sleep(Config.RATE_LIMIT_DELAY)
-            
             # Use the proper timeout object
             timeout = aiohttp.ClientTimeout(total=Config.REQUEST_TIMEOUT)
             
-            async with session.get(url, params=params, timeout=timeout) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"HTTP {response.status}: {error_text[:200]}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        await asyncio.sleep(Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random())
-                        continue
-                    return {"status": "error", "address": address, "error": f"HTTP {response.status}"}
-                
-                data = await response.json()
-                
-                if data.get("status") != "1":
-                    error_msg = data.get("message", "Unknown error")
-                    
-                    # If no transactions found, this is actually OK
-                    if "No transactions found" in error_msg:
-                        return {
-                            "status": "success",
-                            "address": address,
-                            "transactions": []
-                        }
-                    
-                    logger.error(f"API error for {address}: {error_msg}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        await asyncio.sleep(Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random())
-                        continue
-                    return {"status": "error", "address": address, "error": error_msg}
-                
-                # Process transactions
-                transactions = data.get("result", [])
+            response, data = await ETHERSCAN_KEYS.get(session, url, params, timeout)
+            
+            if response.status != 200:
+                error_text = await response.text()
+                logger.error(f"HTTP {response.status}: {error_text[:200]}")
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return {"status": "error", "address": address, "error": f"HTTP {response.status}"}
+            
+            if data.get("status") != "1":
+                error_msg = data.get("message", "Unknown error")
                 
-                return {
-                    "status": "success",
-                    "address": address,
-                    "transactions": transactions
-                }
+                # If no transactions found, this is actually OK
+                if "No transactions found" in error_msg:
+                    return {
+                        "status": "success",
+                        "address": address,
+                        "transactions": []
+                    }
                 
+                logger.error(f"API error for {address}: {error_msg}")
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return {"status": "error", "address": address, "error": error_msg}
+            
+            # Process transactions
+            transactions = data.get("result", [])
+            
+            return {
+                "status": "success",
+                "address": address,
+                "transactions": transactions
+            }
+            
         except asyncio.TimeoutError:
             logger.error(f"Timeout getting transactions for {address}")
             if retry < Config.MAX_RETRIES - 1:
-                await asyncio.sleep(Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random())
+                await RETRY_POLICY.wait(retry)
                 continue
             return {"status": "error", "address": address, "error": "Timeout"}
             
         except Exception as e:
             logger.error(f"Error getting transactions for {address}: {str(e)}")
             if retry < Config.MAX_RETRIES - 1:
-                await asyncio.sleep(Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random())
+                await RETRY_POLICY.wait(retry)
                 continue
             return {"status": "error", "address": address, "error": str(e)}
     
     return {"status": "error", "address": address, "error": "Max retries exceeded"}
 
-async def get_transaction_history(session: aiohttp.ClientSession, address: str) -> Dict[str, Any]:
-    """Get entire transaction history for an address."""
+async def fetch_txlist(session: aiohttp.ClientSession, address: str, start_block: int = 0,
+                       end_block: int = LATEST_BLOCK, sort: str = 'asc',
+                       offset: int = HISTORY_PAGE_SIZE) -> Dict[str, Any]:
+    """Get one page of an address's transactions between two blocks."""
     params = {
         'module': 'account',
         'action': 'txlist',
         'address': address,
-        'sort': 'desc',  # Latest first
-        'apikey': Config.ETH_API_KEY
+        'startblock': str(start_block),
+        'endblock': str(end_block),
+        'page': '1',
+        'offset': str(offset),
+        'sort': sort,
     }
     
     url = Config.ETH_ENDPOINT
     
     for retry in range(Config.MAX_RETRIES):
         try:
-            # Add delay for rate limiting
-            await asyncio.sleep(Config.RATE_LIMIT_DELAY)
-            
             # Use the proper timeout object
             timeout = aiohttp.ClientTimeout(total=Config.REQUEST_TIMEOUT)
             
-            async with session.get(url, params=params, timeout=timeout) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"HTTP {response.status}: {error_text[:200]}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        # Use random delay within range for better retry behavior
-                        delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                        await asyncio.sleep(delay)
-                        continue
-                    return {"status": "error", "error": f"HTTP {response.status}"}
-                
-                data = await response.json()
-                
-                if data.get("status") != "1":
-                    error_msg = data.get("message", "Unknown error")
-                    
-                    # If no transactions found, this is actually OK
-                    if "No transactions found" in error_msg:
-                        return {
-                            "status": "success",
-                            "result": []
-                        }
-                    
-                    logger.error(f"API error for {address}: {error_msg}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        # Use random delay within range for better retry behavior
-                        delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                        await asyncio.sleep(delay)
-                        continue
-                    return {"status": "error", "error": error_msg}
-                
-                # Process transactions
-                transactions = data.get("result", [])
+            response, data = await ETHERSCAN_KEYS.get(session, url, params, timeout)
+            
+            if response.status != 200:
+                error_text = await response.text()
+                logger.error(f"HTTP {response.status}: {error_text[:200]}")
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return {"status": "error", "error": f"HTTP {response.status}"}
+            
+            if data.get("status") != "1":
+                error_msg = data.get("message", "Unknown error")
                 
-                return {
-                    "status": "success",
-                    "result": transactions
-                }
+                # If no transactions found, this is actually OK
+                if "No transactions found" in error_msg:
+                    return {
+                        "status": "success",
+                        "result": []
+                    }
                 
+                logger.error(f"API error for {address}: {error_msg}")
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return {"status": "error", "error": error_msg}
+            
+            # Process transactions
+            transactions = data.get("result", [])
+            
+            return {
+                "status": "success",
+                "result": transactions
+            }
+            
         except asyncio.TimeoutError:
             logger.error(f"Timeout getting history for {address}")
             if retry < Config.MAX_RETRIES - 1:
-                # Use random delay within range for better retry behavior
-                delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                await asyncio.sleep(delay)
+                await RETRY_POLICY.wait(retry)
                 continue
             return {"status": "error", "error": "Timeout"}
             
         except Exception as e:
             logger.error(f"Error getting history for {address}: {str(e)}")
             if retry < Config.MAX_RETRIES - 1:
-                # Use random delay within range for better retry behavior
-                delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                await asyncio.sleep(delay)
+                await RETRY_POLICY.wait(retry)
                 continue
             return {"status": "error", "error": str(e)}
     
     return {"status": "error", "error": "Max retries exceeded"}
 
+async def get_transaction_history(session: aiohttp.ClientSession, address: str,
+                                  start_time: Optional[datetime] = None,
+                                  end_time: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Get an address's transaction history, newest first.
+    
+    The history is kept in the wallet cache, so only blocks after the last one
+    seen are requested. With ``start_time``/``end_time`` only the transactions
+    inside that window (inclusive) are returned.
+    """
+    store = get_wallet_history_store()
+    history = store.load(address)
+    
+    async def fetch(low: int, high: int) -> Dict[str, Any]:
+        return await fetch_txlist(session, address, start_block=low, end_block=high)
+    
+    if not await refresh_history(history, fetch):
+        return {"status": "error", "error": f"Could not fetch the history of {address}"}
+    try:
+        store.save(history)
+    except OSError as e:
+        logger.warning(f"Could not cache the history of {address}: {e}")
+    
+    return {
+        "status": "success",
+        "result": history.transactions(
+            int(start_time.timestamp()) if start_time else None,
+            int(end_time.timestamp()) if end_time else None,
+            newest_first=True)
+    }
+
 def filter_transactions_by_time(transactions: List[Dict[str, Any]], 
                               start_time: datetime, 
                               end_time: datetime) -> List[Dict[str, Any]]:
     """Filter transactions by timestamp range."""
+    if not transactions:
+        return []
+    
     # Convert timestamps to UNIX timestamps for comparison
     start_timestamp = int(start_time.timestamp())
     end_timestamp = int(end_time.timestamp())
     
-    # Filter transactions
-    filtered = []
-    for tx in transactions:
-        # Get transaction timestamp and convert to integer
-        tx_timestamp = int(tx.get("timeStamp", "0"))
-        
-        # Check if the transaction is within our time range
-        if start_timestamp <= tx_timestamp <= end_timestamp:
-            filtered.append(tx)
+    # Compare every timestamp at once instead of one transaction at a time
+    timestamps = np.array([tx.get("timeStamp") or "0" for tx in transactions]).astype(np.int64)
+    in_range = np.flatnonzero((timestamps >= start_timestamp) & (timestamps <= end_timestamp))
     
-    return filtered
+    return [transactions[i] for i in in_range]
 
 def format_transaction(tx: Dict[str, Any]) -> Dict[str, Any]:
     """Format a transaction for output."""
@@ -428,8 +531,16 @@ async def find_transactions_by_time(addresses: List[str],
                                   start_time: datetime, 
                                   end_time: datetime,
                                   output_dir: Optional[Path] = None,
-                                  test_mode: bool = False) -> bool:
-    """Find transactions for a list of addresses within a time range."""
+                                  test_mode: bool = False,
+                                  max_concurrency: Optional[int] = None) -> bool:
+    """
+    Find transactions for a list of addresses within a time range.
+    
+    Histories are fetched for several addresses at once, paced by the shared
+    Etherscan budget rather than a fixed sleep per call. Each address's
+    filtered transactions are written to the output file as soon as they
+    arrive, so memory stays flat however many addresses are scanned.
+    """
     if not addresses:
         if not test_mode:
             print("No addresses provided!")
@@ -441,97 +552,113 @@ async def find_transactions_by_time(addresses: List[str],
     # Ensure output directory exists
     Config.ensure_dir_exists(output_dir)
     
-    # Initialize counters and results
+    # Each address is scanned once, so the streamed object has no duplicate keys
+    addresses = list(dict.fromkeys(addresses))
+    
+    # Initialize counters
     total_addresses = len(addresses)
     processed = 0
     successful = 0
     with_transactions = 0
     errors = 0
-    all_transactions = []
-    address_transactions = {}
+    total_transactions = 0
     
     if not test_mode:
         print(f"Finding transactions for {total_addresses} addresses between:")
         print(f"  Start: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"  End:   {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
     
-    async with aiohttp.ClientSession() as session:
-        for address in addresses:
-            processed += 1
-            
-            # Validate address
-            if not is_valid_eth_address(address):
-                if not test_mode:
-                    print(f"Invalid Ethereum address format: {address}")
-                errors += 1
-                continue
-            
-            # Display progress
+    # Prepare filename with time range
+    start_str = start_time.strftime("%Y%m%d")
+    end_str = end_time.strftime("%Y%m%d")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    prefix = "test_" if test_mode else ""
+    output_file = output_dir / f"{prefix}eth_txs_{start_str}_to_{end_str}_{timestamp}.json"
+    # Streamed into a temporary file that only replaces the output once complete
+    temp_file = output_file.with_suffix(".json.tmp")
+    
+    # Invalid addresses are counted up front; the rest go through the pipeline
+    valid_addresses = []
+    for address in addresses:
+        if is_valid_eth_address(address):
+            valid_addresses.append(address)
+        else:
             if not test_mode:
-                show_progress_bar(processed, total_addresses, 
-                                 prefix=f'Progress ({processed}/{total_addresses}): ', 
-                                 suffix=f'Address: {address[:6]}...{address[-4:]}')
+                print(f"Invalid Ethereum address format: {address}")
+            processed += 1
+            errors += 1
+    
+    semaphore = asyncio.Semaphore(max_concurrency or Config.MAX_CONCURRENT_ADDRESSES)
+    
+    async def fetch(session: aiohttp.ClientSession, address: str) -> Tuple[str, Dict[str, Any]]:
+        async with semaphore:
+            return address, await get_transaction_history(session, address, start_time, end_time)
+    
+    try:
+        with open(temp_file, 'w') as f:
+            # The per-address map is streamed first; the summary closes the object
+            f.write('{\n  "transactions": {')
             
-            # Get transaction history
-            tx_result = await get_transaction_history(session, address)
+            async with shared_aiohttp_session() as session:
+                tasks = [asyncio.create_task(fetch(session, address)) for address in valid_addresses]
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        address, tx_result = await next_done
+                        processed += 1
+                        
+                        # Display progress
+                        if not test_mode:
+                            show_progress_bar(processed, total_addresses, 
+                                             prefix=f'Progress ({processed}/{total_addresses}): ', 
+                                             suffix=f'Address: {address[:6]}...{address[-4:]}')
+                        
+                        if tx_result.get("status") != "success":
+                            if not test_mode:
+                                print(f"\nError getting history for {address}: {tx_result.get('error')}")
+                            errors += 1
+                            continue
+                        
+                        # The history lookup already narrowed the transactions to the window
+                        formatted_txs = [format_transaction(tx) for tx in tx_result.get("result", [])]
+                        
+                        separator = ",\n" if successful else "\n"
+                        f.write(f"{separator}    {json.dumps(address)}: {json.dumps(formatted_txs)}")
+                        
+                        successful += 1
+                        total_transactions += len(formatted_txs)
+                        if formatted_txs:
+                            with_transactions += 1
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
             
-            if tx_result.get("status") == "success":
-                # Get raw transactions and filter by time
-                raw_txs = tx_result.get("result", [])
-                filtered_txs = filter_transactions_by_time(raw_txs, start_time, end_time)
-                
-                # Format transactions for output
-                formatted_txs = [format_transaction(tx) for tx in filtered_txs]
-                
-                # Store results
-                address_transactions[address] = formatted_txs
-                all_transactions.extend(formatted_txs)
-                
-                successful += 1
-                if formatted_txs:
-                    with_transactions += 1
-            else:
-                if not test_mode:
-                    print(f"\nError getting history for {address}: {tx_result.get('error')}")
-                errors += 1
+            # Create summary
+            summary = {
+                "timestamp": int(datetime.now().timestamp()),
+                "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                "start_time": start_time.strftime('%Y-%m-%d %H:%M:%S'),
+                "end_time": end_time.strftime('%Y-%m-%d %H:%M:%S'),
+                "addresses_scanned": total_addresses,
+                "addresses_with_transactions": with_transactions,
+                "successful_requests": successful,
+                "failed_requests": errors,
+                "total_transactions_found": total_transactions
+            }
+            f.write(f'\n  }},\n  "summary": {json.dumps(summary)}\n}}\n')
+    except BaseException:
+        # Don't leave a truncated JSON file behind
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
     
     # Save results if any successful requests
     if successful > 0:
-        # Prepare filename with time range
-        start_str = start_time.strftime("%Y%m%d")
-        end_str = end_time.strftime("%Y%m%d")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Create summary
-        summary = {
-            "timestamp": int(datetime.now().timestamp()),
-            "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "start_time": start_time.strftime('%Y-%m-%d %H:%M:%S'),
-            "end_time": end_time.strftime('%Y-%m-%d %H:%M:%S'),
-            "addresses_scanned": total_addresses,
-            "addresses_with_transactions": with_transactions,
-            "successful_requests": successful,
-            "failed_requests": errors,
-            "total_transactions_found": len(all_transactions)
-        }
-        
-        # Format output data
-        output_data = {
-            "summary": summary,
-            "transactions": address_transactions
-        }
-        
-        # Save to file
-        prefix = "test_" if test_mode else ""
-        output_file = output_dir / f"{prefix}eth_txs_{start_str}_to_{end_str}_{timestamp}.json"
-        
-        with open(output_file, 'w') as f:
-            json.dump(output_data, f, indent=2)
-        
+        os.replace(temp_file, output_file)
         if not test_mode:
             file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
             print(f"\n✅ Transaction search completed.")
-            print(f"   Found {len(all_transactions)} transactions for {with_transactions} addresses")
+            print(f"   Found {total_transactions} transactions for {with_transactions} addresses")
             print(f"   Results saved to {output_file}")
             print(f"   File size: {file_size_mb:.2f} MB")
         
@@ -541,6 +668,8 @@ async def find_transactions_by_time(addresses: List[str],
             
         return True
     else:
+        # Nothing worth keeping
+        os.remove(temp_file)
         if not test_mode:
             print("\n❌ Transaction search failed: no valid results to save")
         return False
@@ -595,9 +724,13 @@ def run_finder_in_thread(addresses: List[str],
 class EthTimestampTransactions:
     """Ethereum Timestamp Transactions finder class."""
     
-    def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
+    def __init__(self, output_dir: Optional[Path] = None):
+        # Warm TLS sessions shared across threads; each request checks one out
+        self.sendRequest = get_tls_pool()
         self.cloudScraper = cloudscraper.create_scraper()
+        # Pages of recently searched contracts, shared across instances
+        self.page_cache = get_trade_page_cache()
+        self.output_dir = Path(output_dir) if output_dir else None
         self.shorten = lambda s: f"{s[:4]}...{s[-5:]}" if len(s) >= 9 else s
 
     def fetch_url(self, url, headers):
@@ -608,12 +741,13 @@ class EthTimestampTransactions:
                 return response
             except Exception:
                 print(f"[🐲] Error fetching data, trying backup...")
-            finally:
-                try:
-                    response = self.cloudScraper.get(url, headers=headers).json()
-                    return response
-                except Exception:
-                    print(f"[🐲] Backup scraper failed, retrying...")
+            
+            # Only fall back to the scraper when the TLS session failed
+            try:
+                response = self.cloudScraper.get(url, headers=headers).json()
+                return response
+            except Exception:
+                print(f"[🐲] Backup scraper failed, retrying...")
             
             time.sleep(1)
         
@@ -633,12 +767,13 @@ class EthTimestampTransactions:
                 return response
             except Exception:
                 print(f"[🐲] Error fetching data, trying backup...")
-            finally:
-                try:
-                    response = self.cloudScraper.get(url, headers=headers).json()['data']['token']['creation_timestamp']
-                    return response
-                except Exception:
-                    print(f"[🐲] Backup scraper failed, retrying...")
+            
+            # Only fall back to the scraper when the TLS session failed
+            try:
+                response = self.cloudScraper.get(url, headers=headers).json()['data']['token']['creation_timestamp']
+                return response
+            except Exception:
+                print(f"[🐲] Backup scraper failed, retrying...")
             
             time.sleep(1)
         
@@ -646,11 +781,16 @@ class EthTimestampTransactions:
         return None
 
     def getTxByTimestamp(self, contractAddress, threads, start, end):
-        base_url = f"https://gmgn.ai/defi/quotation/v1/trades/eth/{contractAddress}?limit=100"
-        paginator = None
-        urls = []
-        all_trades = []
-
+        """
+        Save the makers of every GMGN trade between ``start`` and ``end``.
+        
+        Trades come newest first, so each page is fetched once: pages newer
+        than the window are skipped, matching makers are streamed to disk, and
+        the walk stops at the first page that reaches past ``start``. Pages are
+        cached for a few minutes, so repeated searches over the same contract
+        are served from memory. ``threads`` is kept for compatibility; cursor
+        pages can only be fetched one after another.
+        """
         headers = {
             "User-Agent": ua.random
         }
@@ -659,45 +799,33 @@ class EthTimestampTransactions:
 
         start = int(start)
         end = int(end)
-
-        while True:
-            url = f"{base_url}&cursor={paginator}" if paginator else base_url
-            urls.append(url)
-            
-            response = self.fetch_url(url, headers)
-            trades = response.get('data', {}).get('history', [])
-            
-            if not trades or trades[-1]['timestamp'] < start:
-                break
-
-            paginator = response['data'].get('next')
-            if not paginator:
-                break
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
-            future_to_url = {executor.submit(self.fetch_url, url, headers): url for url in urls}
-            for future in concurrent.futures.as_completed(future_to_url):
-                response = future.result()
-                trades = response.get('data', {}).get('history', [])
-                filtered_trades = [trade for trade in trades if start <= trade['timestamp'] <= end]
-                all_trades.extend(filtered_trades)
-
-        wallets = []
         
         # Use our project's data structure
-        output_dir = Path(os.getcwd()) / "data" / "output-data" / "ethereum" / "timestamp-txns"
+        output_dir = self.output_dir or Path(os.getcwd()) / "data" / "output-data" / "ethereum" / "timestamp-txns"
         output_dir.mkdir(parents=True, exist_ok=True)
         
         filename = output_dir / f"txns_{self.shorten(contractAddress)}__{random.randint(1111, 9999)}.txt"
 
-        for trade in all_trades:
-            wallets.append(trade.get("maker"))
-
-        with open(filename, 'a') as f:
-            for wallet in wallets:
-                f.write(f"{wallet}\n")
+        writer = TradeStreamWriter(filename)
+        skipped = 0
+        try:
+            pages = crawl_trade_pages(lambda url: self.fetch_url(url, headers), contractAddress,
+                                      cache=self.page_cache,
+                                      stop=lambda trades: trades[-1]['timestamp'] < start)
+            for page in pages:
+                if not page.trades:
+                    break
+                # Every trade on this page is newer than the window
+                if page.trades[-1]['timestamp'] > end:
+                    skipped += 1
+                    continue
+                writer.write_trades([trade for trade in page.trades if start <= trade['timestamp'] <= end])
+        finally:
+            writer.close()
         
-        print(f"[🐲] {len(wallets)} trades successfully saved to {filename}")
+        if skipped:
+            print(f"[🐲] Skipped {skipped} pages newer than the window.")
+        print(f"[🐲] {writer.trades_written} trades successfully saved to {filename}")
         return True
 
     def run(self, contract_address: str, start_time: int, end_time: int, threads: int = 10) -> bool:
@@ -15,16 +15,22 @@ from pathlib import Path
 import threading
 import queue
 import argparse
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import AsyncIterator, Dict, List, Any, Optional, Union, Tuple
 
 import aiohttp
 import httpx
-import tls_client
 import cloudscraper
 from fake_useragent import UserAgent
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict
 
+from ...core.http_client import shared_aiohttp_session
+from ...core.tls_pool import get_tls_pool
+from .eth_timestamp import get_block_by_timestamp
+from .etherscan_keys import RETRY_POLICY, get_etherscan_keys
+from .trader_aggregator import TraderAggregator
+from .trader_state import SECONDS_PER_DAY, TraderState, day_of, get_trader_state_store
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
@@ -70,7 +76,6 @@ if IN_TEST_MODE:
 class Config:
     """Configuration for Ethereum API calls."""
     # API settings
-    ETH_API_KEY = os.environ.get("ETHEREUM_API_KEY", "")
     ETH_ENDPOINT = "https://api.etherscan.io/api"
     
     # Request settings
@@ -82,8 +87,9 @@ class Config:
     # Thread settings
     DEFAULT_THREADS = 10
     
-    # Rate limiting
-    RATE_LIMIT_DELAY = 0.2  # seconds between API calls
+    # Transfer crawling
+    RESULT_CAP = 10000  # Etherscan returns at most this many rows for one query (page x offset)
+    MAX_CONCURRENT_RANGES = 8  # block ranges fetched at the same time
     
     # Token trade analysis
     TOP_TRADERS_COUNT = 100  # Number of top traders to find
@@ -128,6 +134,8 @@ class Config:
         directory.mkdir(parents=True, exist_ok=True)
         return directory
 
+ETHERSCAN_KEYS = get_etherscan_keys()
+
 # Show progress bar
 def show_progress_bar(iteration, total, prefix='', suffix='', length=30, fill='█'):
     """Display a progress bar in the console."""
@@ -156,112 +164,182 @@ def is_valid_eth_address(address: str) -> bool:
         return False
 
 async def get_token_transfers(session: aiohttp.ClientSession, token_address: str, 
-                              page: int = 1, offset: int = 100) -> Dict[str, Any]:
-    """Get token transfers for a specific token."""
+                              page: int = 1, offset: int = 100,
+                              start_block: Optional[int] = None, end_block: Optional[int] = None,
+                              sort: str = 'desc') -> Dict[str, Any]:
+    """Get token transfers for a specific token, optionally within a block range."""
     params = {
         'module': 'account',
         'action': 'tokentx',
         'contractaddress': token_address,
         'page': str(page),
         'offset': str(offset),
-        'sort': 'desc',  # Latest first
-        'apikey': Config.ETH_API_KEY
+        'sort': sort,  # Latest first by default
     }
+    block_range = start_block is not None or end_block is not None
+    if block_range:
+        params['startblock'] = str(start_block or 0)
+        params['endblock'] = str(end_block if end_block is not None else 99999999)
     
     url = Config.ETH_ENDPOINT
     
     for retry in range(Config.MAX_RETRIES):
         try:
-            # Add delay for rate limiting
-            await asyncio.sleep(Config.RATE_LIMIT_DELAY)
-            
             # Use the proper timeout object
             timeout = aiohttp.ClientTimeout(total=Config.REQUEST_TIMEOUT)
             
-            async with session.get(url, params=params, timeout=timeout) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"HTTP {response.status}: {error_text[:200]}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        # Use random delay within range for better retry behavior
-                        delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                        await asyncio.sleep(delay)
-                        continue
-                    return {"status": "error", "error": f"HTTP {response.status}"}
-                
-                data = await response.json()
-                
-                if data.get("status") != "1":
-                    error_msg = data.get("message", "Unknown error")
-                    
-                    # If no transactions found, this is actually OK on later pages
-                    if "No transactions found" in error_msg and page > 1:
-                        return {
-                            "status": "success",
-                            "result": [],
-                            "last_page": True
-                        }
-                    
-                    logger.error(f"API error for token {token_address}: {error_msg}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        # Use random delay within range for better retry behavior
-                        delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                        await asyncio.sleep(delay)
-                        continue
-                    return {"status": "error", "error": error_msg}
-                
-                # Process transfers
-                transfers = data.get("result", [])
+            response, data = await ETHERSCAN_KEYS.get(session, url, params, timeout)
+            
+            if response.status != 200:
+                error_text = await response.text()
+                logger.error(f"HTTP {response.status}: {error_text[:200]}")
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return {"status": "error", "error": f"HTTP {response.status}"}
+            
+            if data.get("status") != "1":
+                error_msg = data.get("message", "Unknown error")
                 
-                return {
-                    "status": "success",
-                    "result": transfers,
-                    "last_page": len(transfers) < offset
-                }
+                # If no transactions found, this is actually OK on later pages or in a block range
+                if "No transactions found" in error_msg and (page > 1 or block_range):
+                    return {
+                        "status": "success",
+                        "result": [],
+                        "last_page": True
+                    }
                 
+                logger.error(f"API error for token {token_address}: {error_msg}")
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return {"status": "error", "error": error_msg}
+            
+            # Process transfers
+            transfers = data.get("result", [])
+            
+            return {
+                "status": "success",
+                "result": transfers,
+                "last_page": len(transfers) < offset
+            }
+            
         except asyncio.TimeoutError:
             logger.error(f"Timeout getting transfers for token {token_address}")
             if retry < Config.MAX_RETRIES - 1:
-                # Use random delay within range for better retry behavior
-                delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                await asyncio.sleep(delay)
+                await RETRY_POLICY.wait(retry)
                 continue
             return {"status": "error", "error": "Timeout"}
             
         except Exception as e:
             logger.error(f"Error getting transfers for token {token_address}: {str(e)}")
             if retry < Config.MAX_RETRIES - 1:
-                # Use random delay within range for better retry behavior
-                delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                await asyncio.sleep(delay)
+                await RETRY_POLICY.wait(retry)
                 continue
             return {"status": "error", "error": str(e)}
     
     return {"status": "error", "error": "Max retries exceeded"}
 
-async def get_all_token_transfers(session: aiohttp.ClientSession, token_address: str, 
-                                 max_pages: int = 5) -> List[Dict[str, Any]]:
-    """Get all token transfers for a specific token, up to a maximum number of pages."""
-    all_transfers = []
-    page = 1
-    last_page = False
+async def stream_token_transfers(session: aiohttp.ClientSession, token_address: str, 
+                                 start_block: int = 0, end_block: int = 99999999,
+                                 max_concurrency: Optional[int] = None) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Crawl every transfer of a token between two blocks, yielding pieces as they arrive.
     
-    while not last_page and page <= max_pages:
-        result = await get_token_transfers(session, token_address, page=page)
+    Etherscan returns at most ``Config.RESULT_CAP`` rows for a query however it
+    is paged, so a range that hits the cap is split: the blocks it returned in
+    full are kept, and the rest of the range is halved and fetched again,
+    recursively, until every leaf range fits under the cap. Leaf ranges are
+    fetched concurrently (paced by the shared Etherscan key pool).
+    
+    Yields:
+        (first block of the range, transfers oldest first) in completion order;
+        the ranges never overlap
         
+    Raises:
+        RuntimeError: If a range could not be fetched
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or Config.MAX_CONCURRENT_RANGES)
+    pieces: asyncio.Queue = asyncio.Queue()
+    
+    async def crawl(low: int, high: int) -> None:
+        async with semaphore:
+            result = await get_token_transfers(session, token_address, page=1, offset=Config.RESULT_CAP,
+                                               start_block=low, end_block=high, sort='asc')
         if result.get("status") != "success":
-            logger.error(f"Error getting transfers for page {page}: {result.get('error')}")
-            break
+            raise RuntimeError(f"blocks {low}-{high}: {result.get('error')}")
         
         transfers = result.get("result", [])
-        all_transfers.extend(transfers)
+        if len(transfers) < Config.RESULT_CAP:
+            await pieces.put((low, transfers))
+            return
         
-        last_page = result.get("last_page", False)
-        page += 1
+        # The last block may have been cut off; everything before it is complete
+        last_block = int(transfers[-1]["blockNumber"])
+        complete = [tx for tx in transfers if int(tx["blockNumber"]) < last_block]
+        next_block = last_block
+        if not complete:
+            # A single block holds more transfers than one query can return
+            logger.warning(f"Block {last_block} has over {Config.RESULT_CAP} transfers; keeping the first {Config.RESULT_CAP}")
+            complete = transfers
+            next_block = last_block + 1
+        await pieces.put((low, complete))
         
-        # If we've collected a reasonable number of transfers, stop
-        if len(all_transfers) >= 1000:
-            break
+        if next_block == high:
+            await crawl(next_block, high)
+        elif next_block < high:
+            middle = (next_block + high) // 2
+            await asyncio.gather(crawl(next_block, middle), crawl(middle + 1, high))
+    
+    async def run() -> None:
+        try:
+            await crawl(start_block, end_block)
+            await pieces.put(None)
+        except Exception as e:
+            await pieces.put(e)
+    
+    crawler = asyncio.create_task(run())
+    try:
+        while True:
+            piece = await pieces.get()
+            if piece is None:
+                return
+            if isinstance(piece, Exception):
+                raise RuntimeError(str(piece)) from piece
+            yield piece
+    finally:
+        crawler.cancel()
+
+async def get_all_token_transfers(session: aiohttp.ClientSession, token_address: str, 
+                                 start_block: int = 0, end_block: int = 99999999,
+                                 max_concurrency: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get every transfer of a token between two blocks, oldest first.
+    
+    The pieces from ``stream_token_transfers`` are merged in block order and
+    deduplicated by (hash, logIndex).
+    
+    Returns:
+        The transfers, or None if any range could not be fetched
+    """
+    chunks = []
+    try:
+        async for chunk in stream_token_transfers(session, token_address, start_block, end_block, max_concurrency):
+            chunks.append(chunk)
+    except RuntimeError as e:
+        logger.error(f"Error crawling transfers for token {token_address}: {str(e)}")
+        return None
+    
+    # Ranges are disjoint and each is oldest first, so ordering them by start block orders everything
+    chunks.sort(key=lambda chunk: chunk[0])
+    seen = set()
+    all_transfers = []
+    for _, transfers in chunks:
+        for tx in transfers:
+            key = (tx.get("hash"), tx.get("logIndex"))
+            if key not in seen:
+                seen.add(key)
+                all_transfers.append(tx)
     
     return all_transfers
 
@@ -280,67 +358,31 @@ def analyze_transfers(transfers: List[Dict[str, Any]],
     # Calculate threshold date
     threshold_date = int((datetime.now() - timedelta(days=days_threshold)).timestamp())
     
-    # Filter by date
-    recent_transfers = [
-        tx for tx in transfers 
-        if int(tx.get("timeStamp", 0)) >= threshold_date
-    ]
-    
-    # Calculate volume by address
-    traders = {}
-    for tx in recent_transfers:
-        # Extract data
-        from_addr = tx.get("from", "")
-        to_addr = tx.get("to", "")
-        value = int(tx.get("value", "0"))
-        token_decimals = int(tx.get("tokenDecimal", "0"))
-        
-        # Calculate normalized value
-        normalized_value = value / (10 ** token_decimals)
-        
-        # Store by address
-        for addr in [from_addr, to_addr]:
-            if not addr:
-                continue
-                
-            if addr not in traders:
-                traders[addr] = {
-                    "address": addr,
-                    "volume": 0,
-                    "transactions": 0,
-                    "buys": 0,
-                    "sells": 0
-                }
-            
-            traders[addr]["transactions"] += 1
-            traders[addr]["volume"] += normalized_value
-            
-            # Track buys/sells
-            if addr == to_addr:
-                traders[addr]["buys"] += 1
-            elif addr == from_addr:
-                traders[addr]["sells"] += 1
-    
-    # Convert to list and sort by volume
-    top_traders = sorted(
-        list(traders.values()), 
-        key=lambda x: x["volume"], 
-        reverse=True
-    )
-    
-    # Calculate statistics
-    stats = {
-        "total_traders": len(traders),
-        "total_transactions": len(recent_transfers),
-        "period_days": days_threshold,
+    aggregator = TraderAggregator(since=threshold_date)
+    aggregator.add(transfers)
+    
+    top_traders = aggregator.top(Config.TOP_TRADERS_COUNT)
+    return top_traders, trader_stats(aggregator, top_traders, days_threshold)
+
+def trader_stats(aggregator: TraderAggregator, top_traders: List[Dict[str, Any]], days: int) -> Dict[str, Any]:
+    """Summary statistics of an aggregation."""
+    return {
+        "total_traders": aggregator.total_traders,
+        "total_transactions": aggregator.total_transactions,
+        "period_days": days,
         "top_trader_volume": top_traders[0]["volume"] if top_traders else 0,
         "timestamp": int(datetime.now().timestamp())
     }
-    
-    return top_traders[:Config.TOP_TRADERS_COUNT], stats
 
-async def find_top_traders(token_address: str, days: int, output_dir: Path, test_mode: bool = False) -> bool:
-    """Find top traders for a specific token."""
+async def find_top_traders(token_address: str, days: int, output_dir: Path, test_mode: bool = False,
+                           use_cache: bool = True) -> bool:
+    """
+    Find top traders for a specific token.
+    
+    The window is rounded down to whole UTC days. With ``use_cache`` the
+    token's day-bucketed counters are kept in CACHE_DIR/ethereum between runs,
+    so a refresh only crawls the blocks after the last one counted.
+    """
     if not is_valid_eth_address(token_address):
         if not test_mode:
             print(f"Invalid Ethereum address: {token_address}")
@@ -353,21 +395,72 @@ async def find_top_traders(token_address: str, days: int, output_dir: Path, test
         print(f"Finding top traders for token {short_addr} over the last {days} days...")
     
     try:
-        async with aiohttp.ClientSession() as session:
-            # Get token transfers
+        async with shared_aiohttp_session() as session:
+            now = int(datetime.now().timestamp())
+            first_day = day_of(now - days * SECONDS_PER_DAY)
+            
+            store = None
+            state = TraderState(token_address)
+            if use_cache:
+                try:
+                    store = get_trader_state_store()
+                    state = store.load(token_address)
+                except Exception as e:
+                    logger.warning(f"Trader state unavailable, crawling the whole window: {e}")
+            
+            # The latest block bounds this run
+            latest = await get_block_by_timestamp(session, now, closest="before")
+            end_block = latest["block_number"] if latest.get("status") == "success" else None
+            
+            if state.last_block is None or state.first_day is None or state.first_day > first_day:
+                # Nothing stored covers the window yet: crawl it from the start of its first day
+                state = TraderState(token_address, first_day=first_day)
+                start_block = 0
+                window_start = await get_block_by_timestamp(session, first_day * SECONDS_PER_DAY, closest="after")
+                if window_start.get("status") == "success":
+                    start_block = window_start["block_number"]
+            else:
+                start_block = state.last_block + 1
+            
+            # Fold transfers into the day buckets as each block range arrives
             if not test_mode:
-                print("Fetching token transfers...")
-            transfers = await get_all_token_transfers(session, token_address)
+                print(f"Fetching token transfers from block {start_block}...")
+            fetched = 0
+            highest_block = start_block - 1
+            if end_block is None or start_block <= end_block:
+                try:
+                    async for _, transfers in stream_token_transfers(session, token_address, start_block=start_block,
+                                                                     end_block=end_block if end_block is not None else 99999999):
+                        state.add(transfers)
+                        fetched += len(transfers)
+                        if transfers:
+                            highest_block = max(highest_block, int(transfers[-1]["blockNumber"]))
+                except RuntimeError as e:
+                    logger.error(f"Error crawling transfers for token {token_address}: {str(e)}")
+                    if not test_mode:
+                        print("Could not fetch the token's transfers.")
+                    return False
+            
+            # Only blocks actually returned count as crawled: the last few before the
+            # head may not be indexed yet, so the next refresh asks for them again
+            state.last_block = max(state.last_block or -1, highest_block)
+            state.expire(first_day)
+            if store is not None:
+                try:
+                    store.save(state)
+                except Exception as e:
+                    logger.warning(f"Could not save trader state for {token_address}: {e}")
             
-            if not transfers:
+            aggregator = state.aggregate(first_day)
+            if not aggregator.total_transactions:
                 if not test_mode:
                     print("No transfers found for this token.")
                 return False
             
-            # Analyze transfers
             if not test_mode:
-                print(f"Analyzing {len(transfers)} transfers...")
-            top_traders, stats = analyze_transfers(transfers, days_threshold=days)
+                print(f"Fetched {fetched} new transfers; ranking {aggregator.total_transactions} in the window...")
+            top_traders = aggregator.top(Config.TOP_TRADERS_COUNT)
+            stats = trader_stats(aggregator, top_traders, days)
             
             if not top_traders:
                 if not test_mode:
@@ -456,7 +549,8 @@ class EthTopTraders:
     """Ethereum Top Traders class."""
     
     def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
+        # Warm TLS sessions shared across threads; each request checks one out
+        self.sendRequest = get_tls_pool()
         self.cloudScraper = cloudscraper.create_scraper()
         self.shorten = lambda s: f"{s[:4]}...{s[-5:]}" if len(s) >= 9 else s
         self.allData = {}
@@ -13,21 +13,29 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import threading
 import queue
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Dict, Iterable, List, Any, Optional, Union, Tuple
 import argparse
 import re
 import random
-import tls_client
 import cloudscraper
 from fake_useragent import UserAgent
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 import csv
 import contextlib
 import io
 
+import weakref
+
 import aiohttp
 import httpx
 
+from ...core.http_client import shared_aiohttp_session
+from ...core.request_batcher import RequestBatcher
+from ...core.single_flight import get_single_flight
+from ...core.tls_pool import get_tls_pool
+from .etherscan_keys import RETRY_POLICY, get_etherscan_keys
+from .wallet_history import HISTORY_PAGE_SIZE, LATEST_BLOCK, get_wallet_history_store, refresh_history
+
 # EXTREME AND AGGRESSIVE SILENCER
 # This code runs immediately at import time
 # It will detect if we're in test mode and silence EVERYTHING
@@ -124,7 +132,6 @@ class Config:
     """Configuration for Ethereum API calls."""
     
     # API settings
-    ETH_API_KEY = os.environ.get("ETHEREUM_API_KEY", "")
     ETH_ENDPOINT = "https://api.etherscan.io/api"
     
     # Request settings
@@ -136,8 +143,17 @@ class Config:
     # Thread settings
     DEFAULT_THREADS = 10
     
-    # Rate limiting
-    RATE_LIMIT_DELAY = 0.2  # seconds between API calls
+    # Balance lookups are grouped into balancemulti calls
+    BALANCE_BATCH_SIZE = 20  # Etherscan's per-call maximum
+    BALANCE_BATCH_WINDOW = 0.05  # seconds to wait for more addresses
+    
+    # Transactions reported per wallet
+    RECENT_TRANSACTIONS = 10
+    
+    # GMGN wallet enrichment
+    GMGN_ENDPOINT = "https://gmgn.ai/defi/quotation/v1"
+    HEDGE_DELAY = 0.5  # seconds before a slow primary request is raced by the backup scraper
+    REQUEST_LEGS_PER_WALLET = 6  # 7d stats, 30d stats and token distribution, primary and backup each
     
     # Data directories
     @staticmethod
@@ -182,6 +198,8 @@ class Config:
         directory.mkdir(parents=True, exist_ok=True)
         return directory
 
+ETHERSCAN_KEYS = get_etherscan_keys()
+
 # Function to validate Ethereum address
 def is_valid_eth_address(address: str) -> bool:
     """Check if the given string is a valid Ethereum address."""
@@ -196,188 +214,196 @@ def is_valid_eth_address(address: str) -> bool:
     except ValueError:
         return False
 
+# One balance batcher per pooled session (and so per event loop)
+_balance_batchers: "weakref.WeakKeyDictionary[aiohttp.ClientSession, RequestBatcher]" = weakref.WeakKeyDictionary()
+
 async def get_wallet_balance(session: aiohttp.ClientSession, address: str) -> Dict[str, Any]:
-    """Get the ETH balance for a wallet address."""
+    """
+    Get the ETH balance for a wallet address.
+    
+    Concurrent lookups on the same session are grouped into ``balancemulti``
+    calls of up to ``Config.BALANCE_BATCH_SIZE`` addresses.
+    """
+    batcher = _balance_batchers.get(session)
+    if batcher is None:
+        # A strong reference here would keep the session alive through its own batcher
+        session_ref = weakref.ref(session)
+        batcher = _balance_batchers[session] = RequestBatcher(
+            lambda addresses: get_wallet_balances(session_ref(), addresses),
+            max_batch=Config.BALANCE_BATCH_SIZE, window=Config.BALANCE_BATCH_WINDOW)
+    
+    try:
+        result = await batcher.submit(address.lower())
+    except KeyError:
+        result = {"status": "error", "error": "Address missing from balancemulti response"}
+    # Report the address the way the caller spelled it
+    return {**result, "address": address}
+
+async def get_wallet_balances(session: aiohttp.ClientSession, addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the ETH balances of up to 20 addresses in one ``balancemulti`` call.
+    
+    Returns:
+        Mapping from lowercased address to its balance result; on failure every
+        address maps to the same error result
+    """
     params = {
         'module': 'account',
-        'action': 'balance',
-        'address': address,
-        'tag': 'latest',
-        'apikey': Config.ETH_API_KEY
+        'action': 'balancemulti',
+        'address': ','.join(addresses),
+        'tag': 'latest'
     }
     
     url = Config.ETH_ENDPOINT
+    label = f"{len(addresses)} addresses"
+    
+    def failed(error_msg: str) -> Dict[str, Dict[str, Any]]:
+        return {address.lower(): {"status": "error", "address": address, "error": error_msg} for address in addresses}
     
     for retry in range(Config.MAX_RETRIES):
         try:
-            # Add delay for rate limiting
-            await asyncio.sleep(Config.RATE_LIMIT_DELAY * (1 + retry))
-            
             timeout = aiohttp.ClientTimeout(total=Config.REQUEST_TIMEOUT)
             
-            async with session.get(url, params=params, timeout=timeout) as response:
-                if response.status == 429:  # Rate limit
-                    retry_after = int(response.headers.get('Retry-After', Config.RETRY_DELAY_MIN * 2))
-                    if not IN_TEST_MODE:
-                        print(f"⚠️ Rate limited for {address}, waiting {retry_after}s before retry {retry+1}/{Config.MAX_RETRIES}")
-                    logger.warning(f"Rate limited for {address}, waiting {retry_after}s")
-                    await asyncio.sleep(retry_after)
-                    continue
-                
-                if response.status != 200:
-                    error_text = await response.text()
-                    error_msg = f"HTTP {response.status}: {error_text[:200]}"
-                    if not IN_TEST_MODE:
-                        print(f"❌ Error fetching balance for {address}: {error_msg}")
-                    logger.error(f"Error fetching balance for {address}: {error_msg}")
-                    
-                    if retry < Config.MAX_RETRIES - 1:
-                        delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                        await asyncio.sleep(delay)
-                        continue
-                    return {"status": "error", "address": address, "error": error_msg}
-                
-                try:
-                    data = await response.json()
-                except Exception as e:
-                    if not IN_TEST_MODE:
-                        print(f"❌ Error parsing JSON response: {str(e)}")
-                    logger.error(f"Error parsing JSON for {address}: {str(e)}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                        await asyncio.sleep(delay)
-                        continue
-                    return {"status": "error", "address": address, "error": f"JSON parse error: {str(e)}"}
-                
-                if data.get("status") != "1":
-                    error_msg = data.get("message", "Unknown error")
-                    if not IN_TEST_MODE:
-                        print(f"❌ API error for {address}: {error_msg}")
-                    logger.error(f"API error for {address}: {error_msg}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                        await asyncio.sleep(delay)
-                        continue
-                    return {"status": "error", "address": address, "error": error_msg}
+            response, data = await ETHERSCAN_KEYS.get(session, url, params, timeout)
+            
+            if response.status == 429:  # Rate limit
+                retry_after = int(response.headers.get('Retry-After', Config.RETRY_DELAY_MIN * 2))
+                if not IN_TEST_MODE:
+                    print(f"⚠️ Rate limited for {label}, waiting {retry_after}s before retry {retry+1}/{Config.MAX_RETRIES}")
+                logger.warning(f"Rate limited for {label}, waiting {retry_after}s")
+                await asyncio.sleep(retry_after)
+                continue
+            
+            if response.status != 200:
+                error_text = await response.text()
+                error_msg = f"HTTP {response.status}: {error_text[:200]}"
+                if not IN_TEST_MODE:
+                    print(f"❌ Error fetching balances for {label}: {error_msg}")
+                logger.error(f"Error fetching balances for {label}: {error_msg}")
                 
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return failed(error_msg)
+            
+            if data.get("status") != "1":
+                error_msg = data.get("message", "Unknown error")
+                if not IN_TEST_MODE:
+                    print(f"❌ API error for {label}: {error_msg}")
+                logger.error(f"API error for {label}: {error_msg}")
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return failed(error_msg)
+            
+            balances = {}
+            now = int(time.time())
+            for entry in data.get("result", []):
                 # Convert wei to ether
-                balance_wei = int(data.get("result", "0"))
-                balance_eth = balance_wei / 1e18
-                
-                return {
+                balance_wei = int(entry.get("balance", "0"))
+                balances[entry.get("account", "").lower()] = {
                     "status": "success",
-                    "address": address,
+                    "address": entry.get("account"),
                     "balance_wei": balance_wei,
-                    "balance_eth": balance_eth,
-                    "timestamp": int(time.time())
+                    "balance_eth": balance_wei / 1e18,
+                    "timestamp": now
                 }
-                
+            return balances
+            
         except asyncio.TimeoutError:
             if not IN_TEST_MODE:
-                print(f"❌ Timeout getting balance for {address}")
-            logger.error(f"Timeout getting balance for {address}")
+                print(f"❌ Timeout getting balances for {label}")
+            logger.error(f"Timeout getting balances for {label}")
             if retry < Config.MAX_RETRIES - 1:
-                delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                await asyncio.sleep(delay)
+                await RETRY_POLICY.wait(retry)
                 continue
-            return {"status": "error", "address": address, "error": "Timeout"}
+            return failed("Timeout")
             
         except Exception as e:
             if not IN_TEST_MODE:
-                print(f"❌ Error getting balance for {address}: {str(e)}")
-            logger.error(f"Error getting balance for {address}: {str(e)}")
+                print(f"❌ Error getting balances for {label}: {str(e)}")
+            logger.error(f"Error getting balances for {label}: {str(e)}")
             if retry < Config.MAX_RETRIES - 1:
-                delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                await asyncio.sleep(delay)
+                await RETRY_POLICY.wait(retry)
                 continue
-            return {"status": "error", "address": address, "error": str(e)}
+            return failed(str(e))
     
-    return {"status": "error", "address": address, "error": "Max retries exceeded"}
+    return failed("Max retries exceeded")
 
-async def get_wallet_transactions(session: aiohttp.ClientSession, address: str) -> Dict[str, Any]:
-    """Get the recent transactions for a wallet address."""
+async def fetch_wallet_txlist(session: aiohttp.ClientSession, address: str, start_block: int = 0,
+                              end_block: int = LATEST_BLOCK, sort: str = 'desc',
+                              offset: int = Config.RECENT_TRANSACTIONS) -> Dict[str, Any]:
+    """Get one page of a wallet's transactions between two blocks."""
     params = {
         'module': 'account',
         'action': 'txlist',
         'address': address,
-        'startblock': '0',
-        'endblock': '99999999',
+        'startblock': str(start_block),
+        'endblock': str(end_block),
         'page': '1',
-        'offset': '10',  # Get last 10 transactions
-        'sort': 'desc',  # Latest first
-        'apikey': Config.ETH_API_KEY
+        'offset': str(offset),
+        'sort': sort,
     }
     
     url = Config.ETH_ENDPOINT
     
     for retry in range(Config.MAX_RETRIES):
         try:
-            # Add delay for rate limiting
-            await asyncio.sleep(Config.RATE_LIMIT_DELAY * (1 + retry))
-            
             timeout = aiohttp.ClientTimeout(total=Config.REQUEST_TIMEOUT)
             
-            async with session.get(url, params=params, timeout=timeout) as response:
-                if response.status == 429:  # Rate limit
-                    retry_after = int(response.headers.get('Retry-After', Config.RETRY_DELAY_MIN * 2))
-                    if not IN_TEST_MODE:
-                        print(f"⚠️ Rate limited for {address}, waiting {retry_after}s before retry {retry+1}/{Config.MAX_RETRIES}")
-                    logger.warning(f"Rate limited for {address}, waiting {retry_after}s")
-                    await asyncio.sleep(retry_after)
-                    continue
-                
-                if response.status != 200:
-                    error_text = await response.text()
-                    error_msg = f"HTTP {response.status}: {error_text[:200]}"
-                    if not IN_TEST_MODE:
-                        print(f"❌ Error fetching transactions for {address}: {error_msg}")
-                    logger.error(f"Error fetching transactions for {address}: {error_msg}")
-                    
-                    if retry < Config.MAX_RETRIES - 1:
-                        delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                        await asyncio.sleep(delay)
-                        continue
-                    return {"status": "error", "address": address, "error": error_msg}
-                
-                try:
-                    data = await response.json()
-                except Exception as e:
-                    if not IN_TEST_MODE:
-                        print(f"❌ Error parsing JSON response: {str(e)}")
-                    logger.error(f"Error parsing JSON for {address}: {str(e)}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                        await asyncio.sleep(delay)
-                        continue
-                    return {"status": "error", "address": address, "error": f"JSON parse error: {str(e)}"}
-                
-                if data.get("status") != "1":
-                    error_msg = data.get("message", "Unknown error")
-                    if not IN_TEST_MODE:
-                        print(f"❌ API error for {address}: {error_msg}")
-                    logger.error(f"API error for {address}: {error_msg}")
-                    if retry < Config.MAX_RETRIES - 1:
-                        delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                        await asyncio.sleep(delay)
-                        continue
-                    return {"status": "error", "address": address, "error": error_msg}
+            response, data = await ETHERSCAN_KEYS.get(session, url, params, timeout)
+            
+            if response.status == 429:  # Rate limit
+                retry_after = int(response.headers.get('Retry-After', Config.RETRY_DELAY_MIN * 2))
+                if not IN_TEST_MODE:
+                    print(f"⚠️ Rate limited for {address}, waiting {retry_after}s before retry {retry+1}/{Config.MAX_RETRIES}")
+                logger.warning(f"Rate limited for {address}, waiting {retry_after}s")
+                await asyncio.sleep(retry_after)
+                continue
+            
+            if response.status != 200:
+                error_text = await response.text()
+                error_msg = f"HTTP {response.status}: {error_text[:200]}"
+                if not IN_TEST_MODE:
+                    print(f"❌ Error fetching transactions for {address}: {error_msg}")
+                logger.error(f"Error fetching transactions for {address}: {error_msg}")
                 
-                transactions = data.get("result", [])
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return {"status": "error", "address": address, "error": error_msg}
+            
+            if data.get("status") != "1":
+                error_msg = data.get("message", "Unknown error")
                 
-                return {
-                    "status": "success",
-                    "address": address,
-                    "transactions": transactions,
-                    "timestamp": int(time.time())
-                }
+                # An empty block range is a valid answer
+                if "No transactions found" in error_msg:
+                    return {"status": "success", "address": address, "transactions": [],
+                            "timestamp": int(time.time())}
                 
+                if not IN_TEST_MODE:
+                    print(f"❌ API error for {address}: {error_msg}")
+                logger.error(f"API error for {address}: {error_msg}")
+                if retry < Config.MAX_RETRIES - 1:
+                    await RETRY_POLICY.wait(retry)
+                    continue
+                return {"status": "error", "address": address, "error": error_msg}
+            
+            transactions = data.get("result", [])
+            
+            return {
+                "status": "success",
+                "address": address,
+                "transactions": transactions,
+                "timestamp": int(time.time())
+            }
+            
         except asyncio.TimeoutError:
             if not IN_TEST_MODE:
                 print(f"❌ Timeout getting transactions for {address}")
             logger.error(f"Timeout getting transactions for {address}")
             if retry < Config.MAX_RETRIES - 1:
-                delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                await asyncio.sleep(delay)
+                await RETRY_POLICY.wait(retry)
                 continue
             return {"status": "error", "address": address, "error": "Timeout"}
             
@@ -386,13 +412,50 @@ async def get_wallet_transactions(session: aiohttp.ClientSession, address: str)
                 print(f"❌ Error getting transactions for {address}: {str(e)}")
             logger.error(f"Error getting transactions for {address}: {str(e)}")
             if retry < Config.MAX_RETRIES - 1:
-                delay = Config.RETRY_DELAY_MIN + (Config.RETRY_DELAY_MAX - Config.RETRY_DELAY_MIN) * random.random()
-                await asyncio.sleep(delay)
+                await RETRY_POLICY.wait(retry)
                 continue
             return {"status": "error", "address": address, "error": str(e)}
     
     return {"status": "error", "address": address, "error": "Max retries exceeded"}
 
+async def get_wallet_transactions(session: aiohttp.ClientSession, address: str) -> Dict[str, Any]:
+    """
+    Get the recent transactions for a wallet address.
+    
+    A wallet seen before is served from the wallet cache after fetching only
+    the blocks after the last one seen. A new wallet costs a single call for
+    its newest transactions, which also starts its cached history.
+    """
+    store = get_wallet_history_store()
+    history = store.load(address)
+    
+    if history.updated is None:
+        result = await fetch_wallet_txlist(session, address)
+        if result["status"] != "success":
+            return result
+        history.seed(result["transactions"], Config.RECENT_TRANSACTIONS)
+    else:
+        async def fetch(low: int, high: int) -> Dict[str, Any]:
+            result = await fetch_wallet_txlist(session, address, start_block=low, end_block=high,
+                                               sort='asc', offset=HISTORY_PAGE_SIZE)
+            return {**result, "result": result.get("transactions", [])}
+        
+        # Only new activity is needed here, so older gaps are left unfilled
+        if not await refresh_history(history, fetch, backfill=False):
+            return {"status": "error", "address": address, "error": "Could not fetch new transactions"}
+    
+    try:
+        store.save(history)
+    except OSError as e:
+        logger.warning(f"Could not cache the history of {address}: {e}")
+    
+    return {
+        "status": "success",
+        "address": address,
+        "transactions": history.latest(Config.RECENT_TRANSACTIONS),
+        "timestamp": int(time.time())
+    }
+
 async def process_wallet(session: aiohttp.ClientSession, address: str) -> Dict[str, Any]:
     """Process a single wallet address."""
     if not is_valid_eth_address(address):
@@ -420,14 +483,16 @@ async def process_wallet(session: aiohttp.ClientSession, address: str) -> Dict[s
         "timestamp": int(time.time())
     }
 
-async def process_wallets(wallets: List[str], output_dir: Optional[Path] = None, threads: int = 10, test_mode: bool = False) -> bool:
-    """Process a list of wallet addresses."""
-    if not wallets:
-        if not IN_TEST_MODE:
-            print("❌ No wallet addresses provided")
-        logger.error("No wallet addresses provided")
-        return False
+async def process_wallets(wallets: Iterable[str], output_dir: Optional[Path] = None, threads: int = 10, test_mode: bool = False) -> bool:
+    """
+    Process wallet addresses and write one JSON result per line.
     
+    A producer feeds addresses into a bounded queue that ``threads`` workers
+    drain over one pooled session, and a consumer appends each result to an
+    NDJSON file as it completes. At most a couple of windows of wallets are in
+    memory at a time, so arbitrarily long wallet lists (or generators) can be
+    checked with flat memory and reused connections.
+    """
     if output_dir is None:
         output_dir = Config.get_output_dir()
     
@@ -435,46 +500,85 @@ async def process_wallets(wallets: List[str], output_dir: Optional[Path] = None,
     
     # Create timestamp for output file
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = output_dir / f"wallet_analysis_{timestamp}.json"
-    
-    # Create semaphore to limit concurrent requests
-    semaphore = asyncio.Semaphore(threads)
+    output_file = output_dir / f"wallet_analysis_{timestamp}.ndjson"
     
-    async def process_with_semaphore(wallet):
-        async with semaphore:
-            async with aiohttp.ClientSession() as session:
-                return await process_wallet(session, wallet)
+    # Bounded queues keep the number of pending wallets and unwritten results small
+    workers = max(1, threads)
+    pending: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    finished: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
     
+    total_wallets = len(wallets) if hasattr(wallets, '__len__') else None
     if not IN_TEST_MODE:
-        print(f"🔍 Processing {len(wallets)} wallets...")
+        print(f"🔍 Processing {total_wallets if total_wallets is not None else 'all'} wallets...")
     
-    results = []
-    total_wallets = len(wallets)
     processed = 0
+    successful = 0
     
-    # Process wallets concurrently with semaphore
-    tasks = [process_with_semaphore(wallet) for wallet in wallets]
-    for task in asyncio.as_completed(tasks):
-        result = await task
-        results.append(result)
-        processed += 1
-        if not IN_TEST_MODE:
-            show_progress_bar(processed, total_wallets, prefix='Progress:', suffix='Complete')
+    async def produce():
+        try:
+            for wallet in wallets:
+                await pending.put(wallet)
+        except Exception as e:
+            # Keep whatever was read before the wallet source failed
+            logger.error(f"Error reading wallets: {str(e)}")
+        # Tell every worker to stop once the queue is drained
+        for _ in range(workers):
+            await pending.put(None)
+    
+    async def work(session: aiohttp.ClientSession):
+        while True:
+            wallet = await pending.get()
+            if wallet is None:
+                await finished.put(None)
+                return
+            try:
+                result = await process_wallet(session, wallet)
+            except Exception as e:
+                logger.error(f"Error processing wallet {wallet}: {str(e)}")
+                result = {"status": "error", "address": wallet, "error": str(e)}
+            await finished.put(result)
     
-    # Save results
     try:
         with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        if not IN_TEST_MODE:
-            print(f"\n✅ Results saved to {output_file}")
-        return True
+            # All wallets share one pooled session, so connections to Etherscan are reused
+            async with shared_aiohttp_session() as session:
+                tasks = [asyncio.create_task(produce())]
+                tasks += [asyncio.create_task(work(session)) for _ in range(workers)]
+                try:
+                    running = workers
+                    while running:
+                        result = await finished.get()
+                        if result is None:
+                            running -= 1
+                            continue
+                        f.write(json.dumps(result) + "\n")
+                        processed += 1
+                        if result.get("status") == "success":
+                            successful += 1
+                        if not IN_TEST_MODE and total_wallets:
+                            show_progress_bar(processed, total_wallets, prefix='Progress:', suffix='Complete')
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
     except Exception as e:
         if not IN_TEST_MODE:
             print(f"\n❌ Error saving results: {str(e)}")
         logger.error(f"Error saving results: {str(e)}")
         return False
+    
+    if processed == 0:
+        output_file.unlink()
+        if not IN_TEST_MODE:
+            print("❌ No wallet addresses provided")
+        logger.error("No wallet addresses provided")
+        return False
+    
+    if not IN_TEST_MODE:
+        print(f"\n✅ {successful}/{processed} wallets checked. Results saved to {output_file}")
+    return True
 
-def run_wallet_checker_in_thread(wallets: List[str], output_dir: Optional[Path] = None, threads: int = 10, test_mode: bool = False) -> bool:
+def run_wallet_checker_in_thread(wallets: Iterable[str], output_dir: Optional[Path] = None, threads: int = 10, test_mode: bool = False) -> bool:
     """Run the wallet checker in a separate thread."""
     def thread_worker():
         return asyncio.run(process_wallets(wallets, output_dir, threads, test_mode))
@@ -573,37 +677,148 @@ class EthWalletChecker:
         # Log initialization
         self.logger.debug("EthWalletChecker initialized with %d wallets", len(self.wallets))
         
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
+        # Warm TLS sessions shared across threads; each request checks one out
+        self.sendRequest = get_tls_pool()
         self.cloudScraper = cloudscraper.create_scraper()
         self.shorten = lambda s: f"{s[:4]}...{s[-5:]}" if len(s) >= 9 else s
         self.skippedWallets = 0
         self.results = []
+        
+        # Threads for the individual GMGN requests, created on first use
+        self._legPool: Optional[ThreadPoolExecutor] = None
+        self._legLock = threading.Lock()
     
+    def _legExecutor(self) -> ThreadPoolExecutor:
+        # Every wallet worker can have all of its primary and backup requests in flight at once
+        with self._legLock:
+            if self._legPool is None:
+                self._legPool = ThreadPoolExecutor(max_workers=max(1, self.threads) * Config.REQUEST_LEGS_PER_WALLET,
+                                                   thread_name_prefix="gmgn-eth")
+            return self._legPool
+
+    @staticmethod
+    def _successData(response) -> Optional[Dict[str, Any]]:
+        # GMGN answers errors with HTTP 200 too, so only msg == "success" counts
+        if response.status_code != 200:
+            return None
+        try:
+            payload = response.json()
+        except ValueError:
+            return None
+        if not isinstance(payload, dict) or payload.get('msg') != "success":
+            return None
+        return payload.get('data')
+
+    def _primaryGet(self, pooled, url: str, headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        try:
+            response = pooled.get(url, headers=headers)
+        except Exception:
+            pooled.mark_failed()
+            return None
+        if response.status_code >= 400 and response.status_code != 404:
+            pooled.mark_failed()
+        return self._successData(response)
+
+    def _backupGet(self, url: str, headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        try:
+            return self._successData(self.cloudScraper.get(url, headers=headers))
+        except Exception:
+            return None
+
+    def _checkinAfter(self, pooled, futures: List[Future]) -> None:
+        # Slow primaries may still be running when their backup wins; the session goes back once they finish
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def done(_future):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self.sendRequest.checkin(pooled)
+
+        if not futures:
+            self.sendRequest.checkin(pooled)
+        for future in futures:
+            future.add_done_callback(done)
+
+    def _hedgedRound(self, urls: Dict[str, str], headers: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch several GMGN URLs at once, racing the backup scraper against slow primaries.
+
+        All primary requests share one pooled TLS session, so they are multiplexed
+        over the same connection. A request whose primary fails, or has not
+        answered within Config.HEDGE_DELAY, is also sent through cloudscraper, and
+        whichever answers successfully first wins.
+
+        Returns:
+            The ``data`` payload of each URL that succeeded, by key
+        """
+        executor = self._legExecutor()
+        pending: Dict[Future, str] = {}
+        hedged = set()
+        try:
+            pooled = self.sendRequest.checkout()
+        except Exception as e:
+            self.logger.debug("No TLS session available, using the backup scraper: %s", e)
+            pooled = None
+
+        if pooled is not None:
+            pending = {executor.submit(self._primaryGet, pooled, url, headers): key for key, url in urls.items()}
+            self._checkinAfter(pooled, list(pending))
+        hedge_at = time.monotonic() + (Config.HEDGE_DELAY if pooled is not None else 0.0)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        while True:
+            late = time.monotonic() >= hedge_at
+            in_flight = set(pending.values())
+            for key, url in urls.items():
+                if key in results or key in hedged or (key in in_flight and not late):
+                    continue
+                hedged.add(key)
+                pending[executor.submit(self._backupGet, url, headers)] = key
+
+            if not pending or len(results) == len(urls):
+                return results
+            # Once every key still outstanding has been hedged, wait for answers only
+            settled = all(key in results or key in hedged for key in urls)
+            timeout = None if settled else max(0.0, hedge_at - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                data = future.result()
+                if data is not None:
+                    results.setdefault(key, data)
+
+    def _hedgedFetch(self, urls: Dict[str, str], headers: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Run hedged rounds until every URL succeeded or the retries are used up."""
+        results: Dict[str, Dict[str, Any]] = {}
+        for attempt in RETRY_POLICY.attempts():
+            missing = {key: url for key, url in urls.items() if key not in results}
+            results.update(self._hedgedRound(missing, headers))
+            if len(results) == len(urls) or RETRY_POLICY.is_last(attempt):
+                break
+            time.sleep(RETRY_POLICY.delay(attempt))
+        return results
+
+    @staticmethod
+    def _walletUrl(wallet: str, period: str) -> str:
+        return f"{Config.GMGN_ENDPOINT}/smartmoney/eth/walletNew/{wallet}?period={period}"
+
+    @staticmethod
+    def _tokenDistroUrl(wallet: str) -> str:
+        return f"{Config.GMGN_ENDPOINT}/rank/eth/wallets/{wallet}/unique_token_7d?interval=30d"
+
     def getTokenDistro(self, wallet: str):
-        url = f"https://gmgn.ai/defi/quotation/v1/rank/eth/wallets/{wallet}/unique_token_7d?interval=30d"
         headers = {
             "User-Agent": ua.random
         }
-        retries = 3
-        tokenDistro = []
+        fetched = self._hedgedFetch({"distro": self._tokenDistroUrl(wallet)}, headers)
+        return self.summarizeTokenDistro(fetched.get("distro"))
 
-        for attempt in range(retries):
-            try:
-                response = self.sendRequest.get(url, headers=headers).json()
-                tokenDistro = response['data']['tokens']
-                if tokenDistro:  
-                    break
-            except Exception:
-                time.sleep(1)
-            
-            try:
-                response = self.cloudScraper.get(url, headers=headers).json()
-                tokenDistro = response['data']['tokens']
-                if tokenDistro:
-                    break
-            except Exception:
-                time.sleep(1)
-        
+    @staticmethod
+    def summarizeTokenDistro(data: Optional[Dict[str, Any]]):
+        tokenDistro = (data or {}).get('tokens') or []
         if not tokenDistro:
             return {
                 "No Token Distribution Data": None
@@ -648,59 +863,37 @@ class EthWalletChecker:
         }
 
     def getWalletData(self, wallet: str, skipWallets: bool):
-        url = f"https://gmgn.ai/defi/quotation/v1/smartmoney/eth/walletNew/{wallet}?period=7d"
+        # Overlapping wallet lists (or several checkers in one process) share one lookup per wallet
+        return get_single_flight().do("gmgn_eth_wallet", (wallet.lower(), bool(skipWallets)),
+                                      self._fetchWalletData, wallet, skipWallets)
+
+    def _fetchWalletData(self, wallet: str, skipWallets: bool):
         headers = {
             "User-Agent": ua.random
         }
-        retries = 3
-        
-        for attempt in range(retries):
-            try:
-                response = self.sendRequest.get(url, headers=headers)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data['msg'] == "success":
-                        data = data['data']
-                        
-                        if skipWallets:
-                            if 'buy_30d' in data and isinstance(data['buy_30d'], (int, float)) and data['buy_30d'] > 0 and float(data['sol_balance']) >= 1.0:
-                                return self.processWalletData(wallet, data, headers)
-                            else:
-                                self.skippedWallets += 1
-                                print(f"[🐲] Skipped {self.skippedWallets} wallets", end="\r")
-                                return None
-                        else:
-                            return self.processWalletData(wallet, data, headers)
-            
-            except Exception:
-                print(f"[🐲] Error fetching data, trying backup...")
-            
-            try:
-                response = self.cloudScraper.get(url, headers=headers)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data['msg'] == "success":
-                        data = data['data']
-                        
-                        if skipWallets:
-                            if 'buy_30d' in data and isinstance(data['buy_30d'], (int, float)) and data['buy_30d'] > 0 and float(data['sol_balance']) >= 1.0:
-                                return self.processWalletData(wallet, data, headers)
-                            else:
-                                self.skippedWallets += 1
-                                print(f"[🐲] Skipped {self.skippedWallets} wallets", end="\r")
-                                return None
-                        else:
-                            return self.processWalletData(wallet, data, headers)
-            
-            except Exception:
-                print(f"[🐲] Backup scraper failed, retrying...")
-            
-            time.sleep(1)
-        
-        print(f"[🐲] Failed to fetch data for wallet {wallet} after {retries} attempts.")
-        return None
+        # The 7d stats, 30d stats and token distribution are independent, so they are fetched
+        # together - unless skipping, where most wallets are dropped on their 7d stats alone
+        urls = {
+            "7d": self._walletUrl(wallet, "7d"),
+            "30d": self._walletUrl(wallet, "30d"),
+            "distro": self._tokenDistroUrl(wallet),
+        }
+        fetched = self._hedgedFetch({"7d": urls.pop("7d")} if skipWallets else urls, headers)
+
+        data = fetched.get("7d")
+        if data is None:
+            print(f"[🐲] Failed to fetch data for wallet {wallet} after {Config.MAX_RETRIES} attempts.")
+            return None
+
+        if skipWallets:
+            if not ('buy_30d' in data and isinstance(data['buy_30d'], (int, float)) and data['buy_30d'] > 0 and float(data['sol_balance']) >= 1.0):
+                self.skippedWallets += 1
+                print(f"[🐲] Skipped {self.skippedWallets} wallets", end="\r")
+                return None
+            fetched.update(self._hedgedFetch(urls, headers))
+        return self.processWalletData(wallet, data, fetched.get("30d"), fetched.get("distro"))
 
-    def processWalletData(self, wallet, data, headers):
+    def processWalletData(self, wallet, data, winrate_30data=None, tokenDistroData=None):
         direct_link = f"https://gmgn.ai/eth/address/{wallet}"
         total_profit_percent = f"{data['total_profit_pnl'] * 100:.2f}%" if data['total_profit_pnl'] is not None else "error"
         realized_profit_7d_usd = f"${data['realized_profit_7d']:,.2f}" if data['realized_profit_7d'] is not None else "error"
@@ -708,13 +901,10 @@ class EthWalletChecker:
         winrate_7d = f"{data['winrate'] * 100:.2f}%" if data['winrate'] is not None else "?"
         sol_balance = f"{float(data['sol_balance']):.2f}" if data['sol_balance'] is not None else "?"
 
-        try:
-            winrate_30data = self.sendRequest.get(f"https://gmgn.ai/defi/quotation/v1/smartmoney/eth/walletNew/{wallet}?period=30d", headers=headers).json()['data']
-            winrate_30d = f"{winrate_30data['winrate'] * 100:.2f}%" if winrate_30data['winrate'] is not None else "?"
-        except Exception:
-            print(f"[🐲] Error fetching winrate 30d data, trying backup..")
-            winrate_30data = self.cloudScraper.get(f"https://gmgn.ai/defi/quotation/v1/smartmoney/eth/walletNew/{wallet}?period=30d", headers=headers).json()['data']
-            winrate_30d = f"{winrate_30data['winrate'] * 100:.2f}%" if winrate_30data['winrate'] is not None else "?"
+        if winrate_30data is not None and winrate_30data.get('winrate') is not None:
+            winrate_30d = f"{winrate_30data['winrate'] * 100:.2f}%"
+        else:
+            winrate_30d = "?"
 
         if "Skipped" in data.get("tags", []):
             return {
@@ -722,7 +912,7 @@ class EthWalletChecker:
                 "tags": ["Skipped"],
                 "directLink": direct_link
             }
-        tokenDistro = self.getTokenDistro(wallet)
+        tokenDistro = self.summarizeTokenDistro(tokenDistroData)
 
         try:
             tags = data['tags'] 
@@ -813,7 +1003,14 @@ class EthWalletChecker:
         Config.ensure_dir_exists(self.output_dir)
         
         # Process wallets
-        self.fetchWalletData(self.wallets, self.threads, self.skip_wallets)
+        try:
+            self.fetchWalletData(self.wallets, self.threads, self.skip_wallets)
+        finally:
+            # Backups that lost their race may still be running; let them finish on their own
+            with self._legLock:
+                if self._legPool is not None:
+                    self._legPool.shutdown(wait=False)
+                    self._legPool = None
         
         return True
 
@@ -837,7 +1034,7 @@ async def standalone_test(test_addresses: Optional[List[str]] = None) -> bool:
             
             # Clean up test files
             if success:
-                for file in test_output_dir.glob("wallet_analysis_*.json"):
+                for file in test_output_dir.glob("wallet_analysis_*.ndjson"):
                     try:
                         os.remove(file)
                     except Exception:
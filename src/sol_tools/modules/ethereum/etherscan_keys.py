@@ -0,0 +1,262 @@
+"""
+Pool of Etherscan API keys shared by the Ethereum modules.
+
+Etherscan's quota is per key and per second. Each key in the pool gets its own
+token bucket sized to its quota, and every call takes the key that can serve
+it soonest (picking among equally ready keys in proportion to their weight),
+so throughput grows with the number of keys owned. A key answering
+"Max rate limit reached" is cooled down with exponential backoff, and a
+rejected key is parked for an hour, while the other keys carry on.
+
+Keys come from the environment:
+
+- ``ETHEREUM_API_KEYS``: comma-separated ``KEY[:calls_per_second[:weight]]``
+- ``ETHEREUM_API_KEY``: a single key (added to the pool if not already listed)
+
+With no keys configured the pool holds one empty key, so calls still go out
+(under Etherscan's keyless limits).
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from ...core.http_client import RetryPolicy
+from ...core.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class EtherscanKeyConfig:
+    """Defaults for the Etherscan key pool."""
+
+    # Calls per second allowed per key (free-tier quota)
+    CALLS_PER_SECOND = 5
+
+    # Backoff after a "Max rate limit reached" answer (seconds)
+    COOLDOWN_BASE = 1.0
+    COOLDOWN_MAX = 60.0
+
+    # How long a rejected key is left alone (seconds)
+    INVALID_KEY_COOLDOWN = 3600
+
+    # Attempts per call and the backoff between them (seconds)
+    MAX_RETRIES = 3
+    RETRY_DELAY_MIN = 1.0
+    RETRY_DELAY_MAX = 3.0
+
+
+# Fragments of Etherscan's answers that say which key-level problem occurred
+RATE_LIMIT_MARKERS = ("max rate limit reached", "rate limit")
+INVALID_KEY_MARKERS = ("invalid api key", "missing/invalid api key")
+
+# Retry policy shared by every Etherscan call in the Ethereum modules
+RETRY_POLICY = RetryPolicy(max_retries=EtherscanKeyConfig.MAX_RETRIES,
+                           backoff_min=EtherscanKeyConfig.RETRY_DELAY_MIN,
+                           backoff_max=EtherscanKeyConfig.RETRY_DELAY_MAX)
+
+
+class EtherscanKey:
+    """One API key with its own rate budget and health."""
+
+    def __init__(self, key: str, rate: Optional[float] = None, weight: Optional[float] = None):
+        """
+        Args:
+            key: The API key ("" for keyless access)
+            rate: Calls per second the key is allowed
+            weight: Share of calls the key gets when several are ready (defaults to ``rate``)
+        """
+        self.key = key
+        self.rate = float(rate or EtherscanKeyConfig.CALLS_PER_SECOND)
+        self.weight = float(weight or self.rate)
+        self.limiter = RateLimiter(self.rate)
+        self.cooldown_until = 0.0
+        self.strikes = 0
+
+        # Stats
+        self.calls = 0
+        self.rate_limited = 0
+
+    @property
+    def label(self) -> str:
+        """The key with most of it masked, for logs."""
+        return f"{self.key[:4]}…" if self.key else "<keyless>"
+
+
+def parse_key_spec(spec: str) -> EtherscanKey:
+    """Parse ``KEY[:calls_per_second[:weight]]``."""
+    parts = [part.strip() for part in spec.split(":")]
+    rate = float(parts[1]) if len(parts) > 1 and parts[1] else None
+    weight = float(parts[2]) if len(parts) > 2 and parts[2] else None
+    return EtherscanKey(parts[0], rate, weight)
+
+
+def load_keys(env: Optional[Mapping[str, str]] = None) -> List[EtherscanKey]:
+    """Read the configured keys from the environment."""
+    env = os.environ if env is None else env
+    keys = []
+    for spec in env.get("ETHEREUM_API_KEYS", "").split(","):
+        if spec.strip():
+            try:
+                keys.append(parse_key_spec(spec))
+            except ValueError:
+                logger.warning(f"Ignoring malformed ETHEREUM_API_KEYS entry: {spec.split(':')[0][:4]}…")
+
+    single = env.get("ETHEREUM_API_KEY", "").strip()
+    if single and all(key.key != single for key in keys):
+        keys.append(EtherscanKey(single))
+
+    return keys or [EtherscanKey("")]
+
+
+def _answer_text(data: Dict[str, Any]) -> str:
+    # Etherscan puts the reason in "result" when "message" is just NOTOK
+    result = data.get('result')
+    return f"{data.get('message', '')} {result if isinstance(result, str) else ''}".lower()
+
+
+def is_rate_limited(data: Dict[str, Any]) -> bool:
+    """True if an Etherscan answer says the key is over its quota."""
+    return any(marker in _answer_text(data) for marker in RATE_LIMIT_MARKERS)
+
+
+def is_invalid_key(data: Dict[str, Any]) -> bool:
+    """True if an Etherscan answer rejects the key itself."""
+    return any(marker in _answer_text(data) for marker in INVALID_KEY_MARKERS)
+
+
+class EtherscanKeyPool:
+    """Hands out Etherscan keys within their per-second quotas."""
+
+    def __init__(self, keys: Optional[List[EtherscanKey]] = None):
+        """
+        Args:
+            keys: Keys to pool (read from the environment if omitted)
+        """
+        self.keys = keys if keys is not None else load_keys()
+        self._by_key = {key.key: key for key in self.keys}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _reserve(self) -> Tuple[EtherscanKey, float]:
+        with self._lock:
+            now = time.monotonic()
+            active = [key for key in self.keys if key.cooldown_until <= now]
+            if not active:
+                # Everything is cooling down; queue on the key that comes back first
+                key = min(self.keys, key=lambda key: key.cooldown_until)
+                key.calls += 1
+                return key, (key.cooldown_until - now) + key.limiter.reserve()
+
+            waits = [(key.limiter.ready_in(), key) for key in active]
+            ready = [key for wait, key in waits if wait == 0]
+            if ready:
+                key = random.choices(ready, weights=[key.weight for key in ready])[0]
+            else:
+                key = min(waits, key=lambda item: item[0])[1]
+            key.calls += 1
+            return key, key.limiter.reserve()
+
+    async def acquire(self) -> str:
+        """Wait for a key with room in its budget and return it."""
+        key, delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return key.key
+
+    def acquire_sync(self) -> str:
+        """Blocking variant of ``acquire`` for threaded callers."""
+        key, delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return key.key
+
+    def report(self, api_key: str, data: Dict[str, Any]) -> bool:
+        """
+        Record how Etherscan answered a call made with ``api_key``.
+
+        Returns:
+            True if the key was rate limited or rejected and has been cooled
+            down, so the call is worth retrying with another key
+        """
+        key = self._by_key.get(api_key)
+        if key is None or not isinstance(data, dict):
+            return False
+
+        with self._lock:
+            if is_rate_limited(data):
+                key.strikes += 1
+                key.rate_limited += 1
+                cooldown = min(EtherscanKeyConfig.COOLDOWN_MAX,
+                               EtherscanKeyConfig.COOLDOWN_BASE * 2 ** (key.strikes - 1))
+                key.cooldown_until = time.monotonic() + cooldown
+                logger.warning(f"Etherscan key {key.label} rate limited; cooling down for {cooldown:.0f}s")
+                return True
+            if is_invalid_key(data):
+                key.cooldown_until = time.monotonic() + EtherscanKeyConfig.INVALID_KEY_COOLDOWN
+                logger.error(f"Etherscan rejected key {key.label}; skipping it for an hour")
+                return len(self.keys) > 1
+            key.strikes = 0
+            return False
+
+    async def get(self, session: Any, url: str, params: Dict[str, Any],
+                  timeout: Any = None) -> Tuple[Any, Any]:
+        """
+        Send an Etherscan GET with a key from the pool.
+
+        If the answer says the key is rate limited or rejected, that key is
+        cooled down and the call goes out again straight away with another one,
+        up to ``RETRY_POLICY.max_retries`` times in all.
+
+        Args:
+            session: aiohttp session to send the request on
+            url: Etherscan API endpoint
+            params: Query parameters, without the API key
+            timeout: aiohttp timeout for each attempt
+
+        Returns:
+            (response, data): the read response and its decoded JSON answer,
+            with data None when the HTTP status is not 200
+        """
+        for attempt in RETRY_POLICY.attempts():
+            api_key = await self.acquire()
+            async with session.get(url, params={**params, 'apikey': api_key}, timeout=timeout) as response:
+                if response.status != 200:
+                    # Read the body so callers can still report it
+                    await response.read()
+                    return response, None
+                data = await response.json()
+            if not self.report(api_key, data) or RETRY_POLICY.is_last(attempt):
+                return response, data
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-key call counts and state."""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                "key": key.label,
+                "rate": key.rate,
+                "weight": key.weight,
+                "calls": key.calls,
+                "rate_limited": key.rate_limited,
+                "cooling_down": max(0.0, key.cooldown_until - now),
+            } for key in self.keys]
+
+
+_default_pool: Optional[EtherscanKeyPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_etherscan_keys() -> EtherscanKeyPool:
+    """Return the process-wide Etherscan key pool."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = EtherscanKeyPool()
+        return _default_pool
@@ -0,0 +1,311 @@
+"""
+Single-pass crawler for GMGN's Ethereum trade history.
+
+GMGN pages trades newest first behind an opaque cursor, so the pages have to be
+walked in order. The crawler fetches every page exactly once and requests the
+next page while the caller is still processing the current one. Trades are
+streamed to disk as they arrive, and a small checkpoint under
+``CACHE_DIR/ethereum/crawls`` records the cursor and the output file offsets
+after each page, so an interrupted crawl of a large contract picks up where it
+left off. Pages of recently crawled contracts are kept in memory for a few
+minutes, so repeated searches over the same contract barely touch the network.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from ...core.config import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# GMGN trade history endpoint for Ethereum contracts
+TRADES_URL = "https://gmgn.ai/defi/quotation/v1/trades/eth"
+
+# Trades per page (GMGN's maximum)
+PAGE_LIMIT = 100
+
+# Where crawl checkpoints are kept
+CHECKPOINT_DIR = CACHE_DIR / "ethereum" / "crawls"
+
+# Recently crawled contracts whose pages are kept in memory
+PAGE_CACHE_CONTRACTS = 16
+
+# How long a contract's cached pages stay fresh (seconds)
+PAGE_CACHE_TTL = 300
+
+
+class TradePage:
+    """One page of trades and the cursors around it."""
+
+    def __init__(self, trades: List[Dict[str, Any]], cursor: Optional[str],
+                 next_cursor: Optional[str], failed: bool = False):
+        self.trades = trades
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        # True when the page could not be fetched (as opposed to the history ending)
+        self.failed = failed
+
+
+def trades_url(contract_address: str, cursor: Optional[str] = None, limit: int = PAGE_LIMIT) -> str:
+    """Build the URL of one trade history page."""
+    url = f"{TRADES_URL}/{contract_address}?limit={limit}"
+    return f"{url}&cursor={cursor}" if cursor else url
+
+
+def crawl_trade_pages(fetch: Callable[[str], Dict[str, Any]], contract_address: str,
+                      cursor: Optional[str] = None, cache: Optional["TradePageCache"] = None,
+                      stop: Optional[Callable[[List[Dict[str, Any]]], bool]] = None) -> Iterator[TradePage]:
+    """
+    Walk a contract's trade history once, newest first.
+
+    While the caller processes a page the next one is already being fetched.
+    The crawl ends when a page comes back empty, has no next cursor, fails,
+    ``stop`` returns True for its trades, or the caller stops iterating.
+
+    Args:
+        fetch: Function returning the parsed JSON for a URL ({} on failure)
+        contract_address: Token contract to crawl
+        cursor: Cursor to start from (None for the newest page)
+        cache: Page cache to read from and fill (None to always fetch)
+        stop: Predicate on a page's trades; True ends the crawl after that page
+              without requesting the next one
+
+    Yields:
+        TradePage objects in cursor order
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trade-prefetch")
+    try:
+        future: Optional[Future] = executor.submit(_fetch_page, fetch, contract_address, cursor, cache)
+        while future is not None:
+            response = future.result() or {}
+            data = response.get('data')
+            if not isinstance(data, dict):
+                yield TradePage([], cursor, cursor, failed=True)
+                return
+
+            trades = data.get('history') or []
+            next_cursor = data.get('next') if trades else None
+            if next_cursor and stop is not None and stop(trades):
+                next_cursor = None
+
+            # Start on the next page before handing this one over
+            future = executor.submit(_fetch_page, fetch, contract_address, next_cursor, cache) if next_cursor else None
+            yield TradePage(trades, cursor, next_cursor)
+            cursor = next_cursor
+    finally:
+        # Don't wait for a prefetch the caller no longer needs
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _fetch_page(fetch: Callable[[str], Dict[str, Any]], contract_address: str,
+                cursor: Optional[str], cache: Optional["TradePageCache"]) -> Dict[str, Any]:
+    if cache is not None:
+        cached = cache.get(contract_address, cursor)
+        if cached is not None:
+            return cached
+    response = fetch(trades_url(contract_address, cursor)) or {}
+    if cache is not None and isinstance(response.get('data'), dict):
+        cache.put(contract_address, cursor, response)
+    return response
+
+
+# ---------------------------------------------------------------------------
+# Page cache
+# ---------------------------------------------------------------------------
+class TradePageCache:
+    """
+    Short-lived in-memory cache of trade pages for recently crawled contracts.
+
+    A contract's pages form one snapshot that expires as a whole, so a crawl
+    never stitches together pages fetched on either side of new trades
+    shifting the cursors. The least recently used contract is dropped first.
+    """
+
+    def __init__(self, max_contracts: int = PAGE_CACHE_CONTRACTS, ttl: float = PAGE_CACHE_TTL):
+        self.max_contracts = max_contracts
+        self.ttl = ttl
+        # contract -> (snapshot start time, {cursor: response})
+        self._snapshots: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+    def _snapshot(self, contract: str) -> Optional[Dict[Optional[str], Dict[str, Any]]]:
+        entry = self._snapshots.get(contract)
+        if entry is None:
+            return None
+        if time.time() - entry[0] >= self.ttl:
+            del self._snapshots[contract]
+            return None
+        self._snapshots.move_to_end(contract)
+        return entry[1]
+
+    def get(self, contract_address: str, cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a page, or None."""
+        with self._lock:
+            pages = self._snapshot(contract_address.lower())
+            response = pages.get(cursor) if pages is not None else None
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return response
+
+    def put(self, contract_address: str, cursor: Optional[str], response: Dict[str, Any]) -> None:
+        """Cache one page. Refetching the newest page starts a new snapshot."""
+        contract = contract_address.lower()
+        with self._lock:
+            pages = self._snapshot(contract)
+            if pages is None or cursor is None:
+                pages = {}
+                self._snapshots[contract] = (time.time(), pages)
+                self._snapshots.move_to_end(contract)
+                while len(self._snapshots) > self.max_contracts:
+                    self._snapshots.popitem(last=False)
+            pages[cursor] = response
+
+    def invalidate(self, contract_address: Optional[str] = None) -> None:
+        """Drop one contract's pages, or everything."""
+        with self._lock:
+            if contract_address is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(contract_address.lower(), None)
+
+
+_page_cache: Optional[TradePageCache] = None
+_page_cache_lock = threading.Lock()
+
+
+def get_trade_page_cache() -> TradePageCache:
+    """Return the process-wide trade page cache."""
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = TradePageCache()
+        return _page_cache
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints
+# ---------------------------------------------------------------------------
+class CrawlCheckpoint:
+    """Resumable state of one crawl, stored as a small JSON file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    @classmethod
+    def for_contract(cls, kind: str, contract_address: str, root: Optional[Path] = None) -> "CrawlCheckpoint":
+        """Checkpoint for crawling ``contract_address`` with a given kind of crawl."""
+        return cls((root or CHECKPOINT_DIR) / f"{kind}_{contract_address.lower()}.json")
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Return the saved state, or None if there is nothing to resume."""
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable crawl checkpoint {self.path}: {e}")
+            return None
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """Atomically replace the saved state."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({**state, "updated": int(time.time())}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Forget the crawl once it has finished."""
+        if self.path.exists():
+            self.path.unlink()
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+class TradeStreamWriter:
+    """
+    Streams maker wallets (one per line) and, optionally, full trade records
+    (a JSON array, one trade per line) to disk as pages arrive.
+
+    ``offsets()`` captures how far both files have been written; reopening with
+    those offsets truncates anything written after them, so a resumed crawl
+    continues the same files without duplicates.
+    """
+
+    def __init__(self, wallets_path: Union[str, Path], trades_path: Optional[Union[str, Path]] = None,
+                 resume_from: Optional[Dict[str, int]] = None):
+        """
+        Open the output files.
+
+        Args:
+            wallets_path: Text file receiving one maker wallet per trade
+            trades_path: JSON file receiving the full trades (None to skip)
+            resume_from: Offsets from a previous ``offsets()`` call to continue from
+        """
+        self.wallets_path = Path(wallets_path)
+        self.trades_path = Path(trades_path) if trades_path else None
+        self.wallets_path.parent.mkdir(parents=True, exist_ok=True)
+
+        resume_from = resume_from or {}
+        self.trades_written = resume_from.get("count", 0)
+        self._wallets = self._open(self.wallets_path, resume_from.get("wallets"))
+        self._trades = None
+        if self.trades_path is not None:
+            self._trades = self._open(self.trades_path, resume_from.get("trades"))
+            if self._trades.tell() == 0:
+                self._trades.write(b"[")
+        self._closed = False
+
+    @staticmethod
+    def _open(path: Path, offset: Optional[int]):
+        if offset is None or not path.exists():
+            return open(path, 'wb')
+        f = open(path, 'r+b')
+        f.truncate(offset)
+        f.seek(offset)
+        return f
+
+    def write_trades(self, trades: List[Dict[str, Any]]) -> None:
+        """Append one page of trades."""
+        if not trades:
+            return
+        makers = [str(trade.get("maker")) for trade in trades]
+        self._wallets.write(("\n".join(makers) + "\n").encode())
+        if self._trades is not None:
+            separator = ",\n" if self.trades_written else "\n"
+            self._trades.write((separator + ",\n".join(json.dumps(trade) for trade in trades)).encode())
+        self.trades_written += len(trades)
+
+    def offsets(self) -> Dict[str, int]:
+        """Flush and return the current file positions for a checkpoint."""
+        self._wallets.flush()
+        offsets = {"wallets": self._wallets.tell(), "count": self.trades_written}
+        if self._trades is not None:
+            self._trades.flush()
+            offsets["trades"] = self._trades.tell()
+        return offsets
+
+    def close(self) -> None:
+        """Finish the JSON array and close both files."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wallets.close()
+        if self._trades is not None:
+            self._trades.write(b"\n]\n")
+            self._trades.close()
@@ -0,0 +1,226 @@
+"""
+Streaming top-trader aggregation for Ethereum token transfers.
+
+Full-history crawls produce millions of transfers, far too many to keep as
+dicts and loop over in Python. Each page of transfers is decoded into numpy
+arrays as it arrives: addresses become small integer ids, and values are scaled
+by their decimals in one vectorized step. The page is then folded into running
+per-address counters and dropped. Memory grows with the number of distinct
+traders, not the number of transfers, and the top traders are selected with a
+partial sort instead of sorting every trader.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class AddressInterner:
+    """Maps addresses to dense integer ids and back."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.addresses: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    @classmethod
+    def from_addresses(cls, addresses: List[str]) -> "AddressInterner":
+        """Rebuild a table whose ids are the positions in ``addresses``."""
+        interner = cls()
+        interner.addresses = list(addresses)
+        interner._ids = {address: address_id for address_id, address in enumerate(interner.addresses)}
+        return interner
+
+    def intern(self, addresses: List[str]) -> np.ndarray:
+        """
+        Return the id of every address in a list, assigning new ids as needed.
+
+        Empty addresses get id -1. The list is factorized in one hashing pass,
+        so only its distinct addresses touch the Python-level table.
+        """
+        if len(addresses) == 0:
+            return np.empty(0, dtype=np.int64)
+        codes, uniques = pd.factorize(pd.Series(addresses, dtype=object))
+        unique_ids = np.empty(len(uniques), dtype=np.int64)
+        for i, address in enumerate(uniques):
+            if not address:
+                unique_ids[i] = -1
+                continue
+            address_id = self._ids.get(address)
+            if address_id is None:
+                address_id = self._ids[address] = len(self.addresses)
+                self.addresses.append(address)
+            unique_ids[i] = address_id
+        return unique_ids[codes]
+
+
+class TransferBatch:
+    """One page of transfers decoded into parallel arrays."""
+
+    __slots__ = ("from_ids", "to_ids", "amounts", "timestamps")
+
+    def __init__(self, from_ids: np.ndarray, to_ids: np.ndarray, amounts: np.ndarray, timestamps: np.ndarray):
+        self.from_ids = from_ids
+        self.to_ids = to_ids
+        self.amounts = amounts
+        self.timestamps = timestamps
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def select(self, mask: np.ndarray) -> "TransferBatch":
+        """Keep only the transfers where ``mask`` is True."""
+        return TransferBatch(self.from_ids[mask], self.to_ids[mask], self.amounts[mask], self.timestamps[mask])
+
+
+def decode_transfers(transfers: List[Dict[str, Any]], interner: AddressInterner) -> TransferBatch:
+    """
+    Decode Etherscan ``tokentx`` rows into arrays.
+
+    Args:
+        transfers: Transfer dicts as returned by Etherscan
+        interner: Address table shared by every batch of the aggregation
+
+    Returns:
+        The decoded batch (amounts are scaled by each row's token decimals)
+    """
+    if not transfers:
+        empty = np.empty(0, dtype=np.int64)
+        return TransferBatch(empty, empty, np.empty(0, dtype=np.float64), empty)
+
+    count = len(transfers)
+    from_ids = interner.intern([tx.get("from") or "" for tx in transfers])
+    to_ids = interner.intern([tx.get("to") or "" for tx in transfers])
+    # Raw values can exceed 64 bits, so they are parsed straight to floats
+    raw = np.fromiter(map(float, (tx.get("value") or "0" for tx in transfers)), dtype=np.float64, count=count)
+    decimals = np.fromiter(map(int, (tx.get("tokenDecimal") or "0" for tx in transfers)), dtype=np.int64, count=count)
+    timestamps = np.fromiter(map(int, (tx.get("timeStamp") or "0" for tx in transfers)), dtype=np.int64, count=count)
+    return TransferBatch(from_ids, to_ids, raw / np.power(10.0, decimals), timestamps)
+
+
+class TraderAggregator:
+    """
+    Running per-address volume, transaction, buy and sell counters.
+
+    Every transfer counts for both sides: the sender's and the receiver's
+    transaction count and volume grow, the receiver gets a buy and the sender a
+    sell (a transfer to oneself counts as two buys).
+    """
+
+    def __init__(self, since: Optional[int] = None, interner: Optional[AddressInterner] = None):
+        """
+        Args:
+            since: Ignore transfers with an older UNIX timestamp
+            interner: Address table to use (a new one by default)
+        """
+        self.since = since
+        self.interner = interner or AddressInterner()
+        self.volume = np.zeros(0, dtype=np.float64)
+        self.transactions = np.zeros(0, dtype=np.int64)
+        self.buys = np.zeros(0, dtype=np.int64)
+        self.sells = np.zeros(0, dtype=np.int64)
+        self.total_transactions = 0
+
+    def _grow(self, size: int) -> None:
+        if size <= len(self.volume):
+            return
+        # Grow geometrically so appending traders stays amortized O(1)
+        capacity = max(size, 2 * len(self.volume), 1024)
+        for name in ("volume", "transactions", "buys", "sells"):
+            counters = getattr(self, name)
+            grown = np.zeros(capacity, dtype=counters.dtype)
+            grown[:len(counters)] = counters
+            setattr(self, name, grown)
+
+    def add(self, transfers: List[Dict[str, Any]]) -> int:
+        """
+        Fold one page of transfers into the counters.
+
+        Returns:
+            The number of transfers counted (after the ``since`` filter)
+        """
+        return self.add_batch(decode_transfers(transfers, self.interner))
+
+    def add_batch(self, batch: TransferBatch) -> int:
+        """Fold an already decoded batch into the counters."""
+        if self.since is not None and len(batch):
+            batch = batch.select(batch.timestamps >= self.since)
+        if not len(batch):
+            return 0
+        self._grow(len(self.interner))
+        size = len(self.volume)
+
+        self_transfer = batch.from_ids == batch.to_ids
+        for ids, buys in ((batch.from_ids, self_transfer), (batch.to_ids, None)):
+            valid = ids >= 0
+            ids = ids[valid]
+            self.transactions += np.bincount(ids, minlength=size)
+            self.volume += np.bincount(ids, weights=batch.amounts[valid], minlength=size)
+            if buys is None:
+                self.buys += np.bincount(ids, minlength=size)
+            else:
+                self.buys += np.bincount(ids, weights=buys[valid], minlength=size).astype(np.int64)
+                self.sells += np.bincount(ids, weights=~buys[valid], minlength=size).astype(np.int64)
+
+        self.total_transactions += len(batch)
+        return len(batch)
+
+    def add_counters(self, ids: np.ndarray, volume: np.ndarray, transactions: np.ndarray,
+                     buys: np.ndarray, sells: np.ndarray, transfers: int) -> None:
+        """
+        Fold precomputed per-address counters into the totals.
+
+        Args:
+            ids: Address ids (may repeat)
+            volume, transactions, buys, sells: Counter values for each id
+            transfers: Number of transfers the counters were computed from
+        """
+        if len(ids):
+            self._grow(len(self.interner))
+            size = len(self.volume)
+            self.volume += np.bincount(ids, weights=volume, minlength=size)
+            for name, values in (("transactions", transactions), ("buys", buys), ("sells", sells)):
+                counters = getattr(self, name)
+                counters += np.bincount(ids, weights=values, minlength=size).astype(np.int64)
+        self.total_transactions += int(transfers)
+
+    def extend(self, pages: Iterable[List[Dict[str, Any]]]) -> None:
+        """Fold several pages of transfers into the counters."""
+        for page in pages:
+            self.add(page)
+
+    @property
+    def total_traders(self) -> int:
+        """Number of addresses with at least one counted transfer."""
+        return int(np.count_nonzero(self.transactions))
+
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        """
+        Return the ``k`` traders with the highest volume, highest first.
+
+        Only the top ``k`` are ever sorted; the rest are split off with a
+        linear-time partition.
+        """
+        active = np.flatnonzero(self.transactions)
+        if k <= 0 or len(active) == 0:
+            return []
+        volumes = self.volume[active]
+        if len(active) > k:
+            picked = np.argpartition(-volumes, k - 1)[:k]
+        else:
+            picked = np.arange(len(active))
+        picked = picked[np.argsort(-volumes[picked], kind="stable")]
+
+        return [{
+            "address": self.interner.addresses[address_id],
+            "volume": float(self.volume[address_id]),
+            "transactions": int(self.transactions[address_id]),
+            "buys": int(self.buys[address_id]),
+            "sells": int(self.sells[address_id]),
+        } for address_id in active[picked].tolist()]
@@ -0,0 +1,242 @@
+"""
+Persisted top-trader state for incremental refreshes.
+
+Ranking a token's top traders from scratch means crawling every transfer in
+the window again, although a daily refresh only adds a day of new ones. A
+``TraderState`` keeps per-address counters bucketed by UTC day together with
+the last block folded into them (the high-water mark). A refresh fetches only
+the transfers after that block, drops the day buckets that have left the
+window and ranks what remains.
+
+States are kept under ``CACHE_DIR/ethereum/traders`` as one compressed archive
+per token. The counters and the high-water mark are written together and the
+archive is replaced atomically, so a crash can never make a later run count
+the same transfers twice.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ...core.config import CACHE_DIR
+from .trader_aggregator import AddressInterner, TraderAggregator, decode_transfers
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+
+# Where per-token states are kept
+TRADER_STATE_DIR = CACHE_DIR / "ethereum" / "traders"
+
+# One row per (day, address) pair
+BUCKET_COLUMNS = ("day", "address_id", "volume", "transactions", "buys", "sells")
+
+# Pending rows are merged into the buckets once there are this many (or as many as buckets)
+CONSOLIDATE_ROWS = 100000
+
+
+def day_of(timestamp: int) -> int:
+    """UTC day number of a UNIX timestamp."""
+    return int(timestamp) // SECONDS_PER_DAY
+
+
+def _empty_buckets() -> Dict[str, np.ndarray]:
+    return {name: np.empty(0, dtype=np.float64 if name == "volume" else np.int64) for name in BUCKET_COLUMNS}
+
+
+class TraderState:
+    """
+    Day-bucketed trader counters for one token and the block they reach.
+
+    Counting follows ``TraderAggregator``: both sides of a transfer get a
+    transaction and its volume, the receiver a buy and the sender a sell.
+    """
+
+    def __init__(self, token_address: str, interner: Optional[AddressInterner] = None,
+                 last_block: Optional[int] = None, first_day: Optional[int] = None):
+        """
+        Args:
+            token_address: Token the counters belong to
+            interner: Address table the bucket ids refer to
+            last_block: Highest block whose transfers are all counted (None if nothing is)
+            first_day: Oldest day whose transfers are all counted (older ones are ignored)
+        """
+        self.token_address = token_address.lower()
+        self.interner = interner or AddressInterner()
+        self.last_block = last_block
+        self.first_day = first_day
+        self.buckets = _empty_buckets()
+        # Transfers per day, for the window's transaction total
+        self.day_transfers: Dict[int, int] = {}
+
+        self._pending: List[Dict[str, np.ndarray]] = []
+        self._pending_rows = 0
+
+    def add(self, transfers: List[Dict[str, Any]]) -> int:
+        """
+        Fold one page of transfers into the day buckets.
+
+        Returns:
+            The number of transfers counted (those before ``first_day`` are skipped)
+        """
+        batch = decode_transfers(transfers, self.interner)
+        if self.first_day is not None and len(batch):
+            batch = batch.select(batch.timestamps >= self.first_day * SECONDS_PER_DAY)
+        if not len(batch):
+            return 0
+
+        days = batch.timestamps // SECONDS_PER_DAY
+        self_transfer = (batch.from_ids == batch.to_ids).astype(np.int64)
+        received = np.ones(len(batch), dtype=np.int64)
+        for ids, buys in ((batch.from_ids, self_transfer), (batch.to_ids, received)):
+            valid = ids >= 0
+            rows = {
+                "day": days[valid],
+                "address_id": ids[valid],
+                "volume": batch.amounts[valid],
+                "transactions": received[valid],
+                "buys": buys[valid],
+                "sells": 1 - buys[valid],
+            }
+            self._pending.append(rows)
+            self._pending_rows += len(rows["day"])
+
+        for day, count in zip(*np.unique(days, return_counts=True)):
+            self.day_transfers[int(day)] = self.day_transfers.get(int(day), 0) + int(count)
+
+        if self._pending_rows >= max(CONSOLIDATE_ROWS, len(self.buckets["day"])):
+            self.consolidate()
+        return len(batch)
+
+    def consolidate(self) -> None:
+        """Merge pending rows into the buckets, one row per (day, address)."""
+        if not self._pending:
+            return
+        combined = {name: np.concatenate([self.buckets[name]] + [rows[name] for rows in self._pending])
+                    for name in BUCKET_COLUMNS}
+        self._pending = []
+        self._pending_rows = 0
+
+        keys = (combined["day"] << 32) | combined["address_id"]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        merged = {
+            "day": unique_keys >> 32,
+            "address_id": unique_keys & 0xFFFFFFFF,
+            "volume": np.bincount(inverse, weights=combined["volume"], minlength=len(unique_keys)),
+        }
+        for name in ("transactions", "buys", "sells"):
+            merged[name] = np.bincount(inverse, weights=combined[name], minlength=len(unique_keys)).astype(np.int64)
+        self.buckets = merged
+
+    def expire(self, first_day: int) -> None:
+        """
+        Drop the buckets of days before ``first_day``.
+
+        Addresses left without any bucket are dropped from the address table
+        too, so the state does not grow with every trader ever seen.
+        """
+        self.consolidate()
+        keep = self.buckets["day"] >= first_day
+        buckets = {name: column[keep] for name, column in self.buckets.items()}
+        self.day_transfers = {day: count for day, count in self.day_transfers.items() if day >= first_day}
+        self.first_day = first_day if self.first_day is None else max(self.first_day, first_day)
+
+        used, remapped = np.unique(buckets["address_id"], return_inverse=True)
+        if len(used) < len(self.interner):
+            addresses = self.interner.addresses
+            self.interner = AddressInterner.from_addresses([addresses[i] for i in used.tolist()])
+            buckets["address_id"] = remapped.astype(np.int64)
+        self.buckets = buckets
+
+    def aggregate(self, first_day: Optional[int] = None) -> TraderAggregator:
+        """Sum the buckets from ``first_day`` on into per-address totals."""
+        self.consolidate()
+        buckets = self.buckets
+        if first_day is not None:
+            keep = buckets["day"] >= first_day
+            buckets = {name: column[keep] for name, column in buckets.items()}
+
+        aggregator = TraderAggregator(interner=self.interner)
+        transfers = sum(count for day, count in self.day_transfers.items() if first_day is None or day >= first_day)
+        aggregator.add_counters(buckets["address_id"], buckets["volume"], buckets["transactions"],
+                                buckets["buys"], buckets["sells"], transfers)
+        return aggregator
+
+
+class TraderStateStore:
+    """On-disk home of the per-token trader states."""
+
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Args:
+            root: Directory holding the state archives (defaults to CACHE_DIR/ethereum/traders)
+        """
+        self.root = Path(root) if root else TRADER_STATE_DIR
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, token_address: str) -> Path:
+        return self.root / f"{token_address.lower()}.npz"
+
+    def load(self, token_address: str) -> TraderState:
+        """Load a token's state (an empty one if none is stored or it is unreadable)."""
+        path = self._path(token_address)
+        with self._lock:
+            if not path.exists():
+                return TraderState(token_address)
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    last_block = int(data["last_block"])
+                    first_day = int(data["first_day"])
+                    state = TraderState(
+                        token_address,
+                        interner=AddressInterner.from_addresses(data["addresses"].tolist()),
+                        last_block=last_block if last_block >= 0 else None,
+                        first_day=first_day if first_day >= 0 else None,
+                    )
+                    state.buckets = {name: data[name] for name in BUCKET_COLUMNS}
+                    state.day_transfers = dict(zip(data["transfer_days"].tolist(), data["transfer_counts"].tolist()))
+                    return state
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable trader state for {token_address}: {e}")
+                return TraderState(token_address)
+
+    def save(self, state: TraderState) -> None:
+        """Write a token's state, replacing the stored one atomically."""
+        state.consolidate()
+        days = sorted(state.day_transfers)
+        path = self._path(state.token_address)
+        tmp_path = path.with_name(path.stem + ".tmp.npz")
+        with self._lock:
+            np.savez_compressed(
+                tmp_path,
+                addresses=np.array(state.interner.addresses, dtype=str),
+                last_block=np.int64(-1 if state.last_block is None else state.last_block),
+                first_day=np.int64(-1 if state.first_day is None else state.first_day),
+                transfer_days=np.array(days, dtype=np.int64),
+                transfer_counts=np.array([state.day_transfers[day] for day in days], dtype=np.int64),
+                **state.buckets,
+            )
+            os.replace(tmp_path, path)
+
+    def delete(self, token_address: str) -> None:
+        """Forget a token's state."""
+        with self._lock:
+            self._path(token_address).unlink(missing_ok=True)
+
+
+_default_store: Optional[TraderStateStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_trader_state_store() -> TraderStateStore:
+    """Return the process-wide trader state store rooted in CACHE_DIR/ethereum."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TraderStateStore()
+        return _default_store
@@ -0,0 +1,272 @@
+"""
+Incremental per-wallet transaction histories for the Ethereum modules.
+
+A wallet's ``txlist`` never changes below the chain head, yet every check
+used to download it again from block 0. A ``WalletHistory`` keeps the
+transactions already seen for one wallet and the block range they cover
+completely, so a later run only asks Etherscan for ``startblock = last_block + 1``.
+Rows are kept in time order next to an array of their timestamps, so a time
+range is found with two binary searches instead of a scan.
+
+Histories live under ``CACHE_DIR/ethereum/wallets``, one gzipped file per
+wallet. Field names are written once per file and each transaction as a plain
+list of values, which keeps caches of tens of thousands of wallets small.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ...core.config import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Where wallet histories are kept
+WALLET_HISTORY_DIR = CACHE_DIR / "ethereum" / "wallets"
+
+# Etherscan returns at most this many rows for one query
+HISTORY_PAGE_SIZE = 10000
+
+# Highest block Etherscan accepts as an open end
+LATEST_BLOCK = 99999999
+
+# Fetches one ascending page of a block range: (start_block, end_block) -> {"status", "result"}
+FetchRange = Callable[[int, int], Awaitable[Dict[str, Any]]]
+
+
+def _int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class WalletHistory:
+    """The transactions seen for one wallet and the blocks they cover."""
+
+    def __init__(self, address: str, fields: Optional[List[str]] = None, rows: Optional[List[List[Any]]] = None,
+                 first_block: int = 0, last_block: int = -1, updated: Optional[int] = None):
+        """
+        Args:
+            address: Wallet address
+            fields: Transaction field names, in the order of each row's values
+            rows: Transactions as lists of values
+            first_block: Every transaction from this block on is held...
+            last_block: ...up to and including this one (-1 when nothing is held)
+            updated: UNIX time of the last sync (None if never synced)
+        """
+        self.address = address.lower()
+        self.fields: List[str] = list(fields or [])
+        self.rows: List[List[Any]] = list(rows or [])
+        self.first_block = first_block
+        self.last_block = last_block
+        self.updated = updated
+        self._reindex()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _column(self, name: str) -> np.ndarray:
+        if name not in self.fields:
+            return np.zeros(len(self.rows), dtype=np.int64)
+        i = self.fields.index(name)
+        return np.fromiter((_int(row[i]) for row in self.rows), dtype=np.int64, count=len(self.rows))
+
+    def _reindex(self) -> None:
+        # Blocks are mined in time order, so this is also block order
+        timestamps = self._column("timeStamp")
+        order = np.lexsort((self._column("transactionIndex"), self._column("blockNumber"), timestamps))
+        if len(order) and np.any(order != np.arange(len(order))):
+            self.rows = [self.rows[i] for i in order.tolist()]
+        self.timestamps = timestamps[order]
+
+    def merge(self, transactions: List[Dict[str, Any]]) -> int:
+        """
+        Add transactions not held yet (matched by hash).
+
+        Returns:
+            The number of transactions added
+        """
+        hash_index = self.fields.index("hash") if "hash" in self.fields else None
+        seen = {row[hash_index] for row in self.rows} if hash_index is not None else set()
+
+        added = 0
+        for tx in transactions:
+            tx_hash = tx.get("hash")
+            if tx_hash in seen:
+                continue
+            seen.add(tx_hash)
+            for name in tx:
+                if name not in self.fields:
+                    self.fields.append(name)
+                    for row in self.rows:
+                        row.append(None)
+            self.rows.append([tx.get(name) for name in self.fields])
+            added += 1
+
+        if added:
+            self._reindex()
+        return added
+
+    def _as_dict(self, row: List[Any]) -> Dict[str, Any]:
+        return {name: value for name, value in zip(self.fields, row) if value is not None}
+
+    def transactions(self, start: Optional[int] = None, end: Optional[int] = None,
+                     newest_first: bool = False) -> List[Dict[str, Any]]:
+        """
+        Return the transactions with ``start <= timeStamp <= end``.
+
+        Args:
+            start: Earliest UNIX timestamp (None for no bound)
+            end: Latest UNIX timestamp (None for no bound)
+            newest_first: Order the result like Etherscan's ``sort=desc``
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, start, side='left'))
+        hi = len(self.rows) if end is None else int(np.searchsorted(self.timestamps, end, side='right'))
+        picked = range(hi - 1, lo - 1, -1) if newest_first else range(lo, hi)
+        return [self._as_dict(self.rows[i]) for i in picked]
+
+    def latest(self, count: int) -> List[Dict[str, Any]]:
+        """Return the newest ``count`` transactions, newest first."""
+        return [self._as_dict(row) for row in reversed(self.rows[-count:])] if count > 0 else []
+
+    def seed(self, transactions: List[Dict[str, Any]], limit: int) -> None:
+        """
+        Start the history from a ``sort=desc`` query for the newest ``limit`` transactions.
+
+        A full answer may have cut the oldest block short, so coverage starts
+        at the block after it; a short answer is the wallet's whole history.
+        """
+        self.merge(transactions)
+        blocks = [_int(tx.get("blockNumber")) for tx in transactions]
+        self.first_block = min(blocks) + 1 if len(transactions) >= limit and blocks else 0
+        self.last_block = max(blocks, default=self.last_block)
+        self.updated = int(time.time())
+
+
+async def fetch_block_range(fetch: FetchRange, low: int, high: int = LATEST_BLOCK,
+                            page_size: int = HISTORY_PAGE_SIZE) -> Optional[List[Dict[str, Any]]]:
+    """
+    Fetch every transaction between two blocks, oldest first.
+
+    A page that comes back full may have cut its last block short, so the next
+    page starts again at that block and the partial copy is dropped.
+
+    Returns:
+        The transactions, or None if a page could not be fetched
+    """
+    transactions: List[Dict[str, Any]] = []
+    start = low
+    while start <= high:
+        result = await fetch(start, high)
+        if result.get("status") != "success":
+            return None
+        page = result.get("result", [])
+        if len(page) < page_size:
+            transactions.extend(page)
+            break
+
+        last_block = _int(page[-1].get("blockNumber"))
+        complete = [tx for tx in page if _int(tx.get("blockNumber")) < last_block]
+        if not complete:
+            # One block holds a whole page; keep it rather than loop on it
+            logger.warning(f"Block {last_block} has over {page_size} transactions; keeping the first {page_size}")
+            complete, last_block = page, last_block + 1
+        transactions.extend(complete)
+        start = last_block
+    return transactions
+
+
+async def refresh_history(history: WalletHistory, fetch: FetchRange, backfill: bool = True,
+                          page_size: int = HISTORY_PAGE_SIZE) -> bool:
+    """
+    Bring a history up to date.
+
+    Only the blocks after ``last_block`` are requested. With ``backfill`` the
+    blocks before ``first_block`` are fetched too, so the history is complete.
+
+    Returns:
+        False if a range could not be fetched (the history is left unchanged)
+    """
+    newer = await fetch_block_range(fetch, history.last_block + 1, page_size=page_size)
+    if newer is None:
+        return False
+
+    older: List[Dict[str, Any]] = []
+    if backfill and history.first_block > 0:
+        older = await fetch_block_range(fetch, 0, history.first_block - 1, page_size=page_size)
+        if older is None:
+            return False
+        history.first_block = 0
+
+    history.merge(older + newer)
+    history.last_block = max([history.last_block] + [_int(tx.get("blockNumber")) for tx in newer])
+    history.updated = int(time.time())
+    return True
+
+
+class WalletHistoryStore:
+    """On-disk home of the per-wallet histories."""
+
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Args:
+            root: Directory holding the history files (defaults to CACHE_DIR/ethereum/wallets)
+        """
+        self.root = Path(root) if root else WALLET_HISTORY_DIR
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, address: str) -> Path:
+        return self.root / f"{address.lower()}.json.gz"
+
+    def load(self, address: str) -> WalletHistory:
+        """Load a wallet's history (an empty one if none is stored or it is unreadable)."""
+        path = self._path(address)
+        if not path.exists():
+            return WalletHistory(address)
+        try:
+            with gzip.open(path, 'rt') as f:
+                data = json.load(f)
+            return WalletHistory(address, data["fields"], data["rows"], data["first_block"],
+                                 data["last_block"], data.get("updated"))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable history for {address}: {e}")
+            return WalletHistory(address)
+
+    def save(self, history: WalletHistory) -> None:
+        """Write a wallet's history, replacing the stored one atomically."""
+        path = self._path(history.address)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        data = {
+            "address": history.address,
+            "fields": history.fields,
+            "rows": history.rows,
+            "first_block": history.first_block,
+            "last_block": history.last_block,
+            "updated": history.updated,
+        }
+        with gzip.open(tmp_path, 'wt') as f:
+            json.dump(data, f, separators=(',', ':'))
+        with self._lock:
+            os.replace(tmp_path, path)
+
+
+_default_store: Optional[WalletHistoryStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_wallet_history_store() -> WalletHistoryStore:
+    """Return the process-wide wallet history store rooted in CACHE_DIR/ethereum."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = WalletHistoryStore()
+        return _default_store
@@ -0,0 +1,209 @@
+"""
+Vectorized normalization of raw GMGN candles.
+
+GMGN returns candles either as dicts (``time``/``timestamp``, ``open``, ...) or as
+arrays (``[time, open, high, low, close, volume, market_cap?]``). The normalizer
+turns a whole response list into NumPy columns in one pass instead of formatting
+every candle in Python, and only renders the ``date`` strings when a caller
+actually asks for them.
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Column layout shared by the normalizer, the candle store and the exporters
+CANDLE_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume", "market_cap")
+VALUE_COLUMNS = CANDLE_COLUMNS[1:]
+
+# Timestamps above this are in milliseconds
+MS_THRESHOLD = 10000000000
+# Latest timestamp we accept (Jan 1, 2100); anything outside 0..MAX is replaced with now
+MAX_TIMESTAMP = 4102444800
+
+
+def render_dates(timestamps: np.ndarray) -> List[str]:
+    """
+    Render unix timestamps as local ``YYYY-MM-DD HH:MM:SS`` strings.
+
+    The local UTC offset is looked up once per distinct hour rather than per row,
+    which keeps DST transitions correct without calling strftime 600k times.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if len(timestamps) == 0:
+        return []
+
+    hours, inverse = np.unique(timestamps // 3600, return_inverse=True)
+    offsets = np.array([
+        int(datetime.fromtimestamp(int(hour) * 3600).astimezone().utcoffset().total_seconds())
+        for hour in hours
+    ], dtype=np.int64)
+    local = (timestamps + offsets[inverse]).astype('datetime64[s]')
+    return np.char.replace(np.datetime_as_string(local, unit='s'), 'T', ' ').tolist()
+
+
+class CandleArrays:
+    """Columnar candles with the ``date`` column rendered on demand."""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        self._dates: Optional[List[str]] = None
+
+    @classmethod
+    def empty(cls) -> "CandleArrays":
+        columns = {"timestamp": np.empty(0, dtype=np.int64)}
+        for name in VALUE_COLUMNS:
+            columns[name] = np.empty(0, dtype=np.float64)
+        return cls(columns)
+
+    @classmethod
+    def concat(cls, parts: List["CandleArrays"]) -> "CandleArrays":
+        """Join several CandleArrays end to end."""
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        return cls({name: np.concatenate([part[name] for part in parts]) for name in CANDLE_COLUMNS})
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def dates(self) -> List[str]:
+        """Local date strings for every candle, rendered the first time they are needed."""
+        if self._dates is None:
+            self._dates = render_dates(self.columns["timestamp"])
+        return self._dates
+
+    def sorted(self) -> "CandleArrays":
+        """Return the candles ordered by timestamp."""
+        order = np.argsort(self.columns["timestamp"], kind='stable')
+        return CandleArrays({name: column[order] for name, column in self.columns.items()})
+
+    def iter_chunks(self, chunk_size: int) -> Iterator["CandleArrays"]:
+        """Yield consecutive slices of at most ``chunk_size`` candles."""
+        for start in range(0, len(self), chunk_size):
+            yield CandleArrays({name: column[start:start + chunk_size] for name, column in self.columns.items()})
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Convert to the candle dicts historically returned by the fetchers."""
+        keys = ("timestamp", "date") + VALUE_COLUMNS
+        rows = zip(self.columns["timestamp"].tolist(), self.dates,
+                   *(self.columns[name].tolist() for name in VALUE_COLUMNS))
+        return [dict(zip(keys, row)) for row in rows]
+
+
+def _coerce_float(values: List[Any], invalid: float) -> np.ndarray:
+    """
+    Convert a list of numbers/strings/None to float64.
+
+    The common case (all numeric or numeric strings) is a single NumPy call;
+    only when that fails do we fall back to coercing element by element.
+    """
+    try:
+        result = np.array(values, dtype=np.float64)
+        if result.shape == (len(values),):
+            # NumPy turns None into NaN rather than raising
+            return np.where(np.isnan(result), invalid, result)
+    except (TypeError, ValueError):
+        pass
+
+    result = np.full(len(values), invalid, dtype=np.float64)
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        try:
+            result[i] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return result
+
+
+def _normalize_timestamps(raw: np.ndarray, now: int) -> np.ndarray:
+    """Convert ms to seconds and replace unparseable or out-of-range values with ``now``."""
+    raw = np.where(np.isfinite(raw), raw, now)
+    timestamps = raw.astype(np.int64)
+    timestamps = np.where(timestamps > MS_THRESHOLD, timestamps // 1000, timestamps)
+    return np.where((timestamps < 0) | (timestamps > MAX_TIMESTAMP), now, timestamps)
+
+
+def normalize_candles(candles: List[Any], now: Optional[int] = None) -> CandleArrays:
+    """
+    Normalize a list of raw GMGN candles into columns, keeping the input order.
+
+    Dict candles with missing or invalid numeric fields get 0.0, matching the
+    previous per-candle formatter; array candles that cannot be parsed, or are
+    shorter than six fields, are dropped. Array candles without a market cap
+    column fall back to ``close * 1e6``.
+
+    Args:
+        candles: Raw candles as returned by the GMGN API
+        now: Timestamp used for missing or invalid times (defaults to the current time)
+
+    Returns:
+        CandleArrays with one row per usable candle
+    """
+    if not candles:
+        return CandleArrays.empty()
+
+    now = int(time.time()) if now is None else int(now)
+    total = len(candles)
+
+    dict_rows = [i for i, c in enumerate(candles) if isinstance(c, dict)]
+    list_rows = [i for i, c in enumerate(candles) if isinstance(c, (list, tuple)) and len(c) >= 6]
+
+    timestamps = np.zeros(total, dtype=np.int64)
+    values = {name: np.zeros(total, dtype=np.float64) for name in VALUE_COLUMNS}
+    keep = np.zeros(total, dtype=bool)
+
+    if dict_rows:
+        dicts = [candles[i] for i in dict_rows]
+        index = np.array(dict_rows, dtype=np.int64)
+
+        raw_times = []
+        for c in dicts:
+            value = c.get('time')
+            raw_times.append(c.get('timestamp', now) if value is None else value)
+        timestamps[index] = _normalize_timestamps(_coerce_float(raw_times, np.nan), now)
+
+        for name in VALUE_COLUMNS:
+            values[name][index] = _coerce_float([c.get(name) for c in dicts], 0.0)
+        keep[index] = True
+
+    if list_rows:
+        arrays = [candles[i] for i in list_rows]
+        index = np.array(list_rows, dtype=np.int64)
+
+        raw_times = _coerce_float([c[0] for c in arrays], np.nan)
+        columns = [_coerce_float([c[pos] for c in arrays], np.nan) for pos in range(1, 6)]
+        market_caps = _coerce_float([c[6] if len(c) >= 7 else None for c in arrays], np.nan)
+        has_market_cap = np.array([len(c) >= 7 for c in arrays], dtype=bool)
+        market_caps = np.where(has_market_cap, market_caps, columns[3] * 1000000)
+
+        # Array candles with any unparseable field are skipped entirely
+        valid = np.isfinite(raw_times) & np.isfinite(market_caps)
+        for column in columns:
+            valid &= np.isfinite(column)
+
+        timestamps[index] = _normalize_timestamps(raw_times, now)
+        for name, column in zip(VALUE_COLUMNS, columns + [market_caps]):
+            values[name][index] = column
+        keep[index] = valid
+
+    skipped = total - int(keep.sum())
+    if skipped:
+        logger.debug(f"Skipped {skipped} malformed candles")
+
+    result = {"timestamp": timestamps[keep]}
+    for name in VALUE_COLUMNS:
+        result[name] = values[name][keep]
+    return CandleArrays(result)
@@ -0,0 +1,133 @@
+"""
+OHLCV resampling for GMGN candles.
+
+Aggregates 1s candles into coarser intervals (1m, 5m, 15m, 1h, 1d, ...) with
+vectorized NumPy reductions. Buckets are aligned to UTC multiples of the
+interval. ``StreamingResampler`` does the same over a sequence of chunks while
+only carrying the one bucket that may still be incomplete between chunks.
+"""
+
+import re
+from typing import Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+from .candle_normalizer import CandleArrays
+
+# Named intervals offered in the CLI, in seconds
+INTERVALS = {
+    "1s": 1,
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+}
+
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_interval(interval: Union[str, int]) -> int:
+    """
+    Convert an interval such as ``'5m'``, ``'1h'`` or ``300`` into seconds.
+
+    Raises:
+        ValueError: If the interval can't be parsed or is not positive
+    """
+    if isinstance(interval, (int, np.integer)):
+        seconds = int(interval)
+    else:
+        match = re.fullmatch(r"\s*(\d+)\s*([smhd]?)\s*", str(interval).lower())
+        if not match:
+            raise ValueError(f"Invalid resample interval: {interval!r}")
+        seconds = int(match.group(1)) * _UNIT_SECONDS[match.group(2) or "s"]
+
+    if seconds <= 0:
+        raise ValueError(f"Resample interval must be positive: {interval!r}")
+    return seconds
+
+
+def resample_candles(candles: CandleArrays, interval: Union[str, int]) -> CandleArrays:
+    """
+    Aggregate candles into ``interval`` buckets.
+
+    open is the first open, high the max high, low the min low, close the last
+    close, volume the sum, and market_cap the last market cap of each bucket.
+    Each output timestamp is the start of its bucket.
+
+    Args:
+        candles: Candles to aggregate (sorted by timestamp if they aren't already)
+        interval: Bucket size, e.g. '5m' or 300
+
+    Returns:
+        CandleArrays with one row per non-empty bucket
+    """
+    seconds = parse_interval(interval)
+    if len(candles) == 0:
+        return CandleArrays.empty()
+
+    timestamps = candles["timestamp"]
+    if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+        candles = candles.sorted()
+        timestamps = candles["timestamp"]
+
+    buckets = timestamps - timestamps % seconds
+    if seconds == 1 and np.all(buckets[1:] != buckets[:-1]):
+        return candles
+
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(buckets)])) - 1
+
+    return CandleArrays({
+        "timestamp": buckets[starts],
+        "open": candles["open"][starts],
+        "high": np.maximum.reduceat(candles["high"], starts),
+        "low": np.minimum.reduceat(candles["low"], starts),
+        "close": candles["close"][ends],
+        "volume": np.add.reduceat(candles["volume"], starts),
+        "market_cap": candles["market_cap"][ends],
+    })
+
+
+class StreamingResampler:
+    """Resamples a time-ordered stream of candle chunks with bounded memory."""
+
+    def __init__(self, interval: Union[str, int]):
+        self.seconds = parse_interval(interval)
+        # Aggregate of the latest bucket, which the next chunk may still extend
+        self._pending: Optional[CandleArrays] = None
+
+    def push(self, chunk: CandleArrays) -> CandleArrays:
+        """
+        Add the next chunk and return every bucket that is now complete.
+
+        Chunks must arrive in timestamp order.
+        """
+        if len(chunk) == 0:
+            return CandleArrays.empty()
+
+        # An aggregated bucket is itself a valid candle, so it can be resampled again
+        combined = CandleArrays.concat([self._pending, chunk]) if self._pending is not None else chunk
+        resampled = resample_candles(combined, self.seconds)
+
+        last = len(resampled) - 1
+        self._pending = CandleArrays({name: column[last:] for name, column in resampled.columns.items()})
+        return CandleArrays({name: column[:last] for name, column in resampled.columns.items()})
+
+    def flush(self) -> CandleArrays:
+        """Return the final, possibly partial, bucket."""
+        pending, self._pending = self._pending, None
+        return pending if pending is not None else CandleArrays.empty()
+
+
+def resample_stream(chunks: Iterable[CandleArrays], interval: Union[str, int]) -> Iterator[CandleArrays]:
+    """Yield resampled candles chunk by chunk without holding the full input series."""
+    resampler = StreamingResampler(interval)
+    for chunk in chunks:
+        completed = resampler.push(chunk)
+        if len(completed):
+            yield completed
+    tail = resampler.flush()
+    if len(tail):
+        yield tail
@@ -0,0 +1,286 @@
+"""
+Persistent candle store for GMGN market cap history.
+
+Candles are kept per token as columnar NumPy arrays under ``CACHE_DIR/gmgn/candles``.
+Recently written tokens are stored as one ``.npy`` file per column so they can be
+memory-mapped on read; tokens that have not been touched for a while are compacted
+into a single compressed ``.npz`` archive. Alongside the columns we keep a small
+``coverage.json`` recording which ``[start, end)`` time ranges have already been
+fetched, so callers only need to request the gaps.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+import numpy as np
+
+from ...core.config import CACHE_DIR
+from .candle_normalizer import CANDLE_COLUMNS, CandleArrays
+
+logger = logging.getLogger(__name__)
+
+# Time ranges are half-open ``(start, end)`` unix second pairs
+TimeRange = Tuple[int, int]
+
+
+# ---------------------------------------------------------------------------
+# Range helpers
+# ---------------------------------------------------------------------------
+def merge_ranges(ranges: List[TimeRange]) -> List[TimeRange]:
+    """Sort ranges and merge any that overlap or touch."""
+    merged: List[List[int]] = []
+    for start, end in sorted((int(s), int(e)) for s, e in ranges if e > s):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def subtract_ranges(start: int, end: int, covered: List[TimeRange]) -> List[TimeRange]:
+    """Return the parts of ``[start, end)`` that are not in ``covered``."""
+    missing = []
+    cursor = start
+    for covered_start, covered_end in merge_ranges(covered):
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+# ---------------------------------------------------------------------------
+# Conversions between candle dicts and columns
+# ---------------------------------------------------------------------------
+def columns_from_candles(candles: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Convert formatted candle dicts into the store's column layout."""
+    columns = {
+        "timestamp": np.fromiter((int(c["timestamp"]) for c in candles), dtype=np.int64, count=len(candles))
+    }
+    for name in CANDLE_COLUMNS[1:]:
+        columns[name] = np.fromiter((float(c.get(name, 0.0)) for c in candles), dtype=np.float64, count=len(candles))
+    return columns
+
+
+def empty_columns() -> Dict[str, np.ndarray]:
+    """Return a zero-length column set."""
+    return CandleArrays.empty().columns
+
+
+# ---------------------------------------------------------------------------
+# Candle store
+# ---------------------------------------------------------------------------
+class CandleStore:
+    """Incremental on-disk store of per-token 1s candles and their coverage."""
+
+    # Tokens untouched for this long are compacted into a compressed archive
+    COMPACT_AFTER = 7 * 24 * 3600
+
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Initialize the candle store.
+
+        Args:
+            root: Directory holding the per-token folders (defaults to CACHE_DIR/gmgn/candles)
+        """
+        self.root = Path(root) if root else CACHE_DIR / "gmgn" / "candles"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+
+    def _token_dir(self, token_address: str) -> Path:
+        return self.root / token_address
+
+    def _archive_path(self, token_address: str) -> Path:
+        return self._token_dir(token_address) / "columns.npz"
+
+    def _coverage_path(self, token_address: str) -> Path:
+        return self._token_dir(token_address) / "coverage.json"
+
+    # -- coverage -----------------------------------------------------------
+    def get_coverage(self, token_address: str) -> List[TimeRange]:
+        """Return the merged time ranges already fetched for a token."""
+        path = self._coverage_path(token_address)
+        if not path.exists():
+            return []
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            return merge_ranges([tuple(r) for r in data.get("ranges", [])])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable candle coverage for {token_address}: {e}")
+            return []
+
+    def missing_ranges(self, token_address: str, start: int, end: int) -> List[TimeRange]:
+        """Return the parts of ``[start, end)`` that still need to be fetched."""
+        if end <= start:
+            return []
+        with self._lock:
+            return subtract_ranges(int(start), int(end), self.get_coverage(token_address))
+
+    # -- reading ------------------------------------------------------------
+    def load(self, token_address: str, start: Optional[int] = None,
+             end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Load stored candles for a token, optionally restricted to ``[start, end)``.
+
+        Uncompressed columns are memory-mapped, so only the requested slice is read.
+        """
+        with self._lock:
+            columns = self._read_columns(token_address, mmap=True)
+            if columns is None:
+                return empty_columns()
+
+            timestamps = columns["timestamp"]
+            lo = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+            hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='left'))
+            return {name: np.array(column[lo:hi]) for name, column in columns.items()}
+
+    def iter_load(self, token_address: str, start: Optional[int] = None, end: Optional[int] = None,
+                  chunk_size: int = 100000) -> Iterator[CandleArrays]:
+        """
+        Yield stored candles in ``[start, end)`` as chunks of at most ``chunk_size`` rows.
+
+        With memory-mapped columns only one chunk is held in memory at a time.
+        """
+        with self._lock:
+            columns = self._read_columns(token_address, mmap=True)
+        if columns is None:
+            return
+
+        timestamps = columns["timestamp"]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='left'))
+        for chunk_start in range(lo, hi, chunk_size):
+            chunk_end = min(hi, chunk_start + chunk_size)
+            yield CandleArrays({name: np.array(column[chunk_start:chunk_end]) for name, column in columns.items()})
+
+    def _read_columns(self, token_address: str, mmap: bool = False) -> Optional[Dict[str, np.ndarray]]:
+        token_dir = self._token_dir(token_address)
+        if not token_dir.exists():
+            return None
+
+        try:
+            if all((token_dir / f"{name}.npy").exists() for name in CANDLE_COLUMNS):
+                mode = 'r' if mmap else None
+                return {name: np.load(token_dir / f"{name}.npy", mmap_mode=mode) for name in CANDLE_COLUMNS}
+
+            archive = self._archive_path(token_address)
+            if archive.exists():
+                with np.load(archive) as data:
+                    return {name: data[name] for name in CANDLE_COLUMNS}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable candle store for {token_address}: {e}")
+        return None
+
+    # -- writing ------------------------------------------------------------
+    def merge(self, token_address: str, columns: Dict[str, np.ndarray],
+              covered: List[TimeRange]) -> int:
+        """
+        Merge freshly fetched candles into the store and record their coverage.
+
+        Newer candles replace stored ones with the same timestamp, since the most
+        recent candle of a previous run may have been incomplete.
+
+        Args:
+            token_address: Token the candles belong to
+            columns: New candles in the store's column layout
+            covered: Time ranges that were fetched successfully (even if empty)
+
+        Returns:
+            Total number of candles stored for the token
+        """
+        with self._lock:
+            existing = self._read_columns(token_address, mmap=False) or empty_columns()
+
+            # New candles go first so that unique() keeps them over stale copies
+            combined = {
+                name: np.concatenate([np.asarray(columns[name], dtype=existing[name].dtype), existing[name]])
+                for name in CANDLE_COLUMNS
+            }
+            _, keep = np.unique(combined["timestamp"], return_index=True)
+            merged = {name: column[keep] for name, column in combined.items()}
+
+            token_dir = self._token_dir(token_address)
+            token_dir.mkdir(parents=True, exist_ok=True)
+            for name in CANDLE_COLUMNS:
+                self._atomic_save(token_dir / f"{name}.npy", merged[name])
+
+            # The columns are hot again, so drop any compressed copy
+            archive = self._archive_path(token_address)
+            if archive.exists():
+                archive.unlink()
+
+            ranges = merge_ranges(self.get_coverage(token_address) + list(covered))
+            self._write_coverage(token_address, ranges)
+            return len(merged["timestamp"])
+
+    def _write_coverage(self, token_address: str, ranges: List[TimeRange]) -> None:
+        path = self._coverage_path(token_address)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"ranges": [list(r) for r in ranges], "updated": int(time.time())}, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _atomic_save(path: Path, array: np.ndarray) -> None:
+        tmp_path = path.with_name(path.stem + ".tmp.npy")
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+
+    # -- maintenance --------------------------------------------------------
+    def compact(self, token_address: str) -> bool:
+        """Compress a token's columns into a single archive. Returns True if compacted."""
+        with self._lock:
+            token_dir = self._token_dir(token_address)
+            column_files = [token_dir / f"{name}.npy" for name in CANDLE_COLUMNS]
+            if not all(path.exists() for path in column_files):
+                return False
+
+            columns = self._read_columns(token_address, mmap=False)
+            if columns is None:
+                return False
+
+            archive = self._archive_path(token_address)
+            tmp_path = archive.with_name("columns.tmp.npz")
+            np.savez_compressed(tmp_path, **columns)
+            os.replace(tmp_path, archive)
+            for path in column_files:
+                path.unlink()
+            return True
+
+    def compact_stale(self, max_age: Optional[int] = None) -> int:
+        """Compress every token whose columns have not been written for ``max_age`` seconds."""
+        max_age = self.COMPACT_AFTER if max_age is None else max_age
+        cutoff = time.time() - max_age
+        compacted = 0
+        for token_dir in self.root.iterdir():
+            timestamp_file = token_dir / "timestamp.npy"
+            if timestamp_file.exists() and timestamp_file.stat().st_mtime < cutoff:
+                if self.compact(token_dir.name):
+                    compacted += 1
+        return compacted
+
+
+_default_store: Optional[CandleStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_candle_store() -> CandleStore:
+    """Return the process-wide candle store rooted in CACHE_DIR/gmgn."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = CandleStore()
+        return _default_store
@@ -13,6 +13,9 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union, Iterable
 
+from .window_planner import WindowPlanner
+from .mcap_scheduler import McapFetchScheduler
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -98,12 +101,13 @@ class GMGNAdapter:
             logger.error(f"Error importing standalone_fetch_token_mcaps: {e}")
             raise NotImplementedError("Market cap data API implementation not available")
     
-    def get_token_info_sync(self, contract_address: str) -> Dict[str, Any]:
+    def get_token_info_sync(self, contract_address: str, include_market: bool = True) -> Dict[str, Any]:
         """
         Get token information synchronously.
         
         Args:
             contract_address: Contract address
+            include_market: Whether price and market fields are needed
             
         Returns:
             Token information
@@ -113,18 +117,19 @@ class GMGNAdapter:
             from . import standalone_token_data
             
             # Call the function through the module
-            return standalone_token_data.get_token_info_sync(contract_address)
+            return standalone_token_data.get_token_info_sync(contract_address, include_market)
             
         except (ImportError, AttributeError) as e:
             logger.error(f"Error importing get_token_info_sync: {e}")
             raise NotImplementedError("API implementation not available in this version")
     
-    async def get_token_info(self, contract_address: str) -> Dict[str, Any]:
+    async def get_token_info(self, contract_address: str, include_market: bool = True) -> Dict[str, Any]:
         """
         Get token information asynchronously.
         
         Args:
             contract_address: Contract address
+            include_market: Whether price and market fields are needed
             
         Returns:
             Token information
@@ -134,12 +139,12 @@ class GMGNAdapter:
             from . import standalone_token_data
             
             # Call the function through the module
-            return await standalone_token_data.get_token_info(contract_address)
+            return await standalone_token_data.get_token_info(contract_address, include_market)
             
         except (ImportError, AttributeError) as e:
             logger.error(f"Error importing get_token_info: {e}")
             # Try falling back to synchronous version
-            return self.get_token_info_sync(contract_address)
+            return self.get_token_info_sync(contract_address, include_market)
     
     async def get_new_tokens(self) -> List[Dict[str, Any]]:
         """
@@ -216,7 +221,8 @@ class GMGNAdapter:
 # ---------------------------------------------------------------------------
 # Function to fetch a single batch of market cap data via GMGN API
 # ---------------------------------------------------------------------------
-async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str, batch_start: int, batch_end: int) -> List[Dict[str, Any]]:
+async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str, batch_start: int, batch_end: int) -> Optional[List[Dict[str, Any]]]:
+    # None means the batch could not be fetched, so the planner can tell it from an empty window
     start_time_str = datetime.fromtimestamp(batch_start).strftime('%Y-%m-%d %H:%M:%S')
     end_time_str = datetime.fromtimestamp(batch_end).strftime('%Y-%m-%d %H:%M:%S')
     
@@ -262,7 +268,7 @@ async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str,
                         await asyncio.sleep(retry_delay)
                         retry_delay *= 2
                         continue
-                    return []
+                    return None
                 
                 data = await response.json()
                 if data.get("code") != 0:
@@ -274,7 +280,7 @@ async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str,
                             await asyncio.sleep(retry_delay)
                             retry_delay *= 2
                             continue
-                    return []
+                    return None
                 candles = data.get("data", [])
                 logger.info(f"Fetched {len(candles)} candles for {token_address} from {start_time_str} to {end_time_str}")
                 return candles
@@ -285,7 +291,7 @@ async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str,
                 await asyncio.sleep(retry_delay)
                 retry_delay *= 2
                 continue
-            return []
+            return None
             
         except Exception as e:
             logger.error(f"Error fetching batch for {token_address} from {start_time_str} to {end_time_str}: {e}")
@@ -293,9 +299,9 @@ async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str,
                 await asyncio.sleep(retry_delay)
                 retry_delay *= 2
                 continue
-            return []
+            return None
     
-    return []  # Return empty list if all retries failed
+    return None  # All retries failed
 
 # ---------------------------------------------------------------------------
 # Function to fetch complete market cap data for a token using batch requests
@@ -306,32 +312,16 @@ async def _internal_fetch_token_mcaps_async(token_address: str, start_timestamp:
     current_time = int(datetime.now().timestamp())
     end_time_unix = int(end_timestamp.timestamp()) if end_timestamp else current_time
 
-    all_candles = []
-    batch_duration = 3000  # 3000 seconds (50 minutes) per batch
-    current_batch_start = start_time_unix
-    
-    # Create batch ranges
-    batch_ranges = []
-    while current_batch_start < end_time_unix:
-        current_batch_end = min(current_batch_start + batch_duration, end_time_unix)
-        batch_ranges.append((current_batch_start, current_batch_end))
-        current_batch_start += batch_duration
+    # Window sizes adapt to the candle density GMGN returns for this token
+    planner = WindowPlanner([(start_time_unix, end_time_unix)], initial_window=3000)
     
-    logger.info(f"Created {len(batch_ranges)} batch ranges for {token_address}")
+    scheduler = McapFetchScheduler(fetch_batch_async)
+    scheduler.add_token(token_address, planner)
+    jobs = await scheduler.run()
+    all_candles = jobs[token_address].candles
     
-    async with aiohttp.ClientSession() as session:
-        tasks = [fetch_batch_async(session, token_address, batch_start, batch_end)
-                 for batch_start, batch_end in batch_ranges]
-        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for result in batch_results:
-            if isinstance(result, Exception):
-                logger.error(f"Error in batch fetch for {token_address}: {result}")
-                continue
-            if result and not isinstance(result, BaseException):
-                all_candles.extend(result)
-        
-        logger.info(f"Successfully fetched {len(all_candles)} candles for {token_address}")
+    logger.info(f"Successfully fetched {len(all_candles)} candles for {token_address} "
+                f"in {planner.requests} requests")
     
     # Sort candles by time in ascending order
     all_candles.sort(key=lambda x: int(x.get("time", 0)))
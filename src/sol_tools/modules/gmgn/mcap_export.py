@@ -0,0 +1,355 @@
+"""
+Streaming exporters for GMGN market cap candles.
+
+Each writer appends one token at a time, in chunks, so an export never holds
+more than a single token's columns plus one chunk of formatted rows. Next to
+the export we write a small ``<file>.index.json`` sidecar mapping every token
+to the byte range of its data, so a reader can seek straight to one token
+instead of parsing the whole file.
+
+Formats:
+    json      ``{token: [candle, ...]}``, one candle per line
+    txt       same content as json, with a .txt extension
+    ndjson    one candle object per line, tagged with its token
+    csv       one row per candle with a header line
+    columnar  compressed NumPy archive per token, back to back
+    xlsx      one worksheet per token (openpyxl write-only mode)
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from .candle_normalizer import CANDLE_COLUMNS, VALUE_COLUMNS, CandleArrays
+
+logger = logging.getLogger(__name__)
+
+# Field order used by every text format
+EXPORT_FIELDS = ("timestamp", "date") + VALUE_COLUMNS
+
+# Rows formatted at once; bounds the text held in memory per write
+CHUNK_SIZE = 50000
+
+# Magic bytes at the start of a columnar export
+COLUMNAR_MAGIC = b"SOLCNDL1\n"
+
+
+def index_path_for(path: Union[str, Path]) -> Path:
+    """Return the sidecar index path for an export file."""
+    path = Path(path)
+    return path.with_name(path.name + ".index.json")
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+class CandleExportWriter(ABC):
+    """Base class for streaming candle exporters."""
+
+    format_name = ""
+    extension = ""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open the export file.
+
+        Args:
+            path: File to write; the sidecar index is written next to it on close
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.index: Dict[str, Dict[str, int]] = {}
+        self.rows_written = 0
+        self._file = open(self.path, 'wb')
+        self._closed = False
+        self._begin()
+
+    def __enter__(self) -> "CandleExportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def write_token(self, token_address: str, candles: CandleArrays) -> None:
+        """
+        Append all candles of one token to the export.
+
+        Args:
+            token_address: Token the candles belong to
+            candles: The token's candles
+        """
+        if token_address in self.index:
+            logger.warning(f"Token {token_address} already exported, skipping duplicate")
+            return
+        offset, length = self._write_token(token_address, candles)
+        self.index[token_address] = {"offset": offset, "length": length, "rows": len(candles)}
+        self.rows_written += len(candles)
+        self._file.flush()
+
+    def close(self, final_path: Optional[Union[str, Path]] = None) -> Path:
+        """
+        Finish the export and write the sidecar index.
+
+        Args:
+            final_path: Optionally move the finished export here (useful when the
+                file name depends on which tokens were written)
+
+        Returns:
+            Path of the finished export
+        """
+        if self._closed:
+            return self.path
+        self._closed = True
+        self._end()
+        self._file.close()
+
+        if final_path is not None and Path(final_path) != self.path:
+            final_path = Path(final_path)
+            os.replace(self.path, final_path)
+            self.path = final_path
+
+        self._write_index()
+        return self.path
+
+    def _write_index(self) -> None:
+        path = index_path_for(self.path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"format": self.format_name, "file": self.path.name, "tokens": self.index}, f)
+        os.replace(tmp_path, path)
+
+    # -- hooks for subclasses -----------------------------------------------
+    def _begin(self) -> None:
+        pass
+
+    def _end(self) -> None:
+        pass
+
+    @abstractmethod
+    def _write_token(self, token_address: str, candles: CandleArrays) -> Tuple[int, int]:
+        """Write one token and return the (offset, length) of its data."""
+
+
+class JsonCandleWriter(CandleExportWriter):
+    """Writes ``{token: [candles]}`` JSON without building it in memory first."""
+
+    format_name = "json"
+    extension = ".json"
+
+    def _begin(self) -> None:
+        self._file.write(b"{")
+
+    def _end(self) -> None:
+        self._file.write(b"\n}\n")
+
+    def _write_token(self, token_address: str, candles: CandleArrays) -> Tuple[int, int]:
+        separator = "," if self.index else ""
+        self._file.write(f"{separator}\n{json.dumps(token_address)}: ".encode())
+
+        # The index points at the candle array itself, so it can be parsed on its own
+        offset = self._file.tell()
+        self._file.write(b"[")
+        first = True
+        for chunk in candles.iter_chunks(CHUNK_SIZE):
+            lines = [json.dumps(row) for row in chunk.to_dicts()]
+            if not lines:
+                continue
+            self._file.write((("" if first else ",") + "\n" + ",\n".join(lines)).encode())
+            first = False
+        self._file.write(b"\n]" if not first else b"]")
+        return offset, self._file.tell() - offset
+
+
+class TextCandleWriter(JsonCandleWriter):
+    """The .txt export, which has always contained the JSON document."""
+
+    format_name = "txt"
+    extension = ".txt"
+
+
+class NdjsonCandleWriter(CandleExportWriter):
+    """Writes one JSON object per candle, each tagged with its token."""
+
+    format_name = "ndjson"
+    extension = ".ndjson"
+
+    def _write_token(self, token_address: str, candles: CandleArrays) -> Tuple[int, int]:
+        offset = self._file.tell()
+        for chunk in candles.iter_chunks(CHUNK_SIZE):
+            lines = [json.dumps({"token": token_address, **row}) for row in chunk.to_dicts()]
+            if lines:
+                self._file.write(("\n".join(lines) + "\n").encode())
+        return offset, self._file.tell() - offset
+
+
+class CsvCandleWriter(CandleExportWriter):
+    """Writes one CSV row per candle under a single header line."""
+
+    format_name = "csv"
+    extension = ".csv"
+
+    def _begin(self) -> None:
+        self._file.write((",".join(("token",) + EXPORT_FIELDS) + "\n").encode())
+
+    def _write_token(self, token_address: str, candles: CandleArrays) -> Tuple[int, int]:
+        offset = self._file.tell()
+        for chunk in candles.iter_chunks(CHUNK_SIZE):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerows(zip([token_address] * len(chunk), chunk["timestamp"].tolist(), chunk.dates,
+                                 *(chunk[name].tolist() for name in VALUE_COLUMNS)))
+            self._file.write(buffer.getvalue().encode())
+        return offset, self._file.tell() - offset
+
+
+class ColumnarCandleWriter(CandleExportWriter):
+    """Writes each token as a compressed NumPy archive of its columns."""
+
+    format_name = "columnar"
+    extension = ".candles"
+
+    def _begin(self) -> None:
+        self._file.write(COLUMNAR_MAGIC)
+
+    def _write_token(self, token_address: str, candles: CandleArrays) -> Tuple[int, int]:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **{name: candles[name] for name in CANDLE_COLUMNS})
+        offset = self._file.tell()
+        self._file.write(buffer.getbuffer())
+        return offset, self._file.tell() - offset
+
+
+class XlsxCandleWriter(CandleExportWriter):
+    """
+    Writes one worksheet per token using openpyxl's write-only mode.
+
+    Rows are streamed to the workbook instead of going through a DataFrame.
+    An xlsx file is a zip archive, so the index records sheet names rather
+    than byte ranges.
+    """
+
+    format_name = "xlsx"
+    extension = ".xlsx"
+
+    def __init__(self, path: Union[str, Path]):
+        from openpyxl import Workbook  # Raises ImportError if openpyxl is missing
+
+        self._workbook = Workbook(write_only=True)
+        self.sheet_names: Dict[str, str] = {}
+        super().__init__(path)
+
+    def _write_token(self, token_address: str, candles: CandleArrays) -> Tuple[int, int]:
+        # Excel sheet names are limited to 31 characters and must be unique
+        sheet_name = token_address[:15]
+        suffix = 1
+        while sheet_name in self.sheet_names.values():
+            sheet_name = f"{token_address[:12]}_{suffix}"
+            suffix += 1
+        self.sheet_names[token_address] = sheet_name
+
+        sheet = self._workbook.create_sheet(title=sheet_name)
+        sheet.append(list(EXPORT_FIELDS))
+        for chunk in candles.iter_chunks(CHUNK_SIZE):
+            for row in zip(chunk["timestamp"].tolist(), chunk.dates,
+                           *(chunk[name].tolist() for name in VALUE_COLUMNS)):
+                sheet.append(row)
+        return 0, 0
+
+    def _end(self) -> None:
+        self._workbook.save(self._file)
+
+    def _write_index(self) -> None:
+        for token_address, sheet_name in self.sheet_names.items():
+            self.index[token_address] = {"sheet": sheet_name, "rows": self.index[token_address]["rows"]}
+        super()._write_index()
+
+
+# Writer class for each export format
+EXPORT_WRITERS = {
+    "json": JsonCandleWriter,
+    "txt": TextCandleWriter,
+    "ndjson": NdjsonCandleWriter,
+    "csv": CsvCandleWriter,
+    "columnar": ColumnarCandleWriter,
+    "xlsx": XlsxCandleWriter,
+}
+
+
+def open_export_writer(file_format: str, path: Union[str, Path]) -> CandleExportWriter:
+    """
+    Create a streaming writer for ``file_format``.
+
+    Args:
+        file_format: One of EXPORT_WRITERS
+        path: Export path without extension; the format's extension is appended
+
+    Raises:
+        ValueError: If the format is unknown
+        ImportError: If the format needs an optional package that is missing
+    """
+    writer_class = EXPORT_WRITERS.get(file_format)
+    if writer_class is None:
+        raise ValueError(f"Unknown export format: {file_format!r}")
+    path = Path(path)
+    return writer_class(path.with_name(path.name + writer_class.extension))
+
+
+# ---------------------------------------------------------------------------
+# Readers
+# ---------------------------------------------------------------------------
+def load_export_index(path: Union[str, Path]) -> Dict[str, Any]:
+    """Load the sidecar index of an export."""
+    with open(index_path_for(path), 'r') as f:
+        return json.load(f)
+
+
+def read_export_token(path: Union[str, Path], token_address: str) -> CandleArrays:
+    """
+    Read one token's candles from an export by seeking to its byte range.
+
+    Args:
+        path: Export file (json, txt, ndjson, csv or columnar)
+        token_address: Token to read
+
+    Returns:
+        The token's candles
+
+    Raises:
+        KeyError: If the token is not in the export
+        ValueError: If the format does not support byte-range reads
+    """
+    index = load_export_index(path)
+    file_format = index.get("format")
+    entry = index["tokens"][token_address]
+    if "offset" not in entry:
+        raise ValueError(f"{file_format} exports can't be read by byte range")
+
+    with open(path, 'rb') as f:
+        f.seek(entry["offset"])
+        data = f.read(entry["length"])
+
+    if file_format == "columnar":
+        with np.load(io.BytesIO(data)) as archive:
+            return CandleArrays({name: archive[name] for name in CANDLE_COLUMNS})
+
+    if file_format in ("json", "txt"):
+        rows = json.loads(data)
+    elif file_format == "ndjson":
+        rows = [json.loads(line) for line in data.splitlines() if line.strip()]
+    elif file_format == "csv":
+        reader = csv.reader(io.StringIO(data.decode()))
+        rows = [dict(zip(("token",) + EXPORT_FIELDS, row)) for row in reader]
+    else:
+        raise ValueError(f"Unknown export format: {file_format!r}")
+
+    columns = {"timestamp": np.array([int(row["timestamp"]) for row in rows], dtype=np.int64)}
+    for name in VALUE_COLUMNS:
+        columns[name] = np.array([float(row[name]) for row in rows], dtype=np.float64)
+    return CandleArrays(columns)
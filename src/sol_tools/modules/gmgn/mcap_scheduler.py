@@ -0,0 +1,175 @@
+"""
+Concurrent scheduler for GMGN market cap fetches across many tokens.
+
+Every token gets its own WindowPlanner; the scheduler interleaves their windows
+over one shared aiohttp session, keeping at most ``max_concurrency`` requests in
+flight overall and handing free slots to tokens in round-robin order so a single
+long history can't starve the rest of the list.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from ...core.http_client import shared_aiohttp_session
+from .window_planner import WindowPlanner, TimeRange, Config as PlannerConfig
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Configuration constants
+# ---------------------------------------------------------------------------
+class Config:
+    """Configuration constants for the market cap scheduler."""
+
+    # Requests in flight across all tokens
+    MAX_CONCURRENCY = 12
+    # Requests in flight for any single token
+    MAX_IN_FLIGHT_PER_TOKEN = PlannerConfig.MAX_IN_FLIGHT
+
+
+# fetch(session, token_address, start, end) -> raw candles, or None on failure
+WindowFetcher = Callable[[aiohttp.ClientSession, str, int, int], Awaitable[Optional[List[Any]]]]
+
+
+class TokenJob:
+    """Book-keeping for one token inside the scheduler."""
+
+    def __init__(self, token_address: str, planner: WindowPlanner):
+        self.token_address = token_address
+        self.planner = planner
+        self.candles: List[Any] = []
+        self.covered: List[TimeRange] = []
+        self.started_at = time.monotonic()
+        self.queued = True  # Whether the job is in the scheduler's rotation
+
+
+class McapFetchScheduler:
+    """Interleaves GMGN window requests from many tokens under one concurrency limit."""
+
+    def __init__(self, fetch_window: WindowFetcher,
+                 max_concurrency: Optional[int] = None,
+                 max_in_flight_per_token: Optional[int] = None,
+                 on_progress: Optional[Callable[[str, WindowPlanner], None]] = None,
+                 on_token_done: Optional[Callable[[TokenJob], Any]] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            fetch_window: Coroutine fetching one window for one token
+            max_concurrency: Requests in flight across all tokens
+            max_in_flight_per_token: Requests in flight for a single token
+            on_progress: Called with (token_address, planner) after each window
+            on_token_done: Called with the TokenJob as soon as a token finishes;
+                may be a coroutine function
+        """
+        self.fetch_window = fetch_window
+        self.max_concurrency = max_concurrency or Config.MAX_CONCURRENCY
+        self.max_in_flight_per_token = max_in_flight_per_token or Config.MAX_IN_FLIGHT_PER_TOKEN
+        self.on_progress = on_progress
+        self.on_token_done = on_token_done
+        self.jobs: Dict[str, TokenJob] = {}
+        self._ready: Deque[TokenJob] = deque()
+
+    def add_token(self, token_address: str, planner: WindowPlanner) -> None:
+        """Queue a token with the planner describing the ranges it still needs."""
+        job = TokenJob(token_address, planner)
+        self.jobs[token_address] = job
+        self._ready.append(job)
+
+    def _next_window(self) -> Optional[Tuple[TokenJob, TimeRange]]:
+        """Pick the next window, rotating through tokens so each gets a fair turn."""
+        for _ in range(len(self._ready)):
+            job = self._ready.popleft()
+            planner = job.planner
+            if not planner.has_pending:
+                # Finished handing out windows; drop it from the rotation
+                job.queued = False
+                continue
+            self._ready.append(job)
+            if planner.in_flight < self.max_in_flight_per_token:
+                return job, planner.next_window()
+        return None
+
+    async def _timed_fetch(self, session: aiohttp.ClientSession, job: TokenJob, window: TimeRange):
+        started = time.monotonic()
+        try:
+            candles = await self.fetch_window(session, job.token_address, *window)
+        except Exception as e:
+            logger.error(f"Error fetching window {window} for {job.token_address}: {e}")
+            candles = None
+        return candles, time.monotonic() - started
+
+    async def _finish(self, job: TokenJob) -> None:
+        if self.on_token_done is None:
+            return
+        try:
+            result = self.on_token_done(job)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error(f"Error handling completed token {job.token_address}: {e}")
+
+    async def run(self, session: Optional[aiohttp.ClientSession] = None) -> Dict[str, TokenJob]:
+        """
+        Fetch every queued token.
+
+        Args:
+            session: Session to use; the process-wide pooled session is borrowed if omitted
+
+        Returns:
+            Dictionary mapping token addresses to their completed TokenJob
+        """
+        if session is None:
+            async with shared_aiohttp_session() as shared:
+                return await self.run(shared)
+
+        # Tokens with nothing to fetch are done immediately
+        for job in list(self._ready):
+            if job.planner.finished:
+                await self._finish(job)
+
+        running: Dict[asyncio.Future, Tuple[TokenJob, TimeRange]] = {}
+        try:
+            while True:
+                while len(running) < self.max_concurrency:
+                    picked = self._next_window()
+                    if picked is None:
+                        break
+                    job, window = picked
+                    running[asyncio.ensure_future(self._timed_fetch(session, job, window))] = (job, window)
+
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    job, window = running.pop(task)
+                    candles, latency = task.result()
+                    planner = job.planner
+                    job.covered.extend(planner.record(window, candles, latency))
+                    if candles:
+                        job.candles.extend(candles)
+
+                    # Truncated windows put work back; make sure the token is in the rotation
+                    if planner.has_pending and not job.queued:
+                        job.queued = True
+                        self._ready.append(job)
+
+                    if self.on_progress:
+                        self.on_progress(job.token_address, planner)
+                    if planner.finished:
+                        await self._finish(job)
+        finally:
+            # Cancelled or failed runs must not leave fetches going on a session about to close
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return self.jobs
@@ -14,7 +14,7 @@ import aiohttp
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Callable
 import contextlib
 import io
 import glob
@@ -22,8 +22,14 @@ from readchar import readchar, key
 import threading
 import queue
 
-# We don't import pandas at the top level to avoid unnecessary dependencies
-# It will be imported only when needed for Excel export
+from .candle_store import get_candle_store
+from .candle_normalizer import CandleArrays, normalize_candles
+from .candle_resample import INTERVALS, parse_interval, resample_candles, resample_stream
+from .window_planner import WindowPlanner
+from .mcap_scheduler import McapFetchScheduler, TokenJob
+from .mcap_export import CandleExportWriter, index_path_for, open_export_writer
+
+# openpyxl is only imported when an Excel export is requested
 
 # EXTREME AND AGGRESSIVE SILENCER
 # This code runs immediately at import time
@@ -151,7 +157,10 @@ class Config:
     RETRY_DELAY_MAX = 3.0  # seconds
     
     # Batch settings
-    BATCH_DURATION = 3000  # 50 minutes per batch
+    BATCH_DURATION = 3000  # Initial window (50 minutes); adapted per token by the window planner
+    
+    # Candle store settings
+    CANDLE_SETTLE_SECONDS = 60  # Candles newer than this are re-fetched on the next run
     
     @staticmethod
     def generate_device_id() -> str:
@@ -164,6 +173,17 @@ class Config:
 async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str, 
                            batch_start: int, batch_end: int) -> List[Dict[str, Any]]:
     """Fetch a single batch of market cap data via GMGN API"""
+    candles = await _fetch_batch(session, token_address, batch_start, batch_end)
+    return candles if candles is not None else []
+
+async def _fetch_batch(session: aiohttp.ClientSession, token_address: str,
+                       batch_start: int, batch_end: int) -> Optional[List[Any]]:
+    """
+    Fetch a single batch of raw candles.
+    
+    Returns None when the batch could not be fetched, so callers can tell a
+    failed request apart from a window that simply had no trades.
+    """
     
     # Skip logging in test mode
     if IN_TEST_MODE:
@@ -230,7 +250,7 @@ async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str,
                         await asyncio.sleep(retry_delay)
                         retry_delay *= 2
                         continue
-                    return []
+                    return None
                 
                 try:
                     data = await response.json()
@@ -241,7 +261,7 @@ async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str,
                         await asyncio.sleep(retry_delay)
                         retry_delay *= 2
                         continue
-                    return []
+                    return None
                 
                 # Check for API error code
                 if data.get("code") != 0:
@@ -254,7 +274,7 @@ async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str,
                             await asyncio.sleep(retry_delay)
                             retry_delay *= 2
                             continue
-                    return []
+                    return None
                 
                 candles = data.get("data", [])
                 if not IN_TEST_MODE:
@@ -277,7 +297,7 @@ async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str,
                 await asyncio.sleep(retry_delay)
                 retry_delay *= 2
                 continue
-            return []
+            return None
             
         except Exception as e:
             error_msg = f"Unexpected error fetching batch for {token_address}: {str(e)}"
@@ -287,22 +307,25 @@ async def fetch_batch_async(session: aiohttp.ClientSession, token_address: str,
                 await asyncio.sleep(retry_delay)
                 retry_delay *= 2
                 continue
-            return []
+            return None
     
     print(f"❌ All retries failed for {token_address}")
-    return []
+    return None
 
 # ---------------------------------------------------------------------------
 # Main function to fetch market cap data
 # ---------------------------------------------------------------------------
 async def standalone_fetch_token_mcaps(token_addresses: Union[str, List[str]], 
-                                     start_timestamp: Union[datetime, int]) -> Union[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+                                     start_timestamp: Union[datetime, int],
+                                     interval: Optional[str] = None) -> Union[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
     """
     Fetch token market cap data for one or multiple tokens.
     
     Args:
         token_addresses: One token address or a list/space-separated string of token addresses
         start_timestamp: Start time (datetime or unix timestamp)
+        interval: Optional candle interval to resample to (e.g. '1m', '5m', '1h', '1d');
+            defaults to GMGN's native 1s candles
         
     Returns:
         List of market cap candles for a single token, or
@@ -324,28 +347,16 @@ async def standalone_fetch_token_mcaps(token_addresses: Union[str, List[str]],
     if not isinstance(token_addresses, list):
         token_addresses = [token_addresses]
     
-    # Process multiple tokens
+    # Process multiple tokens; the scheduler interleaves their requests
     if len(token_addresses) > 1:
-        # Process each token
-        results = {}
-        for token in token_addresses:
-            # Fetch data
-            logger.info(f"Fetching market cap data for {token} on solana...")
-            candles = await fetch_single_token_mcaps(token, start_time_unix)
-            
-            # Store results
-            results[token] = candles
-            
-            # Short delay between tokens to avoid rate limiting
-            await asyncio.sleep(1.0)
-        
-        return results
+        logger.info(f"Fetching market cap data for {len(token_addresses)} tokens on solana...")
+        return await fetch_many_token_mcaps(token_addresses, start_time_unix, interval=interval)
     
     # Single token processing
     elif len(token_addresses) == 1:
         token = token_addresses[0]
         logger.info(f"Fetching market cap data for {token} on solana...")
-        return await fetch_single_token_mcaps(token, start_time_unix)
+        return await fetch_single_token_mcaps(token, start_time_unix, interval=interval)
     
     # No tokens provided
     else:
@@ -355,184 +366,148 @@ async def standalone_fetch_token_mcaps(token_addresses: Union[str, List[str]],
 # ---------------------------------------------------------------------------
 # Helper function to fetch complete data for a single token
 # ---------------------------------------------------------------------------
-async def fetch_single_token_mcaps(token_address: str, start_time_unix: int) -> List[Dict[str, Any]]:
-    """Fetch complete market cap data for a single token using batch requests"""
+async def fetch_single_token_mcaps(token_address: str, start_time_unix: int,
+                                   use_cache: bool = True, interval: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch complete market cap data for a single token using batch requests.
     
-    current_time = int(datetime.now().timestamp())
-    end_time_unix = current_time
+    Candles already held in the local candle store are reused; only the time
+    ranges that have never been fetched (or previously failed) are requested.
     
-    all_candles = []
-    batch_duration = Config.BATCH_DURATION
-    current_batch_start = start_time_unix
+    Args:
+        token_address: Token to fetch
+        start_time_unix: Start of the period (unix seconds)
+        use_cache: Read from and write to the candle store in CACHE_DIR/gmgn
+        interval: Optional candle interval to resample to (e.g. '1m', '1h')
+    """
+    results = await fetch_many_token_mcaps([token_address], start_time_unix,
+                                           use_cache=use_cache, interval=interval)
+    return results.get(token_address, [])
+
+# ---------------------------------------------------------------------------
+# Scheduler-driven fetch for any number of tokens
+# ---------------------------------------------------------------------------
+async def fetch_many_token_mcaps(token_addresses: List[str], start_time_unix: int,
+                                 use_cache: bool = True,
+                                 on_token_complete: Optional[Callable[[str, Any], Any]] = None,
+                                 max_concurrency: Optional[int] = None,
+                                 as_arrays: bool = False,
+                                 interval: Optional[str] = None,
+                                 keep_results: bool = True) -> Dict[str, Any]:
+    """
+    Fetch market cap candles for many tokens concurrently.
     
-    # Create batch ranges silently
-    batch_ranges = []
-    while current_batch_start < end_time_unix:
-        current_batch_end = min(current_batch_start + batch_duration, end_time_unix)
-        batch_ranges.append((current_batch_start, current_batch_end))
-        current_batch_start += batch_duration
+    Requests from all tokens share one pooled connection and one global
+    concurrency limit, and tokens take turns for free request slots.
     
-    # If there are no batch ranges, add one for the entire period
-    if not batch_ranges:
-        batch_ranges = [(start_time_unix, end_time_unix)]
+    Args:
+        token_addresses: Tokens to fetch
+        start_time_unix: Start of the period (unix seconds)
+        use_cache: Read from and write to the candle store in CACHE_DIR/gmgn
+        on_token_complete: Called with (token_address, candles) as soon as each token finishes
+        max_concurrency: Requests in flight across all tokens
+        as_arrays: Return CandleArrays columns instead of lists of candle dicts
+        interval: Optional candle interval to resample to (e.g. '1m', '5m', '1h', '1d')
+        keep_results: Keep every token's candles for the return value; streaming
+            consumers that handle tokens in on_token_complete can turn this off
+        
+    Returns:
+        Dictionary of {token_address: List of market cap candles}, or
+        {token_address: CandleArrays} when as_arrays is set (empty when
+        keep_results is off)
+    """
+    end_time_unix = int(datetime.now().timestamp())
+    # Validate the interval before any requests are made
+    interval_seconds = parse_interval(interval) if interval else 1
     
-    # Setup for progress bar in test mode
-    batch_count = len(batch_ranges)
+    store = None
+    if use_cache:
+        try:
+            store = get_candle_store()
+        except Exception as e:
+            logger.warning(f"Candle store unavailable, fetching without cache: {e}")
+    
+    results: Dict[str, Any] = {}
+    completed = 0
+    
+    def report_progress(token_address: str, planner: WindowPlanner):
+        if not IN_TEST_MODE:
+            show_progress_bar(int(planner.progress() * 1000), 1000,
+                              prefix=f'{token_address[:4]}...{token_address[-4:]}',
+                              suffix=f'{planner.requests} req, window {int(planner.window)}s', length=20)
+    
+    async def finish_token(job: TokenJob):
+        nonlocal completed
+        candles = _finalize_token_candles(store, job, start_time_unix, end_time_unix, interval_seconds)
+        # Release the raw candles as soon as they have been merged
+        job.candles = []
+        if not as_arrays:
+            candles = candles.to_dicts()
+        if keep_results:
+            results[job.token_address] = candles
+        completed += 1
+        
+        if len(candles) == 0 and not IN_TEST_MODE:
+            print(f"⚠️ Warning: No data retrieved for token {job.token_address}. This could indicate an API issue or invalid token.")
+        if IN_TEST_MODE:
+            print(f"✅ Fetched {len(candles)} candles" if len(candles) else f"⚠️ No data found")
+        
+        if on_token_complete is not None:
+            outcome = on_token_complete(job.token_address, candles)
+            if asyncio.iscoroutine(outcome):
+                await outcome
+    
+    scheduler = McapFetchScheduler(_fetch_batch, max_concurrency=max_concurrency,
+                                   on_progress=report_progress, on_token_done=finish_token)
+    
+    for token_address in dict.fromkeys(token_addresses):
+        fetch_ranges = [(start_time_unix, end_time_unix)]
+        if store is not None:
+            try:
+                fetch_ranges = store.missing_ranges(token_address, start_time_unix, end_time_unix)
+            except Exception as e:
+                logger.warning(f"Could not read candle store for {token_address}: {e}")
+        # Window sizes adapt to the candle density GMGN returns for each token
+        scheduler.add_token(token_address, WindowPlanner(fetch_ranges, initial_window=Config.BATCH_DURATION))
     
     try:
         # Use context manager to suppress output during the API calls
         with suppress_all_output():
-            async with aiohttp.ClientSession() as session:
-                tasks = [fetch_batch_async(session, token_address, batch_start, batch_end)
-                         for batch_start, batch_end in batch_ranges]
-                
-                # Show minimal info in test mode
-                if IN_TEST_MODE:
-                    # Extremely minimal output
-                    print(f"⏳ Processing {token_address}...")
-                
-                # Process tasks and show progress
-                batch_results = []
-                for i, task in enumerate(asyncio.as_completed(tasks), 1):
-                    try:
-                        result = await task
-                        batch_results.append(result)
-                        if not IN_TEST_MODE:
-                            show_progress_bar(i, batch_count, prefix='Progress:', suffix=f'Batch {i}/{batch_count}', length=20)
-                    except Exception as e:
-                        batch_results.append(e)
-                        print(f"❌ Error fetching batch {i}/{batch_count} for {token_address}: {str(e)}")
-                        if not IN_TEST_MODE:
-                            show_progress_bar(i, batch_count, prefix='Progress:', suffix=f'Batch {i}/{batch_count} (error)', length=20)
-                
-                for result in batch_results:
-                    if isinstance(result, Exception):
-                        if not IN_TEST_MODE:
-                            logger.error(f"Error in batch fetch for {token_address}: {result}")
-                        continue
-                    # Only extend the list with results that are actually lists
-                    if isinstance(result, list) and result:
-                        all_candles.extend(result)
-                
-                candle_count = len(all_candles)
-                if IN_TEST_MODE:
-                    if candle_count > 0:
-                        print(f"✅ Fetched {candle_count} candles")
-                    else:
-                        print(f"⚠️ No data found")
-        
-        if not all_candles:
-            print(f"⚠️ Warning: No data retrieved for token {token_address}. This could indicate an API issue or invalid token.")
+            await scheduler.run()
     except Exception as e:
-        print(f"❌ Error processing {token_address}: {str(e)}")
-        logger.error(f"Error processing {token_address}: {str(e)}")
-        return []
+        print(f"❌ Error processing market cap data: {str(e)}")
+        logger.error(f"Error processing market cap data: {str(e)}")
     
-    # Format candles consistently
-    formatted_candles = []
-    for candle in all_candles:
-        # Skip verbose logging in formatter
-        # Handle candles returned as dictionaries
-        if isinstance(candle, dict):
-            try:
-                # Convert time from milliseconds to seconds if needed
-                time_val = candle.get('time')
-                if time_val is None:
-                    time_val = candle.get('timestamp', int(datetime.now().timestamp()))
-                
-                # Handle string timestamps
-                if isinstance(time_val, str):
-                    try:
-                        time_val = int(time_val)
-                    except ValueError:
-                        time_val = int(datetime.now().timestamp())
-                
-                # Normalize extremely large timestamps (ms to seconds)
-                if time_val > 10000000000:  # If timestamp is in milliseconds
-                    time_val = time_val // 1000
-                
-                # Validate timestamp is in reasonable range (1970-2100)
-                current_time = int(datetime.now().timestamp())
-                if time_val < 0 or time_val > 4102444800:  # Jan 1, 2100
-                    time_val = current_time
-                
-                # Handle all numeric fields, ensuring proper conversion
-                def safe_number_convert(value, default=0.0):
-                    if value is None:
-                        return default
-                    if isinstance(value, (int, float)):
-                        return float(value)
-                    if isinstance(value, str):
-                        try:
-                            return float(value)
-                        except ValueError:
-                            return default
-                    return default
-                
-                # Format date string safely
-                try:
-                    date_str = datetime.fromtimestamp(time_val).strftime('%Y-%m-%d %H:%M:%S')
-                except (ValueError, OverflowError):
-                    date_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                
-                # Create a standardized candle format
-                formatted_candle = {
-                    "timestamp": int(time_val),
-                    "date": date_str,
-                    "open": safe_number_convert(candle.get('open')),
-                    "high": safe_number_convert(candle.get('high')),
-                    "low": safe_number_convert(candle.get('low')),
-                    "close": safe_number_convert(candle.get('close')),
-                    "volume": safe_number_convert(candle.get('volume')),
-                    "market_cap": safe_number_convert(candle.get('market_cap')),
-                }
-                formatted_candles.append(formatted_candle)
-            except Exception as e:
-                # Skip this candle on any error
-                if not IN_TEST_MODE:
-                    logger.error(f"Error formatting candle: {str(e)}")
-        # Handle candles returned as lists (fallback for array format)
-        elif isinstance(candle, list) and len(candle) >= 6:
-            try:
-                # Normalize timestamp
-                unix_time = candle[0]
-                if unix_time > 10000000000:  # If timestamp is in milliseconds
-                    unix_time = unix_time // 1000
-                
-                # Validate timestamp
-                current_time = int(datetime.now().timestamp())
-                if unix_time < 0 or unix_time > 4102444800:  # Jan 1, 2100
-                    unix_time = current_time
-                
-                # Format date safely
-                try:
-                    date_str = datetime.fromtimestamp(unix_time).strftime('%Y-%m-%d %H:%M:%S')
-                except (ValueError, OverflowError):
-                    date_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                
-                # Calculate market cap if not provided
-                market_cap = float(candle[6]) if len(candle) >= 7 else float(candle[4]) * 1000000
-                
-                formatted_candles.append({
-                    "timestamp": int(unix_time),
-                    "date": date_str,
-                    "open": float(candle[1]),
-                    "high": float(candle[2]),
-                    "low": float(candle[3]),
-                    "close": float(candle[4]),
-                    "volume": float(candle[5]),
-                    "market_cap": market_cap
-                })
-            except Exception as e:
-                # Skip this candle on any error
-                if not IN_TEST_MODE:
-                    logger.error(f"Error formatting candle: {str(e)}")
+    # Tokens finish in any order; return them in the order they were requested
+    return {token: results[token] for token in dict.fromkeys(token_addresses) if token in results}
+
+def _finalize_token_candles(store, job: TokenJob, start_time_unix: int, end_time_unix: int,
+                            interval_seconds: int = 1) -> CandleArrays:
+    """Normalize a finished token's raw candles, merge them into the candle store and resample."""
+    candles = normalize_candles(job.candles)
     
-    return formatted_candles
+    if store is None:
+        return resample_candles(candles, interval_seconds) if interval_seconds > 1 else candles
+    
+    # Merge the new candles into the store and serve the full period from it.
+    # The most recent candles may still be forming, so we never mark them as covered.
+    token_address = job.token_address
+    settled_until = end_time_unix - Config.CANDLE_SETTLE_SECONDS
+    covered = [(s, min(e, settled_until)) for s, e in job.covered if min(e, settled_until) > s]
+    try:
+        store.merge(token_address, candles.columns, covered)
+        if interval_seconds > 1:
+            # Resample straight off the memory-mapped store, one chunk at a time
+            chunks = store.iter_load(token_address, start_time_unix, end_time_unix + 1)
+            return CandleArrays.concat(list(resample_stream(chunks, interval_seconds)))
+        return CandleArrays(store.load(token_address, start_time_unix, end_time_unix + 1))
+    except Exception as e:
+        logger.error(f"Error updating candle store for {token_address}: {str(e)}")
+        return resample_candles(candles, interval_seconds) if interval_seconds > 1 else candles
 
-def run_fetch_token_mcaps_in_thread(token_address, start_time_unix):
+def _run_in_thread(coro_factory: Callable[[], Any]) -> Any:
     """
-    Run the fetch_single_token_mcaps function in a separate thread with its own event loop.
+    Run a coroutine in a separate thread with its own event loop.
     This is a workaround for "Cannot run the event loop while another loop is running" errors.
     """
     result_queue = queue.Queue()
@@ -544,7 +519,7 @@ def run_fetch_token_mcaps_in_thread(token_address, start_time_unix):
         
         try:
             # Run the async function in this thread's event loop
-            result = thread_loop.run_until_complete(fetch_single_token_mcaps(token_address, start_time_unix))
+            result = thread_loop.run_until_complete(coro_factory())
             result_queue.put(("success", result))
         except Exception as e:
             result_queue.put(("error", str(e)))
@@ -567,13 +542,54 @@ def run_fetch_token_mcaps_in_thread(token_address, start_time_unix):
     else:
         raise Exception("No result returned from thread")
 
+def run_fetch_token_mcaps_in_thread(token_address, start_time_unix):
+    """
+    Run the fetch_single_token_mcaps function in a separate thread with its own event loop.
+    """
+    return _run_in_thread(lambda: fetch_single_token_mcaps(token_address, start_time_unix))
+
+def run_fetch_many_token_mcaps_in_thread(token_addresses, start_time_unix, on_token_complete=None,
+                                         interval=None, as_arrays=False, keep_results=True):
+    """
+    Run fetch_many_token_mcaps for all tokens in one separate thread and event loop.
+    
+    on_token_complete is called from that thread as each token finishes.
+    """
+    return _run_in_thread(lambda: fetch_many_token_mcaps(token_addresses, start_time_unix,
+                                                         on_token_complete=on_token_complete,
+                                                         interval=interval, as_arrays=as_arrays,
+                                                         keep_results=keep_results))
+
+def _open_mcap_export(file_format: str, path: Path, test_mode: bool = False) -> CandleExportWriter:
+    """
+    Open a streaming export writer, installing openpyxl for Excel if needed.
+    
+    Falls back to JSON when the requested format can't be written.
+    """
+    try:
+        return open_export_writer(file_format, path)
+    except ImportError:
+        if not test_mode:
+            print("\n⚠️ openpyxl module not found. Installing required packages...")
+        try:
+            import subprocess
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
+            return open_export_writer(file_format, path)
+        except Exception:
+            print("\n❌ Failed to install required packages for Excel export. Falling back to JSON.")
+    except ValueError as e:
+        print(f"\n⚠️ {str(e)}. Falling back to JSON.")
+    return open_export_writer("json", path)
+
 # ---------------------------------------------------------------------------
 # Command-line handler for testing
 # ---------------------------------------------------------------------------
-async def standalone_test(token_address=None, time_frame='1d'):
+async def standalone_test(token_address=None, time_frame='1d', resolution='1s'):
     """
     Standalone function for testing market cap data retrieval.
     This can be run directly from the command line.
+    
+    resolution is the candle interval for the output ('1s' keeps GMGN's raw candles).
     """
     # Basic initial setup
     token_addresses = None
@@ -617,9 +633,10 @@ async def standalone_test(token_address=None, time_frame='1d'):
             STATE_FILE_SELECTION = 1
             STATE_MANUAL_INPUT = 2
             STATE_TIME_FRAME = 3
-            STATE_SAVE_OPTION = 4
-            STATE_FILE_FORMAT = 5
-            STATE_PROCESSING = 6
+            STATE_RESOLUTION = 4
+            STATE_SAVE_OPTION = 5
+            STATE_FILE_FORMAT = 6
+            STATE_PROCESSING = 7
             
             # Initialize variables
             current_state = STATE_MAIN_MENU
@@ -851,7 +868,7 @@ async def standalone_test(token_address=None, time_frame='1d'):
                         if not time_choice:
                             label, start_date = time_options[2]  # 1 hour is index 2 (the third option)
                             print(f"\n✅ Using default time frame: {label}")
-                            current_state = STATE_SAVE_OPTION
+                            current_state = STATE_RESOLUTION
                             break
                         
                         try:
@@ -873,28 +890,28 @@ async def standalone_test(token_address=None, time_frame='1d'):
                                             # Default to 7 days if no input
                                             start_date = datetime.now() - timedelta(days=7)
                                             print(f"\n✅ Using default timeframe of 7 days")
-                                            current_state = STATE_SAVE_OPTION
+                                            current_state = STATE_RESOLUTION
                                             break
                                         elif date_input.lower().endswith('d') and date_input[:-1].isdigit():
                                             # Process days format (e.g., "30d")
                                             days = int(date_input[:-1])
                                             start_date = datetime.now() - timedelta(days=days)
                                             print(f"\n✅ Using timeframe of {days} days")
-                                            current_state = STATE_SAVE_OPTION
+                                            current_state = STATE_RESOLUTION
                                             break
                                         elif date_input.lower().endswith('h') and date_input[:-1].isdigit():
                                             # Process hours format (e.g., "12h")
                                             hours = int(date_input[:-1])
                                             start_date = datetime.now() - timedelta(hours=hours)
                                             print(f"\n✅ Using timeframe of {hours} hours")
-                                            current_state = STATE_SAVE_OPTION
+                                            current_state = STATE_RESOLUTION
                                             break
                                         elif date_input.isdigit():
                                             # Process as timestamp if it's all digits
                                             try:
                                                 start_date = int(date_input)
                                                 print(f"\n✅ Using timestamp: {start_date}")
-                                                current_state = STATE_SAVE_OPTION
+                                                current_state = STATE_RESOLUTION
                                                 break
                                             except ValueError:
                                                 print(f"\n❌ Warning: Could not parse '{date_input}' as timestamp. Please try again or type 'back'.")
@@ -903,7 +920,7 @@ async def standalone_test(token_address=None, time_frame='1d'):
                                             try:
                                                 start_date = datetime.strptime(date_input, "%Y-%m-%d")
                                                 print(f"\n✅ Using date: {start_date.strftime('%Y-%m-%d')}")
-                                                current_state = STATE_SAVE_OPTION
+                                                current_state = STATE_RESOLUTION
                                                 break
                                             except ValueError:
                                                 print(f"\n❌ Warning: Could not parse date format '{date_input}'. Please try again or type 'back'.")
@@ -918,7 +935,7 @@ async def standalone_test(token_address=None, time_frame='1d'):
                                     # Use the predefined time frame
                                     label, start_date = time_options[choice_num - 1]
                                     print(f"\n✅ Using time frame: {label}")
-                                    current_state = STATE_SAVE_OPTION
+                                    current_state = STATE_RESOLUTION
                                     break
                             elif choice_num == len(time_options) + 1:
                                 # Go back to previous step
@@ -932,6 +949,45 @@ async def standalone_test(token_address=None, time_frame='1d'):
                         except ValueError:
                             print("\n❌ Please enter a valid number")
                 
+                # Candle resolution selection
+                elif current_state == STATE_RESOLUTION:
+                    resolution_options = list(INTERVALS.keys())
+                    
+                    print("\n" + "═" * 60)
+                    print("🕯️  CANDLE RESOLUTION")
+                    print("═" * 60)
+                    print("Select the candle interval for the output:")
+                    for i, option in enumerate(resolution_options, 1):
+                        is_default = option == "1s"
+                        display_label = f"{option} 🔹 (default, raw GMGN candles)" if is_default else option
+                        print(f"  {i}. {display_label}")
+                    print(f"  {len(resolution_options) + 1}. ↩️  Back to previous step")
+                    print("─" * 60)
+                    
+                    while True:
+                        resolution_choice = input("\n➤ Select option (or press Enter for 1s): ").strip()
+                        
+                        if not resolution_choice:
+                            resolution = "1s"
+                            print("\n✅ Using default resolution: 1s")
+                            current_state = STATE_SAVE_OPTION
+                            break
+                        
+                        try:
+                            choice_num = int(resolution_choice)
+                            if 1 <= choice_num <= len(resolution_options):
+                                resolution = resolution_options[choice_num - 1]
+                                print(f"\n✅ Using resolution: {resolution}")
+                                current_state = STATE_SAVE_OPTION
+                                break
+                            elif choice_num == len(resolution_options) + 1:
+                                current_state = STATE_TIME_FRAME
+                                break
+                            else:
+                                print(f"\n❌ Please enter a number between 1 and {len(resolution_options) + 1}")
+                        except ValueError:
+                            print("\n❌ Please enter a valid number")
+                
                 # Save data option
                 elif current_state == STATE_SAVE_OPTION:
                     print("\n" + "═" * 60)
@@ -942,7 +998,7 @@ async def standalone_test(token_address=None, time_frame='1d'):
                         save_response = input("\n➤ Save data for all tokens? (y/n, default=y, or 'back'): ").lower().strip()
                         
                         if save_response == 'back':
-                            current_state = STATE_TIME_FRAME
+                            current_state = STATE_RESOLUTION
                             break
                         elif save_response in ['y', 'yes'] or not save_response:  # Default to yes if empty
                             save_file = True
@@ -967,11 +1023,14 @@ async def standalone_test(token_address=None, time_frame='1d'):
                         print("  1. JSON (.json) 🔹 (default)")
                         print("  2. Text (.txt)")
                         print("  3. Excel (.xlsx)")
-                        print("  4. ↩️  Back to previous step")
+                        print("  4. NDJSON (.ndjson) - one candle per line")
+                        print("  5. CSV (.csv)")
+                        print("  6. Columnar binary (.candles) - compressed, fastest to reload")
+                        print("  7. ↩️  Back to previous step")
                         print("─" * 60)
                         
                         while True:
-                            format_choice = input("\n➤ Select format (1-4, default=1): ").strip()
+                            format_choice = input("\n➤ Select format (1-7, default=1): ").strip()
                             
                             if not format_choice:  # Default to JSON if empty
                                 file_format = "json"
@@ -994,10 +1053,25 @@ async def standalone_test(token_address=None, time_frame='1d'):
                                 current_state = STATE_PROCESSING
                                 break
                             elif format_choice == "4":
+                                file_format = "ndjson"
+                                print("\n✅ Selected format: NDJSON")
+                                current_state = STATE_PROCESSING
+                                break
+                            elif format_choice == "5":
+                                file_format = "csv"
+                                print("\n✅ Selected format: CSV")
+                                current_state = STATE_PROCESSING
+                                break
+                            elif format_choice == "6":
+                                file_format = "columnar"
+                                print("\n✅ Selected format: Columnar binary")
+                                current_state = STATE_PROCESSING
+                                break
+                            elif format_choice == "7":
                                 current_state = STATE_SAVE_OPTION
                                 break
                             else:
-                                print("\n❌ Invalid choice. Please enter a number between 1 and 4.")
+                                print("\n❌ Invalid choice. Please enter a number between 1 and 7.")
                     else:
                         # If not saving, skip file format selection
                         current_state = STATE_PROCESSING
@@ -1021,6 +1095,8 @@ async def standalone_test(token_address=None, time_frame='1d'):
     print(f"\n📡 Fetching market cap data for: {token_addresses}")
     if isinstance(start_date, datetime):
         print(f"⏱️  Timeframe: From {start_date.strftime('%Y-%m-%d %H:%M:%S')}")
+    if resolution and resolution != "1s":
+        print(f"🕯️  Resolution: {resolution} candles")
     
     # Create output directory - this is where files will be saved
     # Base directory is relative to project root
@@ -1062,9 +1138,12 @@ async def standalone_test(token_address=None, time_frame='1d'):
             print("  1. JSON (.json) 🔹 (default)")
             print("  2. Text (.txt)")
             print("  3. Excel (.xlsx)")
+            print("  4. NDJSON (.ndjson) - one candle per line")
+            print("  5. CSV (.csv)")
+            print("  6. Columnar binary (.candles) - compressed, fastest to reload")
             print("─" * 60)
             
-            format_choice = input("\n➤ Select format (1-3, default=1): ").strip()
+            format_choice = input("\n➤ Select format (1-6, default=1): ").strip()
             if not format_choice:  # Default to JSON if empty
                 file_format = "json"
                 print("\n✅ Using default format: JSON")
@@ -1074,6 +1153,15 @@ async def standalone_test(token_address=None, time_frame='1d'):
             elif format_choice == "3":
                 file_format = "xlsx"
                 print("\n✅ Selected format: Excel")
+            elif format_choice == "4":
+                file_format = "ndjson"
+                print("\n✅ Selected format: NDJSON")
+            elif format_choice == "5":
+                file_format = "csv"
+                print("\n✅ Selected format: CSV")
+            elif format_choice == "6":
+                file_format = "columnar"
+                print("\n✅ Selected format: Columnar binary")
             else:
                 file_format = "json"  # Default to JSON for any invalid input
                 print("\n✅ Using default format: JSON")
@@ -1092,7 +1180,7 @@ async def standalone_test(token_address=None, time_frame='1d'):
         print("No token addresses provided. Exiting.")
         return []
     
-    # Empty results container
+    # Per-token summaries; the candles themselves are streamed straight to the export
     result = {}
     
     # Convert start_date to Unix timestamp if it's a datetime
@@ -1104,124 +1192,70 @@ async def standalone_test(token_address=None, time_frame='1d'):
         # Default to 7 days ago if we can't parse the input
         start_time_unix = int((datetime.now() - timedelta(days=7)).timestamp())
     
-    # Process tokens one at a time using our thread-based solution
-    for token in token_addresses:
-        print(f"\n📊 Processing token: {token}")
-        try:
-            # Process this single token using our thread-based wrapper
-            candles = run_fetch_token_mcaps_in_thread(token, start_time_unix)
-            
-            # Store results if we got any
-            if candles and isinstance(candles, list) and len(candles) > 0:
-                result[token] = candles
-                
-                # Display summary for this token if not in test mode
-                if not test_mode:
-                    first_candle = candles[0]
-                    last_candle = candles[-1]
-                    
-                    # Get timestamp safely
-                    def get_timestamp(candle):
-                        timestamp = candle.get('timestamp', candle.get('time'))
-                        if isinstance(timestamp, str):
-                            try:
-                                timestamp = int(timestamp)
-                            except ValueError:
-                                return int(time.time())
-                        elif timestamp is None:
-                            return int(time.time())
-                        
-                        # Normalize timestamp (convert from ms to seconds if needed)
-                        if timestamp > 10000000000:  # If timestamp is in milliseconds
-                            timestamp = timestamp // 1000
-                        
-                        # Validate timestamp is in reasonable range (1970-2100)
-                        current_time = int(time.time())
-                        if timestamp < 0 or timestamp > 4102444800:  # Jan 1, 2100
-                            timestamp = current_time
-                        
-                        return timestamp
-                    
-                    # Format dates safely
-                    first_timestamp = get_timestamp(first_candle)
-                    last_timestamp = get_timestamp(last_candle)
-                    
-                    # Safe date formatting
-                    try:
-                        first_time = datetime.fromtimestamp(first_timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                    except (ValueError, OverflowError, OSError):
-                        first_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        
-                    try:
-                        last_time = datetime.fromtimestamp(last_timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                    except (ValueError, OverflowError, OSError):
-                        last_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    # Get close price safely
-                    def get_close(candle):
-                        close = candle.get('close')
-                        if close is None:
-                            return 0.0
-                        if isinstance(close, str):
-                            try:
-                                return float(close)
-                            except ValueError:
-                                return 0.0
-                        return close
-                    
-                    first_close = get_close(first_candle)
-                    last_close = get_close(last_candle)
-                    
-                    # Print token summary
-                    print(f"Token: {token}")
-                    print(f"Fetched {len(candles)} candles")
-                    print(f"First candle: {first_time} - Close: {first_close:.4f}, Market Cap: {first_candle.get('market_cap', 'N/A')}")
-                    print(f"Last candle: {last_time} - Close: {last_close:.4f}, Market Cap: {last_candle.get('market_cap', 'N/A')}")
-                    print()
-            elif not test_mode:
-                print(f"No data found for token: {token}")
-            
-        except Exception as e:
-            print(f"❌ Error processing token {token}: {str(e)}")
-    
-    # Prepare summary data
-    summary_data = {}
-    for token, candles in result.items():
-        # Extract what we need for the summary
-        token_data = []
-        for candle in candles:
-            # Make sure timestamp is an integer
-            timestamp = candle.get('timestamp')
-            if timestamp is None and 'time' in candle:
-                timestamp = candle.get('time')
+    # Open the export up front so every token is written as soon as it completes.
+    # The final name depends on which tokens returned data, so we rename it at the end.
+    today = datetime.now()
+    prefix = "test_" if test_mode else ""  # Add "test_" prefix in test mode
+    writer = None
+    if save_file:
+        partial_name = f"{prefix}{today.day:02d}-{today.month:02d}-{today.year}-partial-{uuid.uuid4().hex[:8]}"
+        writer = _open_mcap_export(file_format, output_dir / partial_name, test_mode)
+    
+    # Display summary for each token as soon as it finishes, then write it out
+    def print_token_summary(token, candles):
+        if candles is not None and len(candles) > 0:
+            timestamps = candles["timestamp"]
+            result[token] = {
+                "candles": len(candles),
+                "first_timestamp": int(timestamps[0]),
+                "last_timestamp": int(timestamps[-1]),
+                "last_close": float(candles["close"][-1]),
+                "last_market_cap": float(candles["market_cap"][-1]),
+            }
             
-            # Convert string timestamps to int if needed
-            if isinstance(timestamp, str):
+            if writer is not None:
                 try:
-                    timestamp = int(timestamp)
-                except ValueError:
-                    timestamp = int(time.time())  # Use current time as fallback
-            elif timestamp is None:
-                timestamp = int(time.time())  # Use current time as fallback
+                    writer.write_token(token, candles)
+                except Exception as e:
+                    print(f"❌ Error writing {token} to export: {str(e)}")
+                    logger.error(f"Error writing {token} to export: {str(e)}")
             
-            data_point = {
-                "timestamp": timestamp,
-                "date": datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S'),
-                "open": candle.get('open', 0),
-                "high": candle.get('high', 0),
-                "low": candle.get('low', 0),
-                "close": candle.get('close', 0),
-                "volume": candle.get('volume', 0),
-                "market_cap": candle.get('market_cap', 0)
-            }
-            token_data.append(data_point)
-        summary_data[token] = token_data
+            # Display summary for this token if not in test mode
+            if not test_mode:
+                # Safe date formatting
+                try:
+                    first_time = datetime.fromtimestamp(int(timestamps[0])).strftime('%Y-%m-%d %H:%M:%S')
+                    last_time = datetime.fromtimestamp(int(timestamps[-1])).strftime('%Y-%m-%d %H:%M:%S')
+                except (ValueError, OverflowError, OSError):
+                    first_time = last_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                
+                # Print token summary
+                print(f"\nToken: {token}")
+                print(f"Fetched {len(candles)} candles")
+                print(f"First candle: {first_time} - Close: {float(candles['close'][0]):.4f}, Market Cap: {float(candles['market_cap'][0])}")
+                print(f"Last candle: {last_time} - Close: {float(candles['close'][-1]):.4f}, Market Cap: {float(candles['market_cap'][-1])}")
+                print()
+        elif not test_mode:
+            print(f"\nNo data found for token: {token}")
     
-    # Save all data to a single file
-    if save_file:
+    # Fetch all tokens together; the scheduler interleaves their requests in one thread.
+    # Candles are not kept once a token has been written, so memory stays bounded by one token.
+    print(f"\n📊 Processing {len(token_addresses)} token{'s' if len(token_addresses) > 1 else ''}")
+    try:
+        run_fetch_many_token_mcaps_in_thread(token_addresses, start_time_unix,
+                                             on_token_complete=print_token_summary,
+                                             interval=resolution if resolution != "1s" else None,
+                                             as_arrays=True, keep_results=False)
+    except Exception as e:
+        print(f"❌ Error processing tokens: {str(e)}")
+    
+    # Keep the results in the order the tokens were requested
+    result = {token: result[token] for token in token_addresses if token in result}
+    
+    # Finish the export under its final name
+    if writer is not None:
         try:
-            # Create new filename format: 'Day-Month-Year-First 3 and last 3 characters of the first token used-Number of token outputs total combined'
-            today = datetime.now()
+            # Filename format: 'Day-Month-Year-First 3 and last 3 characters of the first token used-Number of token outputs total combined'
             if result:
                 first_token = list(result.keys())[0]
                 token_identifier = f"{first_token[:3]}{first_token[-3:]}"
@@ -1229,61 +1263,10 @@ async def standalone_test(token_address=None, time_frame='1d'):
             else:
                 token_identifier = "none"
                 num_tokens = 0
-                
-            # Add "test_" prefix in test mode
-            prefix = "test_" if test_mode else ""
-            filename = f"{prefix}{today.day:02d}-{today.month:02d}-{today.year}-{token_identifier}-{num_tokens}"
             
-            if file_format == "json":
-                combined_file = output_dir / f"{filename}.json"
-                # Save the file with proper error handling
-                with open(combined_file, 'w') as f:
-                    json.dump(summary_data, f, indent=2)
-            elif file_format == "txt":
-                combined_file = output_dir / f"{filename}.txt"
-                # Save as formatted text
-                with open(combined_file, 'w') as f:
-                    f.write(json.dumps(summary_data, indent=2))
-            elif file_format == "xlsx":
-                combined_file = output_dir / f"{filename}.xlsx"
-                try:
-                    # Import pandas only when needed
-                    import pandas as pd
-                    from openpyxl import Workbook
-                    
-                    # Create Excel workbook with a sheet for each token
-                    with pd.ExcelWriter(combined_file) as writer:
-                        for token, candles in result.items():
-                            # Convert to pandas DataFrame
-                            df = pd.DataFrame(candles)
-                            # Format the sheet name (Excel sheet names limited to 31 chars)
-                            sheet_name = token[:15] if len(token) > 15 else token
-                            # Write to Excel
-                            df.to_excel(writer, sheet_name=sheet_name, index=False)
-                except ImportError:
-                    print("\n⚠️ pandas or openpyxl module not found. Installing required packages...")
-                    try:
-                        import subprocess
-                        subprocess.check_call([sys.executable, "-m", "pip", "install", "pandas", "openpyxl"])
-                        
-                        # Try again after installing
-                        import pandas as pd
-                        from openpyxl import Workbook
-                        
-                        # Create Excel workbook with a sheet for each token
-                        with pd.ExcelWriter(combined_file) as writer:
-                            for token, candles in result.items():
-                                # Convert to pandas DataFrame
-                                df = pd.DataFrame(candles)
-                                # Format the sheet name (Excel sheet names limited to 31 chars)
-                                sheet_name = token[:15] if len(token) > 15 else token
-                                # Write to Excel
-                                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                    except:
-                        print("\n❌ Failed to install required packages for Excel export. Falling back to JSON.")
-                        combined_file = output_dir / f"{filename}.json"
-                        with open(combined_file, 'w') as f:
-                            json.dump(summary_data, f, indent=2)
+            filename = f"{prefix}{today.day:02d}-{today.month:02d}-{today.year}-{token_identifier}-{num_tokens}"
+            combined_file = writer.close(output_dir / f"{filename}{writer.extension}")
+            index_file = index_path_for(combined_file)
             
             # Verify file was saved successfully
             if os.path.exists(combined_file) and os.path.getsize(combined_file) > 0:
@@ -1294,14 +1277,15 @@ async def standalone_test(token_address=None, time_frame='1d'):
                     print(f"   Directory: {output_dir}")
                     print(f"   Full path: {combined_file.absolute()}")
                     print(f"   File size: {file_size_mb:.2f} MB")
+                    print(f"   Index: {index_file.name}")
                 else:
                     print(f"✅ Data saved to: {combined_file.name} ({file_size_mb:.2f} MB)")
                 
                 # Remove test files after saving to avoid cluttering
                 if test_mode:
                     os.remove(combined_file)
-                    if not test_mode:
-                        print(f"   Test file removed: {combined_file.name}")
+                    if index_file.exists():
+                        os.remove(index_file)
             else:
                 if test_mode:
                     print(f"❌ File creation failed")
@@ -1315,6 +1299,12 @@ async def standalone_test(token_address=None, time_frame='1d'):
     elif not test_mode:
         print("Data not saved per user request.")
     
+    # Compress candle history for tokens we have not looked at in a while
+    try:
+        get_candle_store().compact_stale()
+    except Exception as e:
+        logger.warning(f"Could not compact candle store: {str(e)}")
+    
     return result
 
 if __name__ == "__main__":
@@ -8,13 +8,17 @@ import logging
 import random
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union, Tuple
 
 import httpx
-import tls_client
-from tls_client.sessions import ClientIdentifiers
+
+from ...core.http_client import shared_httpx_client
+from ...core.proxy_pool import get_proxy_pool
+from ...core.tls_pool import get_tls_pool, user_agent_for
+from ...core.token_cache import get_token_cache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, 
@@ -38,6 +42,15 @@ class Config:
     RETRY_DELAY_MIN = 1.0  # seconds
     RETRY_DELAY_MAX = 2.0  # seconds
     
+    # Token requests in flight at once (each one runs in its own TLS session thread)
+    MAX_CONCURRENCY = 8
+    
+    # Most addresses GeckoTerminal accepts in one /tokens/multi request
+    MULTI_TOKEN_BATCH_SIZE = 30
+    
+    # Token metadata cache shared by every lookup (see core.token_cache)
+    TOKEN_CACHE_NAME = "geckoterminal"
+    
     # Network mapping
     @staticmethod
     def determine_network(address: str) -> str:
@@ -46,51 +59,58 @@ class Config:
             return "solana"
         return "ethereum"  # Default to Ethereum for other formats
 
+def group_addresses_by_network(token_addresses: List[str]) -> Dict[str, List[str]]:
+    """Group unique, non-empty addresses by their GeckoTerminal network, keeping input order."""
+    groups: Dict[str, List[str]] = {}
+    for address in dict.fromkeys(token_addresses):
+        if address:
+            groups.setdefault(Config.determine_network(address), []).append(address)
+    return groups
+
+def _address_key(network: str, address: str) -> str:
+    # EVM addresses come back checksummed or lowercased; Solana addresses are case-sensitive
+    return address if network == "solana" else address.lower()
+
 # ---------------------------------------------------------------------------
 # Helper class for making API requests
 # ---------------------------------------------------------------------------
 class ApiClient:
-    """API client with browser fingerprinting evasion."""
+    """
+    API client with browser fingerprinting evasion.
+    
+    tls_client is synchronous, so requests run on a bounded pool of worker
+    threads, each checking a warm TLS session out of the shared pool for the
+    request. The event loop stays free and up to ``max_concurrency`` tokens are
+    fetched at the same time.
+    """
     
-    def __init__(self, use_proxies: bool = False):
-        """Initialize API client with browser fingerprinting evasion."""
+    def __init__(self, use_proxies: bool = False, max_concurrency: Optional[int] = None):
+        """
+        Initialize API client with browser fingerprinting evasion.
+        
+        Args:
+            use_proxies: Whether to use proxies for the requests
+            max_concurrency: Requests in flight at once (defaults to Config.MAX_CONCURRENCY)
+        """
         self.use_proxies = use_proxies
-        self.proxy_position = 0
         self.max_retries = Config.MAX_RETRIES
         self.timeout_sec = Config.REQUEST_TIMEOUT
-        self.randomize_session()
-    
-    def randomize_session(self):
-        """Create a new TLS session with randomized browser fingerprint."""
-        try:
-            # Try to create a TLS client session using a fixed identifier to avoid type issues
-            # This is a workaround for the linter errors with ClientIdentifiers
-            self.identifier = "chrome_103"  # Use a string that matches a valid client identifier
-            
-            try:
-                # Create session with direct string - this may work depending on implementation
-                self.session = tls_client.Session(
-                    random_tls_extension_order=True,
-                    client_identifier="chrome_103"  # Using a simple string to avoid type issues
-                )
-            except TypeError:
-                # Fallback - create without client_identifier if needed
-                self.session = tls_client.Session(
-                    random_tls_extension_order=True
-                )
-                logger.debug("Created TLS session without client_identifier due to type error")
-            
-            # Use a fixed user agent
-            self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/103.0.0.0 Safari/537.36"
-            
-        except Exception as e:
-            # Create a dummy session if tls_client fails
-            logger.warning(f"Failed to create TLS session: {e}, falling back to regular HTTP client")
-            self.identifier = "chrome_103"
-            self.session = None
-            self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/103.0.0.0 Safari/537.36"
+        self.max_concurrency = max(1, max_concurrency or Config.MAX_CONCURRENCY)
+        
+        # Warm TLS sessions are checked out of the shared pool per request
+        self.tls_pool = get_tls_pool()
+        self._tls_available = True
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
         
-        # Set headers to mimic browser
+        # Throughput stats
+        self.requests_made = 0
+        self.request_seconds = 0.0
+        self._first_request_at: Optional[float] = None
+        self._last_response_at: Optional[float] = None
+        
+        # Headers to mimic a browser; TLS requests swap in the user agent matching their fingerprint
+        self.user_agent = user_agent_for("chrome_103")
         self.headers = {
             'accept': 'application/json, text/plain, */*',
             'accept-language': 'en-US,en;q=0.9',
@@ -99,57 +119,95 @@ class ApiClient:
             'referer': 'https://www.geckoterminal.com/'
         }
     
-    def load_proxies(self) -> List[Dict[str, str]]:
-        """Load proxies from the proxies.txt file."""
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                thread_name_prefix="gecko-tls")
+        return self._executor
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores belong to a loop, and callers may use this client from several loops
+        loop = asyncio.get_running_loop()
+        for closed in [other for other in self._semaphores if other.is_closed()]:
+            del self._semaphores[closed]
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+    
+    def close(self) -> None:
+        """Shut down the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    def throughput(self) -> float:
+        """Completed requests per second of wall time since the first request."""
+        if not self.requests_made or self._first_request_at is None or self._last_response_at is None:
+            return 0.0
+        elapsed = self._last_response_at - self._first_request_at
+        return self.requests_made / elapsed if elapsed > 0 else float(self.requests_made)
+    
+    def _tls_get(self, url: str):
+        """Run a blocking tls_client request on a worker thread with a pooled session."""
         try:
-            from ...core.config import INPUT_DATA_DIR
-            proxies_file = INPUT_DATA_DIR / "proxies" / "proxies.txt"
-            
-            if not proxies_file.exists():
-                return []
-            
-            with open(proxies_file, 'r') as file:
-                proxy_lines = file.read().splitlines()
-            
-            formatted_proxies = []
-            for proxy in proxy_lines:
-                if not proxy or proxy.startswith('#'):
-                    continue
-                    
-                if ':' in proxy:  
-                    parts = proxy.split(':')
-                    if len(parts) == 4:  # ip:port:username:password
-                        ip, port, username, password = parts
-                        formatted_proxies.append({
-                            'http': f"http://{username}:{password}@{ip}:{port}",
-                            'https': f"http://{username}:{password}@{ip}:{port}"
-                        })
-                    elif len(parts) == 2:  # ip:port
-                        ip, port = parts
-                        formatted_proxies.append({
-                            'http': f"http://{ip}:{port}",
-                            'https': f"http://{ip}:{port}"
-                        })
-                else:
-                    formatted_proxies.append({
-                        'http': f"http://{proxy}",
-                        'https': f"http://{proxy}"
-                    })
-                    
-            return formatted_proxies
+            pooled = self.tls_pool.checkout()
         except Exception as e:
-            logger.error(f"Error loading proxies: {e}")
-            return []
+            logger.warning(f"Failed to create TLS session: {e}, falling back to regular HTTP client")
+            self._tls_available = False
+            return None
+        
+        headers = {**self.headers, 'user-agent': pooled.user_agent}
+        proxy = self.get_next_proxy() if self.use_proxies else None
+        pooled.session.proxies = proxy or {}
+        started = time.monotonic()
+        try:
+            response = pooled.get(url, headers=headers)
+            ok = response.status_code in (200, 404)
+            if not ok:
+                pooled.mark_failed()
+        except Exception:
+            # Retire the session so the retry gets a fresh fingerprint
+            pooled.mark_failed()
+            if self.use_proxies:
+                get_proxy_pool().report(proxy, False, time.monotonic() - started)
+            raise
+        finally:
+            self.tls_pool.checkin(pooled)
+        
+        if self.use_proxies:
+            get_proxy_pool().report(proxy, ok, time.monotonic() - started, response.status_code)
+        return response
+    
+    async def _get(self, url: str):
+        """Send one GET without blocking the event loop."""
+        async with self._get_semaphore():
+            started = time.monotonic()
+            if self._first_request_at is None:
+                self._first_request_at = started
+            try:
+                response = None
+                if self._tls_available:
+                    loop = asyncio.get_running_loop()
+                    response = await loop.run_in_executor(self._get_executor(), self._tls_get, url)
+                if response is None:
+                    # Borrow the pooled httpx client so retries reuse the open connection
+                    async with shared_httpx_client() as client:
+                        response = await client.get(url, headers=self.headers, timeout=self.timeout_sec)
+                return response
+            finally:
+                finished = time.monotonic()
+                self.requests_made += 1
+                self.request_seconds += finished - started
+                self._last_response_at = finished
+    
+    def load_proxies(self) -> List[Dict[str, str]]:
+        """Return the proxies listed in proxies.txt (parsed once, reloaded when the file changes)."""
+        return get_proxy_pool().proxies()
     
     def get_next_proxy(self) -> Optional[Dict[str, str]]:
-        """Get the next proxy from the rotation."""
-        proxies = self.load_proxies()
-        if not proxies:
-            return None
-            
-        proxy = proxies[self.proxy_position % len(proxies)]
-        self.proxy_position += 1
-        return proxy
+        """Pick a proxy from the shared pool, favouring healthy ones."""
+        return get_proxy_pool().acquire()
 
     async def fetch_token_data(self, token_address: str) -> Dict[str, Any]:
         """
@@ -170,28 +228,95 @@ class ApiClient:
         # Build the API URL
         url = f"{Config.GECKO_TERMINAL_URL}/{network}/tokens/{token_address}"
         
+        data, error = await self._fetch_gecko_data(url, token_address)
+        if error:
+            return error
+        
+        logger.debug(f"Successfully fetched token data for {token_address}")
+        return self._process_gecko_terminal_data(data or {})
+    
+    async def fetch_tokens_batch(self, token_addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch token data for many tokens with GeckoTerminal's multi-token endpoint.
+        
+        Addresses are grouped by network and sent up to
+        Config.MULTI_TOKEN_BATCH_SIZE at a time; every combined response is
+        fanned back out into one ``_process_gecko_terminal_data`` result per address.
+        
+        Args:
+            token_addresses: Token addresses to fetch data for
+            
+        Returns:
+            Dictionary mapping each address to its token data or error information
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        batches = []
+        for network, addresses in group_addresses_by_network(token_addresses).items():
+            for start in range(0, len(addresses), Config.MULTI_TOKEN_BATCH_SIZE):
+                batches.append((network, addresses[start:start + Config.MULTI_TOKEN_BATCH_SIZE]))
+        
+        for address in token_addresses:
+            if not address:
+                results[address] = {"error": "Empty token address", "code": 400}
+        
+        batch_results = await asyncio.gather(*(self._fetch_multi(network, batch) for network, batch in batches))
+        for batch_result in batch_results:
+            results.update(batch_result)
+        
+        # Same order as requested
+        return {address: results[address] for address in dict.fromkeys(token_addresses)}
+    
+    async def _fetch_multi(self, network: str, addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch one multi-token batch and split it into per-address results."""
+        url = f"{Config.GECKO_TERMINAL_URL}/{network}/tokens/multi/{','.join(addresses)}"
+        data, error = await self._fetch_gecko_data(url, f"{len(addresses)} {network} tokens", retry_not_found=False)
+        if error:
+            if error.get("code") == 404:
+                data = []
+            else:
+                return {address: dict(error) for address in addresses}
+        
+        by_address = {}
+        for item in data if isinstance(data, list) else []:
+            item_address = (item.get("attributes") or {}).get("address") or (item.get("id") or "").split("_")[-1]
+            if item_address:
+                by_address[_address_key(network, item_address)] = item
+        
+        results = {}
+        for address in addresses:
+            item = by_address.get(_address_key(network, address))
+            if item is None:
+                logger.info(f"Token not found in multi-token response for {address} - this is normal for new tokens")
+                results[address] = {"error": "Token not found in GeckoTerminal API", "code": 404}
+            else:
+                results[address] = self._process_gecko_terminal_data(item)
+        return results
+    
+    async def _fetch_gecko_data(self, url: str, description: str,
+                                retry_not_found: bool = True) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """
+        GET a GeckoTerminal URL with retries and return its ``data`` payload.
+        
+        Args:
+            url: URL to request
+            description: What is being fetched, for log messages
+            retry_not_found: Retry a 404 once before giving up
+            
+        Returns:
+            (data, None) on success or (None, error dict) on failure
+        """
         logger.debug(f"Fetching token data from: {url}")
         
         for attempt in range(self.max_retries):
-            logger.debug(f"Attempt {attempt+1}/{self.max_retries} to get token data for {token_address}")
+            logger.debug(f"Attempt {attempt+1}/{self.max_retries} to get token data for {description}")
             
-            # Randomize session after first attempt
-            if attempt > 0:
-                self.randomize_session()
-                
             try:
-                response = None
-                
-                # Use tls_client if available, otherwise fall back to httpx
-                if self.session:
-                    response = self.session.get(url, headers=self.headers)
-                else:
-                    # Use httpx with timeout
-                    async with httpx.AsyncClient(timeout=self.timeout_sec) as client:
-                        response = await client.get(url, headers=self.headers)
+                # Use tls_client if available (a failed session is replaced with a
+                # fresh fingerprint before the retry), otherwise fall back to httpx
+                response = await self._get(url)
                 
                 if response and response.status_code == 200:
-                    # Extract and process the data
+                    # Extract the data
                     data = {}
                     if hasattr(response, 'json'):
                         try:
@@ -202,7 +327,7 @@ class ApiClient:
                                 if response_text is not None:
                                     json_data = json.loads(response_text)
                                 else:
-                                    return {"error": "Empty response", "code": 500}
+                                    return None, {"error": "Empty response", "code": 500}
                             data = json_data.get("data", {}) or {}
                         except:
                             # If we can't parse JSON, try to extract from text
@@ -212,19 +337,18 @@ class ApiClient:
                                     json_data = json.loads(response_text)
                                     data = json_data.get("data", {}) or {}
                                 else:
-                                    return {"error": "Empty response", "code": 500}
+                                    return None, {"error": "Empty response", "code": 500}
                             except:
-                                return {"error": "Failed to parse JSON response", "code": 500}
+                                return None, {"error": "Failed to parse JSON response", "code": 500}
                     
-                    logger.debug(f"Successfully fetched token data for {token_address}")
-                    return self._process_gecko_terminal_data(data)
+                    return data, None
                 
                 # Handle 404 errors specially (token not found)
                 if response and response.status_code == 404:
-                    logger.info(f"Token not found (404) for {token_address} - this is normal for new tokens")
+                    logger.info(f"Token not found (404) for {description} - this is normal for new tokens")
                     # Only retry once for 404 errors
-                    if attempt > 0:
-                        return {"error": "Token not found in GeckoTerminal API", "code": 404}
+                    if attempt > 0 or not retry_not_found:
+                        return None, {"error": "Token not found in GeckoTerminal API", "code": 404}
                 
                 # If we get here, the request failed
                 error_msg = f"Status: {response.status_code}" if response else "No response"
@@ -240,7 +364,7 @@ class ApiClient:
                 await asyncio.sleep(random.uniform(Config.RETRY_DELAY_MIN, Config.RETRY_DELAY_MAX))
         
         # If we've exhausted all retries
-        return {"error": f"Failed after {self.max_retries} attempts", "code": 500}
+        return None, {"error": f"Failed after {self.max_retries} attempts", "code": 500}
     
     def _process_gecko_terminal_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -298,50 +422,106 @@ class ApiClient:
 # ---------------------------------------------------------------------------
 # Main function to fetch token data for a single token
 # ---------------------------------------------------------------------------
-async def fetch_token_data_async(token_address: str, use_proxies: bool = False) -> Dict[str, Any]:
+async def fetch_token_data_async(token_address: str, use_proxies: bool = False,
+                                 use_cache: bool = True, include_market: bool = True) -> Dict[str, Any]:
     """
     Fetch token data for a single token.
     
     Args:
         token_address: The token address to fetch data for
         use_proxies: Whether to use proxies for the requests
+        use_cache: Serve fresh results from the token metadata cache and store new ones
+        include_market: Whether price and market fields are needed; when False a
+            cached token's static fields (name, symbol, decimals, supply) are served
+            for the longer static TTL
         
     Returns:
         Dictionary with token data
     """
-    client = ApiClient(use_proxies=use_proxies)
-    return await client.fetch_token_data(token_address)
+    cache = get_token_cache(Config.TOKEN_CACHE_NAME) if use_cache and token_address else None
+    network = Config.determine_network(token_address) if token_address else None
+    if cache is not None:
+        cached = cache.get(network, token_address, include_market=include_market)
+        if cached is not None:
+            logger.debug(f"Token data for {token_address} served from cache")
+            return cached
+    
+    client = ApiClient(use_proxies=use_proxies, max_concurrency=1)
+    try:
+        result = await client.fetch_token_data(token_address)
+    finally:
+        client.close()
+    
+    if cache is not None:
+        cache.put(network, token_address, result)
+    return result
 
 # ---------------------------------------------------------------------------
 # Function to fetch token data for multiple tokens
 # ---------------------------------------------------------------------------
-async def fetch_multiple_tokens_async(token_addresses: List[str], use_proxies: bool = False) -> Dict[str, Dict[str, Any]]:
+async def fetch_multiple_tokens_async(token_addresses: List[str], use_proxies: bool = False,
+                                      max_concurrency: Optional[int] = None,
+                                      use_cache: bool = True,
+                                      include_market: bool = True) -> Dict[str, Dict[str, Any]]:
     """
     Fetch token data for multiple tokens asynchronously.
     
+    Tokens with fresh entries in the token metadata cache are answered from the
+    cache; only the rest go to the API.
+    
     Args:
         token_addresses: List of token addresses to fetch data for
         use_proxies: Whether to use proxies for the requests
+        max_concurrency: Requests in flight at once (defaults to Config.MAX_CONCURRENCY)
+        use_cache: Serve fresh results from the token metadata cache and store new ones
+        include_market: Whether price and market fields are needed (see fetch_token_data_async)
         
     Returns:
         Dictionary mapping token addresses to their data
     """
-    # Create a single client to use for all requests
-    client = ApiClient(use_proxies=use_proxies)
+    cache = get_token_cache(Config.TOKEN_CACHE_NAME) if use_cache else None
+    cached_results: Dict[str, Dict[str, Any]] = {}
+    to_fetch = token_addresses
+    if cache is not None:
+        to_fetch = []
+        for token in dict.fromkeys(token_addresses):
+            cached = cache.get(Config.determine_network(token), token, include_market=include_market) if token else None
+            if cached is not None:
+                cached_results[token] = cached
+            else:
+                to_fetch.append(token)
     
-    # Create tasks for each token
-    tasks = {token: asyncio.create_task(client.fetch_token_data(token)) for token in token_addresses}
+    # Create a single client to use for all requests
+    client = ApiClient(use_proxies=use_proxies, max_concurrency=max_concurrency)
+    started = time.monotonic()
     
-    # Wait for all tasks to complete
     results = {}
-    for token, task in tasks.items():
-        try:
-            results[token] = await task
-        except Exception as e:
-            logger.error(f"Error fetching token data for {token}: {e}")
-            results[token] = {"error": str(e), "code": 500}
+    try:
+        if to_fetch:
+            # Hold the pooled HTTP client open for the whole batch
+            async with shared_httpx_client():
+                # One request per network and batch of addresses; the client bounds how many run at once
+                try:
+                    results = await client.fetch_tokens_batch(to_fetch)
+                except Exception as e:
+                    logger.error(f"Error fetching token data for {len(to_fetch)} tokens: {e}")
+                    results = {token: {"error": str(e), "code": 500} for token in to_fetch}
+    finally:
+        client.close()
+    
+    if cache is not None:
+        for token, data in results.items():
+            if token:
+                cache.put(Config.determine_network(token), token, data)
+    
+    elapsed = time.monotonic() - started
+    logger.info(f"Fetched {len(results)} tokens in {elapsed:.1f}s with {client.max_concurrency} workers "
+                f"({client.requests_made} requests, {client.throughput():.1f} req/s, "
+                f"{len(cached_results)} from cache)")
     
-    return results
+    # Same order as requested
+    results.update(cached_results)
+    return {token: results[token] for token in dict.fromkeys(token_addresses)}
 
 # ---------------------------------------------------------------------------
 # Main entry point for standalone usage
@@ -374,12 +554,13 @@ async def standalone_fetch_token_data(token_address: Union[str, List[str]], use_
 # ---------------------------------------------------------------------------
 # Helper functions for GMGNAdapter to call
 # ---------------------------------------------------------------------------
-def get_token_info_sync(contract_address: str) -> Dict[str, Any]:
+def get_token_info_sync(contract_address: str, include_market: bool = True) -> Dict[str, Any]:
     """
     Synchronous version of get_token_info.
     
     Args:
         contract_address: Contract address of the token
+        include_market: Whether price and market fields are needed
         
     Returns:
         Token information dictionary
@@ -387,21 +568,22 @@ def get_token_info_sync(contract_address: str) -> Dict[str, Any]:
     # Run the async function in a new event loop
     loop = asyncio.new_event_loop()
     try:
-        return loop.run_until_complete(fetch_token_data_async(contract_address))
+        return loop.run_until_complete(fetch_token_data_async(contract_address, include_market=include_market))
     finally:
         loop.close()
 
-async def get_token_info(contract_address: str) -> Dict[str, Any]:
+async def get_token_info(contract_address: str, include_market: bool = True) -> Dict[str, Any]:
     """
     Get token information asynchronously.
     
     Args:
         contract_address: Contract address of the token
+        include_market: Whether price and market fields are needed
         
     Returns:
         Token information dictionary
     """
-    return await fetch_token_data_async(contract_address)
+    return await fetch_token_data_async(contract_address, include_market=include_market)
 
 async def get_new_tokens() -> List[Dict[str, Any]]:
     """
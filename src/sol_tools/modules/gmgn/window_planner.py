@@ -0,0 +1,189 @@
+"""
+Adaptive request-window planning for GMGN mcapkline fetches.
+
+Instead of cutting history into fixed 3000 second batches, the planner hands out
+windows whose size follows the candle density actually returned for the token,
+shrinks them when a response looks truncated or slow, and re-queues whatever
+part of a truncated window was not delivered.
+"""
+
+import logging
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Time ranges are half-open ``(start, end)`` unix second pairs
+TimeRange = Tuple[int, int]
+
+
+# ---------------------------------------------------------------------------
+# Configuration constants
+# ---------------------------------------------------------------------------
+class Config:
+    """Tuning constants for the window planner."""
+
+    # Window size bounds (seconds)
+    INITIAL_WINDOW = 3000
+    MIN_WINDOW = 60
+    MAX_WINDOW = 7 * 24 * 3600
+
+    # Most candles GMGN returns for one request; a full response may be truncated
+    MAX_CANDLES_PER_REQUEST = 3000
+    # Aim each request at this fraction of the per-request maximum
+    TARGET_FILL = 0.8
+
+    # Largest factor a window may grow or shrink by after a single response
+    MAX_GROWTH = 4.0
+    MAX_SHRINK = 4.0
+
+    # Responses slower than this shrink the next windows proportionally (seconds)
+    LATENCY_TARGET = 5.0
+
+    # Windows in flight at once for a single token
+    MAX_IN_FLIGHT = 4
+
+
+def candle_time(candle: Any) -> Optional[int]:
+    """Extract a candle's unix timestamp in seconds from either raw GMGN shape."""
+    try:
+        if isinstance(candle, dict):
+            value = candle.get('time')
+            if value is None:
+                value = candle.get('timestamp')
+        elif isinstance(candle, (list, tuple)) and candle:
+            value = candle[0]
+        else:
+            return None
+        value = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return value // 1000 if value > 10000000000 else value
+
+
+class WindowPlanner:
+    """Plans GMGN request windows for one token and adapts them from feedback."""
+
+    def __init__(self, ranges: List[TimeRange], initial_window: Optional[int] = None,
+                 min_window: Optional[int] = None, max_window: Optional[int] = None,
+                 max_candles: Optional[int] = None):
+        """
+        Initialize the planner.
+
+        Args:
+            ranges: Time ranges that need to be fetched
+            initial_window: Starting window size in seconds
+            min_window: Smallest window the planner will request
+            max_window: Largest window the planner will request
+            max_candles: Most candles the API returns for a single request
+        """
+        self.min_window = min_window or Config.MIN_WINDOW
+        self.max_window = max_window or Config.MAX_WINDOW
+        self.max_candles = max_candles or Config.MAX_CANDLES_PER_REQUEST
+        self.window = float(self._clamp(initial_window or Config.INITIAL_WINDOW))
+
+        self.pending: Deque[TimeRange] = deque(sorted((int(s), int(e)) for s, e in ranges if e > s))
+        self.total_seconds = sum(end - start for start, end in self.pending)
+        self.done_seconds = 0
+        self.in_flight = 0
+
+        # Stats for logging
+        self.requests = 0
+        self.truncated = 0
+
+    def _clamp(self, size: float) -> float:
+        return max(self.min_window, min(self.max_window, size))
+
+    @property
+    def has_pending(self) -> bool:
+        """Whether there are windows left to hand out."""
+        return bool(self.pending)
+
+    @property
+    def finished(self) -> bool:
+        """Whether every window has been handed out and answered."""
+        return not self.pending and self.in_flight == 0
+
+    def next_window(self) -> Optional[TimeRange]:
+        """Take the next window to request, sized with the current estimate."""
+        if not self.pending:
+            return None
+
+        start, end = self.pending.popleft()
+        window_end = min(end, start + int(self.window))
+        if window_end < end:
+            self.pending.appendleft((window_end, end))
+
+        self.in_flight += 1
+        self.requests += 1
+        return start, window_end
+
+    def record(self, window: TimeRange, candles: Optional[List[Any]], latency: float) -> List[TimeRange]:
+        """
+        Feed back the result of a window and adapt the window size.
+
+        Args:
+            window: Window that was requested
+            candles: Raw candles returned, or None if the request failed
+            latency: Seconds the request took
+
+        Returns:
+            Parts of the window that are now known to be fully fetched
+        """
+        self.in_flight -= 1
+        start, end = window
+        duration = max(1, end - start)
+
+        if candles is None:
+            # Failed requests are not retried here and say nothing about candle density
+            self.done_seconds += duration
+            return []
+
+        count = len(candles)
+        covered = [(start, end)]
+
+        if count >= self.max_candles:
+            times = [t for t in (candle_time(c) for c in candles) if t is not None]
+            if times:
+                first, last = min(times), max(times)
+                # Re-queue whichever edge of the window the response did not reach
+                missing = []
+                if first > start:
+                    missing.append((start, first))
+                if last + 1 < end:
+                    missing.append((last + 1, end))
+                if missing:
+                    self.truncated += 1
+                    covered = [(max(start, first), min(end, last + 1))]
+                    for gap in reversed(missing):
+                        self.pending.appendleft(gap)
+                        self.done_seconds -= gap[1] - gap[0]
+            # Full responses always mean the window was at least big enough
+            self._resize(min(self.window, duration) / 2)
+        else:
+            target = self.max_candles * Config.TARGET_FILL
+            if count == 0:
+                proposed = duration * Config.MAX_GROWTH
+            else:
+                proposed = target * duration / count
+
+            if latency > Config.LATENCY_TARGET:
+                proposed *= Config.LATENCY_TARGET / latency
+
+            # Smooth against the current estimate so a single outlier can't swing it
+            self._resize((self.window + proposed) / 2)
+
+        self.done_seconds += duration
+        return covered
+
+    def _resize(self, proposed: float) -> None:
+        lower = self.window / Config.MAX_SHRINK
+        upper = self.window * Config.MAX_GROWTH
+        self.window = self._clamp(max(lower, min(upper, proposed)))
+
+    def progress(self) -> float:
+        """Fraction of the requested time span that has been answered."""
+        if self.total_seconds <= 0:
+            return 1.0
+        return min(1.0, max(0.0, self.done_seconds / self.total_seconds))
+
@@ -0,0 +1,136 @@
+"""
+Test the shared HTTP client layer.
+
+Tests the retry policy, session borrowing and JSON retries against a local server.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from ...core.http_client import HttpClientPool, RetryPolicy, get_json
+from ...tests.base_tester import BaseTester, cprint
+
+
+class HttpClientTester(BaseTester):
+    """Test the pooled HTTP client layer."""
+
+    def __init__(self):
+        """Initialize the HttpClientTester."""
+        super().__init__("HttpClient")
+
+    async def test_retry_policy(self) -> bool:
+        """Test retry decisions, backoff bounds and Retry-After handling."""
+        try:
+            policy = RetryPolicy(max_retries=3, backoff_min=0.5, backoff_max=1.0)
+
+            if not policy.should_retry(0, 503) or not policy.should_retry(1, None):
+                cprint("  ❌ Retryable failures were not retried", "red")
+                return False
+            if policy.should_retry(0, 404) or policy.should_retry(2, 503):
+                cprint("  ❌ Retried a permanent failure or past the last attempt", "red")
+                return False
+
+            delays = [policy.delay(1) for _ in range(50)]
+            if min(delays) < 1.0 or max(delays) > 2.0:
+                cprint(f"  ❌ Backoff outside expected bounds: {min(delays)}..{max(delays)}", "red")
+                return False
+            if policy.delay(0, retry_after="7") != 7.0 or policy.delay(0, retry_after="999") != 60.0:
+                cprint("  ❌ Retry-After was not honoured", "red")
+                return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_retry_policy: {str(e)}", "red")
+            self.logger.exception("Exception in test_retry_policy")
+            return False
+
+    async def test_session_borrowing(self) -> bool:
+        """Test that nested borrows share one session that closes after the last borrower."""
+        try:
+            pool = HttpClientPool()
+            async with pool.aiohttp_session() as outer:
+                async with pool.aiohttp_session() as inner:
+                    if inner is not outer:
+                        cprint("  ❌ Nested borrow created a second session", "red")
+                        return False
+                if outer.closed:
+                    cprint("  ❌ Session closed while still borrowed", "red")
+                    return False
+
+            if not outer.closed or pool.sessions_created != 1:
+                cprint("  ❌ Session was not closed after the last borrower", "red")
+                return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_session_borrowing: {str(e)}", "red")
+            self.logger.exception("Exception in test_session_borrowing")
+            return False
+
+    async def test_get_json_retries(self) -> bool:
+        """Test that get_json retries a 503 and reuses its connection."""
+        calls = []
+
+        async def handler(request):
+            calls.append(request.transport.get_extra_info("peername"))
+            if len(calls) == 1:
+                return web.Response(status=503, text="busy", headers={"Retry-After": "0"})
+            return web.json_response({"status": "1", "result": "ok"})
+
+        app = web.Application()
+        app.router.add_get("/api", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+
+        try:
+            port = site._server.sockets[0].getsockname()[1]
+            pool = HttpClientPool()
+            async with pool.aiohttp_session() as session:
+                status, data = await get_json(session, f"http://127.0.0.1:{port}/api",
+                                              retry=RetryPolicy(max_retries=3, backoff_min=0, backoff_max=0))
+
+            if status != 200 or data != {"status": "1", "result": "ok"}:
+                cprint(f"  ❌ Unexpected response: {status} {data}", "red")
+                return False
+            if len(calls) != 2 or calls[0] != calls[1]:
+                cprint(f"  ❌ Expected two requests over one connection, got {calls}", "red")
+                return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_get_json_retries: {str(e)}", "red")
+            self.logger.exception("Exception in test_get_json_retries")
+            return False
+        finally:
+            await runner.cleanup()
+
+
+async def run_http_client_tests(options: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Run all HTTP client tests.
+
+    Args:
+        options: Test runner options (unused)
+
+    Returns:
+        0 if all tests passed, 1 otherwise
+    """
+    tester = HttpClientTester()
+    tests = [
+        ("Retry Policy", tester.test_retry_policy),
+        ("Session Borrowing", tester.test_session_borrowing),
+        ("JSON Retries", tester.test_get_json_retries)
+    ]
+    try:
+        results: Dict[str, Dict] = await tester.run_tests(tests)
+        return 0 if all(result["status"] == "passed" for result in results.values()) else 1
+    finally:
+        tester.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_http_client_tests())
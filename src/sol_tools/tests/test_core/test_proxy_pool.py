@@ -0,0 +1,141 @@
+"""
+Test the shared proxy pool.
+
+Tests file reloading on mtime changes, health-weighted selection and quarantine.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ...core import proxy_pool
+from ...core.proxy_pool import ProxyConfig, ProxyPool, parse_proxy_line
+from ...tests.base_tester import BaseTester, cprint
+
+
+class ProxyPoolTester(BaseTester):
+    """Test the health-scored proxy pool."""
+
+    def __init__(self):
+        """Initialize the ProxyPoolTester."""
+        super().__init__("ProxyPool")
+        self._original_interval = ProxyConfig.RELOAD_CHECK_INTERVAL
+
+    def _write_proxies(self, path: Path, lines, mtime: float) -> None:
+        path.write_text("\n".join(lines) + "\n")
+        os.utime(path, (mtime, mtime))
+
+    async def test_reload_on_change(self) -> bool:
+        """Test that the file is parsed once and re-read only after it changes."""
+        try:
+            ProxyConfig.RELOAD_CHECK_INTERVAL = 0
+            with tempfile.TemporaryDirectory() as root:
+                path = Path(root) / "proxies.txt"
+                self._write_proxies(path, ["# comment", "1.1.1.1:8080", "2.2.2.2:8080:user:pass"], 1000)
+                pool = ProxyPool(path)
+
+                for _ in range(20):
+                    pool.acquire()
+                if len(pool) != 2 or pool.reloads != 1:
+                    cprint(f"  ❌ Expected one parse of two proxies, got {len(pool)} / {pool.reloads}", "red")
+                    return False
+
+                self._write_proxies(path, ["1.1.1.1:8080", "3.3.3.3:8080", "4.4.4.4:8080"], 2000)
+                if len(pool) != 3 or pool.reloads != 2:
+                    cprint("  ❌ Changed file was not reloaded", "red")
+                    return False
+
+            if parse_proxy_line("9.9.9.9:80:u:p") != {"http": "http://u:p@9.9.9.9:80", "https": "http://u:p@9.9.9.9:80"}:
+                cprint("  ❌ Authenticated proxy was not parsed", "red")
+                return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_reload_on_change: {str(e)}", "red")
+            self.logger.exception("Exception in test_reload_on_change")
+            return False
+        finally:
+            ProxyConfig.RELOAD_CHECK_INTERVAL = self._original_interval
+
+    async def test_health_weighting(self) -> bool:
+        """Test that fast, reliable proxies are picked more often and failing ones are quarantined."""
+        try:
+            with tempfile.TemporaryDirectory() as root:
+                path = Path(root) / "proxies.txt"
+                self._write_proxies(path, ["1.1.1.1:80", "2.2.2.2:80", "3.3.3.3:80"], 1000)
+                pool = ProxyPool(path)
+                good, slow, dead = pool.proxies()
+
+                for _ in range(10):
+                    pool.report(good, True, latency=0.1)
+                    pool.report(slow, True, latency=2.0)
+                for _ in range(ProxyConfig.FAILURE_THRESHOLD):
+                    pool.report(dead, False, latency=5.0)
+
+                picks = Counter(pool.acquire()["http"] for _ in range(500))
+                if picks[dead["http"]] != 0:
+                    cprint("  ❌ Quarantined proxy was picked", "red")
+                    return False
+                if picks[good["http"]] <= 3 * picks[slow["http"]]:
+                    cprint(f"  ❌ Healthy proxy was not preferred: {dict(picks)}", "red")
+                    return False
+
+                # Once the quarantine expires the proxy is eligible again
+                pool._health[dead["http"]].quarantined_until = time.time() - 1
+                if not any(pool.acquire() == dead for _ in range(500)):
+                    cprint("  ❌ Proxy stayed out after its quarantine", "red")
+                    return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_health_weighting: {str(e)}", "red")
+            self.logger.exception("Exception in test_health_weighting")
+            return False
+
+    async def test_shared_pool(self) -> bool:
+        """Test that callers share one pool per proxy file."""
+        try:
+            with tempfile.TemporaryDirectory() as root:
+                path = Path(root) / "proxies.txt"
+                if proxy_pool.get_proxy_pool(path) is not proxy_pool.get_proxy_pool(str(path)):
+                    cprint("  ❌ Pool is not shared", "red")
+                    return False
+                if proxy_pool.get_proxy_pool(path).acquire() is not None:
+                    cprint("  ❌ Missing proxy file should yield no proxy", "red")
+                    return False
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_shared_pool: {str(e)}", "red")
+            self.logger.exception("Exception in test_shared_pool")
+            return False
+
+
+async def run_proxy_pool_tests(options: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Run all proxy pool tests.
+
+    Args:
+        options: Test runner options (unused)
+
+    Returns:
+        0 if all tests passed, 1 otherwise
+    """
+    tester = ProxyPoolTester()
+    tests = [
+        ("Reload On Change", tester.test_reload_on_change),
+        ("Health Weighting", tester.test_health_weighting),
+        ("Shared Pool", tester.test_shared_pool)
+    ]
+    try:
+        results: Dict[str, Dict] = await tester.run_tests(tests)
+        return 0 if all(result["status"] == "passed" for result in results.values()) else 1
+    finally:
+        tester.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_proxy_pool_tests())
@@ -0,0 +1,105 @@
+"""
+Test the shared rate limiter.
+
+Tests burst allowance, steady-state pacing and sharing one budget across threads.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ...core.rate_limiter import RateLimiter, get_rate_limiter
+from ...tests.base_tester import BaseTester, cprint
+
+
+class RateLimiterTester(BaseTester):
+    """Test the token-bucket rate limiter."""
+
+    def __init__(self):
+        """Initialize the RateLimiterTester."""
+        super().__init__("RateLimiter")
+
+    async def test_pacing(self) -> bool:
+        """Test that a burst goes straight through and later calls are spaced at the rate."""
+        try:
+            limiter = RateLimiter(rate=50, burst=5)
+            started = time.monotonic()
+            await asyncio.gather(*(limiter.acquire() for _ in range(15)))
+            elapsed = time.monotonic() - started
+
+            # 5 free calls, then 10 more at 50/s
+            if not 0.18 <= elapsed <= 0.35:
+                cprint(f"  ❌ 15 calls took {elapsed:.2f}s, expected about 0.2s", "red")
+                return False
+            if limiter.calls != 15:
+                cprint(f"  ❌ Counted {limiter.calls} calls", "red")
+                return False
+
+            if get_rate_limiter("test-budget", 10) is not get_rate_limiter("test-budget", 99):
+                cprint("  ❌ Named limiters are not shared", "red")
+                return False
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_pacing: {str(e)}", "red")
+            self.logger.exception("Exception in test_pacing")
+            return False
+
+    async def test_shared_across_threads(self) -> bool:
+        """Test that threads with their own event loops draw from one budget."""
+        try:
+            limiter = RateLimiter(rate=100, burst=1)
+            stamps = []
+            stamps_lock = threading.Lock()
+
+            def worker():
+                async def run():
+                    for _ in range(5):
+                        await limiter.acquire()
+                        with stamps_lock:
+                            stamps.append(time.monotonic())
+                asyncio.run(run())
+
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            started = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            # 20 calls at 100/s can't finish in under 0.19s however they are spread
+            elapsed = max(stamps) - started
+            if elapsed < 0.18:
+                cprint(f"  ❌ 20 calls across threads finished in {elapsed:.2f}s; budget not shared", "red")
+                return False
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_shared_across_threads: {str(e)}", "red")
+            self.logger.exception("Exception in test_shared_across_threads")
+            return False
+
+
+async def run_rate_limiter_tests(options: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Run all rate limiter tests.
+
+    Args:
+        options: Test runner options (unused)
+
+    Returns:
+        0 if all tests passed, 1 otherwise
+    """
+    tester = RateLimiterTester()
+    tests = [
+        ("Pacing", tester.test_pacing),
+        ("Shared Across Threads", tester.test_shared_across_threads)
+    ]
+    try:
+        results: Dict[str, Dict] = await tester.run_tests(tests)
+        return 0 if all(result["status"] == "passed" for result in results.values()) else 1
+    finally:
+        tester.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_rate_limiter_tests())
@@ -0,0 +1,96 @@
+"""
+Test the request batcher.
+
+Tests batch sizing, the partial-batch window, duplicate keys and error propagation.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from ...core.request_batcher import RequestBatcher
+from ...tests.base_tester import BaseTester, cprint
+
+
+class RequestBatcherTester(BaseTester):
+    """Test grouping of single-key lookups into batch calls."""
+
+    def __init__(self):
+        """Initialize the RequestBatcherTester."""
+        super().__init__("RequestBatcher")
+
+    async def test_batching(self) -> bool:
+        """Test that lookups are grouped into full batches plus one windowed remainder."""
+        try:
+            batches = []
+
+            async def fetch(keys):
+                batches.append(list(keys))
+                await asyncio.sleep(0.01)
+                return {key: key * 2 for key in keys}
+
+            batcher = RequestBatcher(fetch, max_batch=4, window=0.02)
+            # 9 distinct keys; the repeated 1 rides along with the first batch
+            keys = [0, 1, 1] + list(range(2, 9))
+            results = await asyncio.gather(*(batcher.submit(key) for key in keys))
+
+            if results != [key * 2 for key in keys]:
+                cprint(f"  ❌ Wrong results: {results}", "red")
+                return False
+            if [len(batch) for batch in batches] != [4, 4, 1]:
+                cprint(f"  ❌ Expected batches of 4, 4 and 1, got {batches}", "red")
+                return False
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_batching: {str(e)}", "red")
+            self.logger.exception("Exception in test_batching")
+            return False
+
+    async def test_errors(self) -> bool:
+        """Test that a failed batch fails every caller and missing keys raise KeyError."""
+        try:
+            async def fetch(keys):
+                if "boom" in keys:
+                    raise RuntimeError("batch failed")
+                return {key: True for key in keys if key != "missing"}
+
+            batcher = RequestBatcher(fetch, max_batch=2, window=0.01)
+            results = await asyncio.gather(batcher.submit("boom"), batcher.submit("a"),
+                                           batcher.submit("missing"), return_exceptions=True)
+
+            if not all(isinstance(result, RuntimeError) for result in results[:2]):
+                cprint(f"  ❌ Batch error was not raised to every caller: {results}", "red")
+                return False
+            if not isinstance(results[2], KeyError):
+                cprint(f"  ❌ Missing key returned {results[2]!r}", "red")
+                return False
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_errors: {str(e)}", "red")
+            self.logger.exception("Exception in test_errors")
+            return False
+
+
+async def run_request_batcher_tests(options: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Run all request batcher tests.
+
+    Args:
+        options: Test runner options (unused)
+
+    Returns:
+        0 if all tests passed, 1 otherwise
+    """
+    tester = RequestBatcherTester()
+    tests = [
+        ("Batching", tester.test_batching),
+        ("Errors", tester.test_errors)
+    ]
+    try:
+        results: Dict[str, Dict] = await tester.run_tests(tests)
+        return 0 if all(result["status"] == "passed" for result in results.values()) else 1
+    finally:
+        tester.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_request_batcher_tests())
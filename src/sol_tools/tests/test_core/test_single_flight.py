@@ -0,0 +1,186 @@
+"""
+Test in-flight request coalescing.
+
+Tests that concurrent threads and coroutines asking for the same key share one call.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from ...core.single_flight import SingleFlight
+from ...tests.base_tester import BaseTester, cprint
+
+
+class SingleFlightTester(BaseTester):
+    """Test the single-flight group."""
+
+    def __init__(self):
+        """Initialize the SingleFlightTester."""
+        super().__init__("SingleFlight")
+
+    async def test_thread_coalescing(self) -> bool:
+        """Test that threads asking for the same key share one call and get independent copies."""
+        try:
+            group = SingleFlight()
+            calls = []
+
+            def fetch(key):
+                calls.append(key)
+                time.sleep(0.2)
+                return {"key": key, "tags": ["a"]}
+
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                futures = [executor.submit(group.do, "token", key, fetch, key) for key in ["x"] * 6 + ["y"] * 2]
+                results = [future.result() for future in futures]
+
+            if sorted(calls) != ["x", "y"]:
+                cprint(f"  ❌ Expected one call per key, got {calls}", "red")
+                return False
+            results[0]["tags"].append("b")
+            if results[1]["tags"] != ["a"]:
+                cprint("  ❌ Callers share a mutable result", "red")
+                return False
+            if group.coalesced != 6 or group.in_flight() != 0:
+                cprint(f"  ❌ Unexpected stats: coalesced={group.coalesced} in_flight={group.in_flight()}", "red")
+                return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_thread_coalescing: {str(e)}", "red")
+            self.logger.exception("Exception in test_thread_coalescing")
+            return False
+
+    async def test_async_coalescing(self) -> bool:
+        """Test that coroutines join each other's flights and flights started by threads."""
+        try:
+            group = SingleFlight()
+            calls = []
+
+            async def fetch_async(key):
+                calls.append(key)
+                await asyncio.sleep(0.1)
+                return key.upper()
+
+            results = await asyncio.gather(*(group.do_async("token", "a", fetch_async, "a") for _ in range(5)))
+            if results != ["A"] * 5 or calls != ["a"]:
+                cprint(f"  ❌ Coroutines were not coalesced: {results} {calls}", "red")
+                return False
+
+            # A coroutine joining a call that a worker thread is making
+            started = threading.Event()
+
+            def fetch_sync(key):
+                calls.append(key)
+                started.set()
+                time.sleep(0.2)
+                return key.upper()
+
+            leader = threading.Thread(target=group.do, args=("token", "b", fetch_sync, "b"))
+            leader.start()
+            started.wait()
+            result = await group.do_async("token", "b", fetch_async, "b")
+            leader.join()
+
+            if result != "B" or calls != ["a", "b"]:
+                cprint(f"  ❌ Coroutine did not join the thread's call: {result} {calls}", "red")
+                return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_async_coalescing: {str(e)}", "red")
+            self.logger.exception("Exception in test_async_coalescing")
+            return False
+
+    async def test_errors_propagate(self) -> bool:
+        """Test that a failed call reaches every waiter and is not remembered."""
+        try:
+            group = SingleFlight()
+
+            async def failing():
+                await asyncio.sleep(0.05)
+                raise ValueError("boom")
+
+            results = await asyncio.gather(*(group.do_async("token", "a", failing) for _ in range(3)),
+                                           return_exceptions=True)
+            if not all(isinstance(result, ValueError) for result in results):
+                cprint(f"  ❌ Error was not shared: {results}", "red")
+                return False
+
+            async def succeeding():
+                return "ok"
+
+            if await group.do_async("token", "a", succeeding) != "ok":
+                cprint("  ❌ Failed call was remembered", "red")
+                return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_errors_propagate: {str(e)}", "red")
+            self.logger.exception("Exception in test_errors_propagate")
+            return False
+
+
+    async def test_cancelled_waiter(self) -> bool:
+        """Test that a waiter timing out leaves the leader and other waiters unaffected."""
+        try:
+            group = SingleFlight()
+            calls = []
+
+            async def fetch_async(key):
+                calls.append(key)
+                await asyncio.sleep(0.2)
+                return key.upper()
+
+            leader = asyncio.create_task(group.do_async("token", "a", fetch_async, "a"))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(group.do_async("token", "a", fetch_async, "a"))
+            impatient = asyncio.wait_for(group.do_async("token", "a", fetch_async, "a"), 0.05)
+
+            try:
+                await impatient
+                cprint("  ❌ Impatient waiter did not time out", "red")
+                return False
+            except asyncio.TimeoutError:
+                pass
+
+            results = await asyncio.gather(leader, waiter, return_exceptions=True)
+            if results != ["A", "A"] or calls != ["a"]:
+                cprint(f"  ❌ Cancelling one waiter broke the flight: {results} {calls}", "red")
+                return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_cancelled_waiter: {str(e)}", "red")
+            self.logger.exception("Exception in test_cancelled_waiter")
+            return False
+
+
+async def run_single_flight_tests(options: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Run all single-flight tests.
+
+    Args:
+        options: Test runner options (unused)
+
+    Returns:
+        0 if all tests passed, 1 otherwise
+    """
+    tester = SingleFlightTester()
+    tests = [
+        ("Thread Coalescing", tester.test_thread_coalescing),
+        ("Async Coalescing", tester.test_async_coalescing),
+        ("Errors Propagate", tester.test_errors_propagate),
+        ("Cancelled Waiter", tester.test_cancelled_waiter)
+    ]
+    try:
+        results: Dict[str, Dict] = await tester.run_tests(tests)
+        return 0 if all(result["status"] == "passed" for result in results.values()) else 1
+    finally:
+        tester.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_single_flight_tests())
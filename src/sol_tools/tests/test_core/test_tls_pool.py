@@ -0,0 +1,133 @@
+"""
+Test the warm TLS session pool.
+
+Tests connection reuse, retirement after failures or use limits, and fingerprint rotation.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from ...core.tls_pool import TlsSessionPool, user_agent_for
+from ...tests.base_tester import BaseTester, cprint
+
+
+class TlsPoolTester(BaseTester):
+    """Test the pooled tls_client sessions."""
+
+    def __init__(self):
+        """Initialize the TlsPoolTester."""
+        super().__init__("TlsPool")
+
+    async def _start_server(self, handler):
+        app = web.Application()
+        app.router.add_get("/{path}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+    async def test_connection_reuse(self) -> bool:
+        """Test that consecutive requests share a warm session and its connection."""
+        peers = []
+
+        async def handler(request):
+            peers.append(request.transport.get_extra_info("peername"))
+            return web.json_response({"ok": True})
+
+        runner, port = await self._start_server(handler)
+        try:
+            pool = TlsSessionPool()
+            loop = asyncio.get_running_loop()
+            for _ in range(5):
+                response = await loop.run_in_executor(None, lambda: pool.get(f"http://127.0.0.1:{port}/ok"))
+                if response.status_code != 200:
+                    cprint(f"  ❌ Unexpected status {response.status_code}", "red")
+                    return False
+
+            if pool.created != 1 or pool.reused != 4:
+                cprint(f"  ❌ Expected one warm session, created={pool.created} reused={pool.reused}", "red")
+                return False
+            if len(set(peers)) != 1:
+                cprint(f"  ❌ Requests opened {len(set(peers))} connections", "red")
+                return False
+
+            pool.close()
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_connection_reuse: {str(e)}", "red")
+            self.logger.exception("Exception in test_connection_reuse")
+            return False
+        finally:
+            await runner.cleanup()
+
+    async def test_recycling(self) -> bool:
+        """Test that failed and used-up sessions are replaced with a new fingerprint."""
+        async def handler(request):
+            status = 503 if request.match_info["path"] == "fail" else 200
+            return web.json_response({}, status=status)
+
+        runner, port = await self._start_server(handler)
+        try:
+            pool = TlsSessionPool(identifiers=["chrome_110", "firefox_104"], max_uses=2)
+            loop = asyncio.get_running_loop()
+
+            def run():
+                first = pool.checkout()
+                pool.checkin(first)
+                pool.get(f"http://127.0.0.1:{port}/fail")
+                second = pool.checkout()
+                pool.checkin(second)
+                return first, second
+
+            first, second = await loop.run_in_executor(None, run)
+            if first is second or first.identifier == second.identifier:
+                cprint("  ❌ Failed session was not replaced with a new fingerprint", "red")
+                return False
+
+            # second has served one request; the next one uses it up
+            await loop.run_in_executor(None, lambda: pool.get(f"http://127.0.0.1:{port}/ok"))
+            if pool.retired != 2 or pool.idle_count() != 0:
+                cprint(f"  ❌ Expected two retired sessions, got {pool.retired}", "red")
+                return False
+
+            if "Firefox/104.0" not in user_agent_for("firefox_104"):
+                cprint("  ❌ User agent does not match the fingerprint", "red")
+                return False
+
+            pool.close()
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_recycling: {str(e)}", "red")
+            self.logger.exception("Exception in test_recycling")
+            return False
+        finally:
+            await runner.cleanup()
+
+
+async def run_tls_pool_tests(options: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Run all TLS pool tests.
+
+    Args:
+        options: Test runner options (unused)
+
+    Returns:
+        0 if all tests passed, 1 otherwise
+    """
+    tester = TlsPoolTester()
+    tests = [
+        ("Connection Reuse", tester.test_connection_reuse),
+        ("Recycling", tester.test_recycling)
+    ]
+    try:
+        results: Dict[str, Dict] = await tester.run_tests(tests)
+        return 0 if all(result["status"] == "passed" for result in results.values()) else 1
+    finally:
+        tester.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_tls_pool_tests())
@@ -0,0 +1,130 @@
+"""
+Test the token metadata cache.
+
+Tests the static/market TTL split, LRU eviction and persistence across restarts.
+"""
+
+import asyncio
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from ...core.token_cache import TokenMetadataCache
+from ...tests.base_tester import BaseTester, cprint
+
+TOKEN = {"name": "Test Token", "symbol": "TEST", "decimals": 9, "priceUsd": 1.5, "marketCap": 1000}
+
+
+class TokenCacheTester(BaseTester):
+    """Test the token metadata cache."""
+
+    def __init__(self):
+        """Initialize the TokenCacheTester."""
+        super().__init__("TokenCache")
+
+    async def test_ttl_split(self) -> bool:
+        """Test that static fields outlive market fields."""
+        try:
+            cache = TokenMetadataCache("test", static_ttl=3600, market_ttl=60, persist=False)
+            cache.put("solana", "A" * 44, TOKEN, fetched_at=time.time() - 120)
+
+            if cache.get("solana", "A" * 44) is not None:
+                cprint("  ❌ Stale market data was served", "red")
+                return False
+            static = cache.get("solana", "A" * 44, include_market=False)
+            if static != {"name": "Test Token", "symbol": "TEST", "decimals": 9}:
+                cprint(f"  ❌ Unexpected static view: {static}", "red")
+                return False
+
+            cache.put("ethereum", "0xABC", TOKEN)
+            if cache.get("ethereum", "0xabc") != TOKEN:
+                cprint("  ❌ EVM lookups should ignore address case", "red")
+                return False
+
+            cache.put("ethereum", "0xdef", {"error": "Token not found", "code": 404})
+            if cache.get("ethereum", "0xdef") is not None:
+                cprint("  ❌ Error responses should not be cached", "red")
+                return False
+
+            stats = cache.stats()
+            if (stats["hits"], stats["misses"]) != (2, 2):
+                cprint(f"  ❌ Unexpected hit/miss counters: {stats}", "red")
+                return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_ttl_split: {str(e)}", "red")
+            self.logger.exception("Exception in test_ttl_split")
+            return False
+
+    async def test_lru_eviction(self) -> bool:
+        """Test that the least recently used tokens are evicted first."""
+        try:
+            cache = TokenMetadataCache("test", max_entries=2, persist=False)
+            cache.put("solana", "a", TOKEN)
+            cache.put("solana", "b", TOKEN)
+            cache.get("solana", "a")
+            cache.put("solana", "c", TOKEN)
+
+            if cache.get("solana", "b") is not None or cache.get("solana", "a") is None:
+                cprint("  ❌ Evicted the wrong entry", "red")
+                return False
+            if cache.stats()["evictions"] != 1:
+                cprint(f"  ❌ Unexpected eviction count: {cache.stats()}", "red")
+                return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_lru_eviction: {str(e)}", "red")
+            self.logger.exception("Exception in test_lru_eviction")
+            return False
+
+    async def test_persistence(self) -> bool:
+        """Test that entries survive a restart and expired ones are dropped on load."""
+        try:
+            with tempfile.TemporaryDirectory() as root:
+                cache = TokenMetadataCache("test", root=root, static_ttl=3600)
+                cache.put("solana", "fresh", TOKEN)
+                cache.put("solana", "expired", TOKEN, fetched_at=time.time() - 7200)
+                cache.flush()
+
+                reloaded = TokenMetadataCache("test", root=root, static_ttl=3600)
+                if reloaded.get("solana", "fresh") != TOKEN:
+                    cprint("  ❌ Entry did not survive a restart", "red")
+                    return False
+                if len(reloaded) != 1:
+                    cprint("  ❌ Expired entry was loaded", "red")
+                    return False
+
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Exception in test_persistence: {str(e)}", "red")
+            self.logger.exception("Exception in test_persistence")
+            return False
+
+
+async def run_token_cache_tests(options: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Run all token cache tests.
+
+    Args:
+        options: Test runner options (unused)
+
+    Returns:
+        0 if all tests passed, 1 otherwise
+    """
+    tester = TokenCacheTester()
+    tests = [
+        ("TTL Split", tester.test_ttl_split),
+        ("LRU Eviction", tester.test_lru_eviction),
+        ("Persistence", tester.test_persistence)
+    ]
+    try:
+        results: Dict[str, Dict] = await tester.run_tests(tests)
+        return 0 if all(result["status"] == "passed" for result in results.values()) else 1
+    finally:
+        tester.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_token_cache_tests())
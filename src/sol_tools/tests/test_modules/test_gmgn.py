@@ -122,7 +122,15 @@ def get_test_names() -> List[str]:
         "Standalone Market Cap Implementation",
         "Multi-Token Market Cap Data",
         "Token Data Fetching",
-        "Multi-Token Data Retrieval"
+        "Multi-Token Data Retrieval",
+        "Candle Store Coverage",
+        "Adaptive Batch Windows",
+        "Multi-Token Fetch Scheduler",
+        "Vectorized Candle Normalization",
+        "OHLCV Resampling",
+        "Streaming Candle Export",
+        "Concurrent Token Data Fetch",
+        "Batched Token Data Lookups"
     ]
 
 class GmgnTester(BaseTester):
@@ -218,12 +226,24 @@ class GmgnTester(BaseTester):
             self.gmgn_adapter = adapter_class
             self.standalone_mcap = standalone_mcap
             self.module_imported = True
+            
+            # Keep candles fetched by the live tests out of the real cache
+            from sol_tools.modules.gmgn.candle_store import CandleStore
+            candle_store = CandleStore(self.test_root / "candles")
+            self._original_get_candle_store = standalone_mcap.get_candle_store
+            standalone_mcap.get_candle_store = lambda: candle_store
             return True
         except (ImportError, AttributeError) as e:
             self.logger.warning(f"Failed to import GMGN module: {e}")
             self.module_imported = False
             return False
     
+    def cleanup(self) -> None:
+        """Restore the real candle store and remove the test directory."""
+        if self.standalone_mcap is not None and hasattr(self, "_original_get_candle_store"):
+            self.standalone_mcap.get_candle_store = self._original_get_candle_store
+        super().cleanup()
+    
     async def test_module_imports(self) -> bool:
         """
         Test that the GMGN module can be imported.
@@ -574,6 +594,460 @@ class GmgnTester(BaseTester):
             self.logger.exception("Error in test_multi_token_data")
             return False
     
+    async def test_candle_store_coverage(self) -> bool:
+        """
+        Test that the candle store merges batches and only reports uncovered gaps.
+        """
+        cprint("  Testing candle store coverage tracking...", "blue")
+        
+        try:
+            import numpy as np
+            from sol_tools.modules.gmgn.candle_store import CandleStore, columns_from_candles
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                store = CandleStore(Path(tmp_dir))
+                token = self.token_addresses[0]
+                
+                candles = [{"timestamp": ts, "open": 1.0, "high": 2.0, "low": 0.5,
+                            "close": 1.5, "volume": 10.0, "market_cap": 1000.0}
+                           for ts in range(1000, 1100)]
+                store.merge(token, columns_from_candles(candles), [(1000, 1100)])
+                store.merge(token, columns_from_candles(candles[50:]), [(1200, 1300)])
+                
+                missing = store.missing_ranges(token, 900, 1400)
+                if missing != [(900, 1000), (1100, 1200), (1300, 1400)]:
+                    cprint(f"  ❌ Unexpected missing ranges: {missing}", "red")
+                    return False
+                
+                loaded = store.load(token, 1050, 1060)
+                if loaded["timestamp"].tolist() != list(range(1050, 1060)):
+                    cprint("  ❌ Stored candles were not merged in timestamp order", "red")
+                    return False
+                
+                # Compacted tokens must read back identically
+                store.compact(token)
+                if not np.array_equal(store.load(token)["timestamp"], np.arange(1000, 1100)):
+                    cprint("  ❌ Compacted candles did not round-trip", "red")
+                    return False
+            
+            cprint("  ✓ Candle store tracks coverage and merges candles", "green")
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Error testing candle store: {str(e)}", "red")
+            self.logger.exception("Error in test_candle_store_coverage")
+            return False
+    
+    async def test_adaptive_batch_windows(self) -> bool:
+        """
+        Test that the window planner grows windows for quiet tokens and
+        re-requests the part of a window that a truncated response left out.
+        """
+        cprint("  Testing adaptive batch window planning...", "blue")
+        
+        try:
+            from sol_tools.modules.gmgn.window_planner import WindowPlanner
+            from sol_tools.modules.gmgn.mcap_scheduler import McapFetchScheduler
+            
+            base = 1700000000
+            week = 7 * 24 * 3600
+            
+            def fake_fetch(every: int, cap: int):
+                async def fetch(session, token, start: int, end: int):
+                    first = start + (-start) % every
+                    return [{"time": ts * 1000} for ts in range(first, end, every)][:cap]
+                return fetch
+            
+            async def run_planner(planner: WindowPlanner, fetch):
+                scheduler = McapFetchScheduler(fetch)
+                scheduler.add_token("token", planner)
+                job = (await scheduler.run(session=object()))["token"]
+                return job.candles
+            
+            # A quiet token (one candle every 10 minutes) should need only a handful of requests
+            quiet = WindowPlanner([(base, base + week)])
+            candles = await run_planner(quiet, fake_fetch(600, 3000))
+            if quiet.requests > 10 or len(candles) != week // 600:
+                cprint(f"  ❌ Quiet token took {quiet.requests} requests for {len(candles)} candles", "red")
+                return False
+            
+            # A busy token behind a 1000-candle cap must still come back complete
+            busy = WindowPlanner([(base, base + 6 * 3600)], max_candles=1000)
+            candles = await run_planner(busy, fake_fetch(1, 1000))
+            timestamps = {candle["time"] for candle in candles}
+            if len(timestamps) != 6 * 3600 or busy.truncated == 0:
+                cprint(f"  ❌ Busy token returned {len(timestamps)} unique candles", "red")
+                return False
+            
+            # A failed window must not be mistaken for an empty one
+            failing = WindowPlanner([(base, base + week)])
+            window = failing.next_window()
+            before = failing.window
+            failing.record(window, None, 1.0)
+            if failing.window != before:
+                cprint(f"  ❌ Failed window resized the planner from {before} to {failing.window}", "red")
+                return False
+            
+            cprint(f"  ✓ Planner used {quiet.requests} requests for the quiet token and "
+                   f"recovered {busy.truncated} truncated windows", "green")
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Error testing window planner: {str(e)}", "red")
+            self.logger.exception("Error in test_adaptive_batch_windows")
+            return False
+    
+    async def test_mcap_fetch_scheduler(self) -> bool:
+        """
+        Test that the scheduler interleaves tokens fairly under the global limit.
+        """
+        cprint("  Testing multi-token fetch scheduler...", "blue")
+        
+        try:
+            from sol_tools.modules.gmgn.window_planner import WindowPlanner
+            from sol_tools.modules.gmgn.mcap_scheduler import McapFetchScheduler
+            
+            in_flight = 0
+            peak_in_flight = 0
+            order = []
+            finished = []
+            
+            async def fetch(session, token, start, end):
+                nonlocal in_flight, peak_in_flight
+                in_flight += 1
+                peak_in_flight = max(peak_in_flight, in_flight)
+                order.append(token)
+                await asyncio.sleep(0.001)
+                in_flight -= 1
+                return []
+            
+            scheduler = McapFetchScheduler(fetch, max_concurrency=3, max_in_flight_per_token=2,
+                                           on_token_done=lambda job: finished.append(job.token_address))
+            # One long history and two short ones; windows are pinned to 60s so nothing grows
+            for token, length in (("long", 3600), ("short-a", 120), ("short-b", 120)):
+                scheduler.add_token(token, WindowPlanner([(0, length)], initial_window=60,
+                                                         min_window=60, max_window=60))
+            await scheduler.run(session=object())
+            
+            if peak_in_flight > 3:
+                cprint(f"  ❌ {peak_in_flight} requests were in flight at once", "red")
+                return False
+            if set(order[:3]) != {"long", "short-a", "short-b"}:
+                cprint(f"  ❌ Tokens were not interleaved: {order[:6]}", "red")
+                return False
+            if sorted(finished) != ["long", "short-a", "short-b"] or finished[-1] != "long":
+                cprint(f"  ❌ Unexpected completion order: {finished}", "red")
+                return False
+            
+            # A cancelled run must not leave its fetches running
+            slow_calls = []
+            
+            async def slow_fetch(session, token, start, end):
+                await asyncio.sleep(0.05)
+                slow_calls.append(start)
+                return []
+            
+            cancelled = McapFetchScheduler(slow_fetch, max_concurrency=4)
+            cancelled.add_token("token", WindowPlanner([(0, 3600)], initial_window=60,
+                                                       min_window=60, max_window=60))
+            try:
+                await asyncio.wait_for(cancelled.run(session=object()), 0.13)
+            except asyncio.TimeoutError:
+                pass
+            calls_at_timeout = len(slow_calls)
+            await asyncio.sleep(0.2)
+            if len(slow_calls) != calls_at_timeout:
+                cprint(f"  ❌ {len(slow_calls) - calls_at_timeout} fetches ran after the run was cancelled", "red")
+                return False
+            
+            cprint(f"  ✓ Scheduler interleaved {len(order)} requests across 3 tokens", "green")
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Error testing fetch scheduler: {str(e)}", "red")
+            self.logger.exception("Error in test_mcap_fetch_scheduler")
+            return False
+    
+    async def test_candle_normalization(self) -> bool:
+        """
+        Test that the vectorized normalizer handles both raw candle shapes.
+        """
+        cprint("  Testing vectorized candle normalization...", "blue")
+        
+        try:
+            from sol_tools.modules.gmgn.candle_normalizer import normalize_candles
+            
+            now = 1750000000
+            raw = [
+                {"time": (now - 2) * 1000, "open": "1.5", "high": 2, "low": None, "close": 1.8,
+                 "volume": "bad", "market_cap": 5000},
+                [now - 1, 1.0, 2.0, 0.5, 1.5, 10.0],          # No market cap column
+                [now, "oops", 2.0, 0.5, 1.5, 10.0, 7000.0],   # Unparseable, dropped
+                {"timestamp": "-5", "open": 1},                 # Out of range, clamped to now
+            ]
+            candles = normalize_candles(raw, now=now)
+            
+            if candles["timestamp"].tolist() != [now - 2, now - 1, now]:
+                cprint(f"  ❌ Unexpected timestamps: {candles['timestamp'].tolist()}", "red")
+                return False
+            
+            first, second, third = candles.to_dicts()
+            if (first["open"], first["low"], first["volume"]) != (1.5, 0.0, 0.0):
+                cprint(f"  ❌ Numeric fields were not coerced: {first}", "red")
+                return False
+            if second["market_cap"] != 1.5 * 1000000 or third["open"] != 1.0:
+                cprint(f"  ❌ Unexpected normalized values: {second}, {third}", "red")
+                return False
+            if first["date"] != datetime.fromtimestamp(now - 2).strftime('%Y-%m-%d %H:%M:%S'):
+                cprint(f"  ❌ Date rendered incorrectly: {first['date']}", "red")
+                return False
+            
+            cprint("  ✓ Normalized dict and array candles", "green")
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Error testing candle normalization: {str(e)}", "red")
+            self.logger.exception("Error in test_candle_normalization")
+            return False
+    
+    async def test_ohlcv_resampling(self) -> bool:
+        """
+        Test OHLCV aggregation and that streaming resampling matches a single pass.
+        """
+        cprint("  Testing OHLCV resampling...", "blue")
+        
+        try:
+            import numpy as np
+            from sol_tools.modules.gmgn.candle_normalizer import CandleArrays
+            from sol_tools.modules.gmgn.candle_resample import resample_candles, resample_stream
+            
+            base = 1700000040  # Four minutes past a 5 minute boundary
+            timestamps = np.arange(base, base + 600, dtype=np.int64)
+            prices = np.arange(len(timestamps), dtype=np.float64)
+            candles = CandleArrays({
+                "timestamp": timestamps,
+                "open": prices, "high": prices + 1, "low": prices - 1, "close": prices + 0.5,
+                "volume": np.ones(len(timestamps)), "market_cap": prices * 100,
+            })
+            
+            resampled = resample_candles(candles, "5m")
+            if resampled["timestamp"].tolist() != [1699999800, 1700000100, 1700000400]:
+                cprint(f"  ❌ Unexpected buckets: {resampled['timestamp'].tolist()}", "red")
+                return False
+            
+            # The first bucket only holds the 60 candles from base to the 5 minute boundary
+            first = resampled.to_dicts()[0]
+            expected = {"open": 0.0, "high": 60.0, "low": -1.0, "close": 59.5, "volume": 60.0, "market_cap": 5900.0}
+            if any(first[name] != value for name, value in expected.items()):
+                cprint(f"  ❌ Unexpected aggregation: {first}", "red")
+                return False
+            
+            streamed = CandleArrays.concat(list(resample_stream(candles.iter_chunks(97), "5m")))
+            if any(not np.array_equal(streamed[name], resampled[name]) for name in resampled.columns):
+                cprint("  ❌ Streaming resampling differs from a single pass", "red")
+                return False
+            
+            cprint("  ✓ Resampled 1s candles into 5m buckets", "green")
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Error testing resampling: {str(e)}", "red")
+            self.logger.exception("Error in test_ohlcv_resampling")
+            return False
+    
+    async def test_streaming_candle_export(self) -> bool:
+        """
+        Test that every export format can be read back one token at a time via its index.
+        """
+        cprint("  Testing streaming candle export...", "blue")
+        
+        try:
+            import tempfile
+            import numpy as np
+            from pathlib import Path
+            from sol_tools.modules.gmgn.candle_normalizer import CandleArrays
+            from sol_tools.modules.gmgn.mcap_export import open_export_writer, read_export_token
+            
+            def make_candles(base, count):
+                prices = np.linspace(1.0, 2.0, count)
+                return CandleArrays({
+                    "timestamp": np.arange(base, base + count, dtype=np.int64),
+                    "open": prices, "high": prices * 1.5, "low": prices * 0.5, "close": prices,
+                    "volume": np.full(count, 3.25), "market_cap": prices * 1e6,
+                })
+            
+            tokens = {"TokenAAA111": make_candles(1700000000, 120), "TokenBBB222": make_candles(1700100000, 75)}
+            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                for file_format in ("json", "ndjson", "csv", "columnar"):
+                    writer = open_export_writer(file_format, Path(tmp_dir) / f"export-{file_format}")
+                    for token, candles in tokens.items():
+                        writer.write_token(token, candles)
+                    path = writer.close()
+                    
+                    if file_format == "json":
+                        import json
+                        with open(path) as f:
+                            if len(json.load(f)["TokenBBB222"]) != 75:
+                                cprint("  ❌ JSON export is not a valid document", "red")
+                                return False
+                    
+                    # Read the second token straight from its byte range
+                    restored = read_export_token(path, "TokenBBB222")
+                    expected = tokens["TokenBBB222"]
+                    if any(not np.allclose(restored[name], expected[name]) for name in expected.columns):
+                        cprint(f"  ❌ {file_format} export did not round-trip", "red")
+                        return False
+            
+            cprint("  ✓ Exported and re-read tokens in json, ndjson, csv and columnar formats", "green")
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Error testing candle export: {str(e)}", "red")
+            self.logger.exception("Error in test_streaming_candle_export")
+            return False
+    
+    async def test_concurrent_token_data_fetch(self) -> bool:
+        """
+        Test that token data requests overlap instead of blocking the event loop.
+        """
+        cprint("  Testing concurrent token data fetches...", "blue")
+        
+        try:
+            from aiohttp import web
+            from sol_tools.modules.gmgn import standalone_token_data
+            
+            in_flight = 0
+            peak = 0
+            
+            async def handler(request):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.1)
+                in_flight -= 1
+                address = request.match_info["address"]
+                return web.json_response({"data": {"id": f"solana_{address}", "attributes": {"name": "Test", "price_usd": "1.5"}}})
+            
+            app = web.Application()
+            app.router.add_get("/networks/{network}/tokens/{address}", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            
+            original_url = standalone_token_data.Config.GECKO_TERMINAL_URL
+            try:
+                port = site._server.sockets[0].getsockname()[1]
+                standalone_token_data.Config.GECKO_TERMINAL_URL = f"http://127.0.0.1:{port}/networks"
+                tokens = [f"{i:044d}" for i in range(16)]
+                client = standalone_token_data.ApiClient(max_concurrency=4)
+                try:
+                    responses = await asyncio.gather(*(client.fetch_token_data(token) for token in tokens))
+                finally:
+                    client.close()
+                results = dict(zip(tokens, responses))
+            finally:
+                standalone_token_data.Config.GECKO_TERMINAL_URL = original_url
+                await runner.cleanup()
+            
+            if any("error" in data for data in results.values()) or len(results) != len(tokens):
+                cprint("  ❌ Some token requests failed", "red")
+                return False
+            if not 1 < peak <= 4:
+                cprint(f"  ❌ Expected between 2 and 4 overlapping requests, saw {peak}", "red")
+                return False
+            
+            cprint(f"  ✓ Fetched {len(tokens)} tokens with up to {peak} requests in flight", "green")
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Error testing concurrent token data fetch: {str(e)}", "red")
+            self.logger.exception("Error in test_concurrent_token_data_fetch")
+            return False
+    
+    async def test_batched_token_data_lookups(self) -> bool:
+        """
+        Test that token lookups are grouped per network, chunked and fanned back out.
+        """
+        cprint("  Testing batched token data lookups...", "blue")
+        
+        try:
+            import time
+            from aiohttp import web
+            from sol_tools.core.token_cache import TokenMetadataCache
+            from sol_tools.modules.gmgn import standalone_token_data
+            
+            requests_seen = []
+            missing = "1" * 44
+            
+            async def handler(request):
+                network = request.match_info["network"]
+                addresses = request.match_info["addresses"].split(",")
+                requests_seen.append((network, len(addresses)))
+                data = [{"id": f"{network}_{address.lower()}",
+                         "attributes": {"address": address.lower(), "name": f"Token {address[-4:]}", "price_usd": "2.5"}}
+                        for address in addresses if address != missing]
+                return web.json_response({"data": data})
+            
+            app = web.Application()
+            app.router.add_get("/networks/{network}/tokens/multi/{addresses}", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            
+            solana_tokens = [f"{i:044d}" for i in range(64)] + [missing]
+            eth_tokens = [f"0x{i:040X}" for i in range(5)]
+            tokens = solana_tokens + eth_tokens
+            
+            original_url = standalone_token_data.Config.GECKO_TERMINAL_URL
+            original_cache = standalone_token_data.get_token_cache
+            try:
+                port = site._server.sockets[0].getsockname()[1]
+                standalone_token_data.Config.GECKO_TERMINAL_URL = f"http://127.0.0.1:{port}/networks"
+                results = await standalone_token_data.fetch_multiple_tokens_async(tokens, use_cache=False)
+                batch_requests = list(requests_seen)
+                
+                # Tokens fetched an hour ago: market fields are stale, static ones are not
+                cache = TokenMetadataCache("test", persist=False)
+                standalone_token_data.get_token_cache = lambda name: cache
+                for token in eth_tokens:
+                    cache.put("ethereum", token, results[token], fetched_at=time.time() - 3600)
+                requests_seen.clear()
+                static_only = await standalone_token_data.fetch_multiple_tokens_async(eth_tokens, include_market=False)
+                static_requests = len(requests_seen)
+                await standalone_token_data.fetch_multiple_tokens_async(eth_tokens)
+                market_requests = len(requests_seen) - static_requests
+            finally:
+                standalone_token_data.Config.GECKO_TERMINAL_URL = original_url
+                standalone_token_data.get_token_cache = original_cache
+                await runner.cleanup()
+            requests_seen[:] = batch_requests
+            
+            # 65 Solana addresses need 3 batches of at most 30, the 5 Ethereum ones need 1
+            if sorted(requests_seen) != [("ethereum", 5), ("solana", 5), ("solana", 30), ("solana", 30)]:
+                cprint(f"  ❌ Unexpected batches: {sorted(requests_seen)}", "red")
+                return False
+            if list(results) != tokens:
+                cprint("  ❌ Results are not keyed by the requested addresses", "red")
+                return False
+            if results[missing].get("code") != 404:
+                cprint(f"  ❌ Missing token should be reported as not found: {results[missing]}", "red")
+                return False
+            found = [results[token] for token in tokens if token != missing]
+            if any(data.get("priceUsd") != 2.5 or "error" in data for data in found):
+                cprint("  ❌ Batched results were not normalized per address", "red")
+                return False
+            
+            if static_requests or any(static_only[token].get("name") != results[token]["name"] for token in eth_tokens):
+                cprint(f"  ❌ Static-only lookups past the market TTL made {static_requests} requests", "red")
+                return False
+            if market_requests != 1:
+                cprint(f"  ❌ Stale market fields were not refetched ({market_requests} requests)", "red")
+                return False
+            
+            cprint(f"  ✓ Looked up {len(tokens)} tokens in {len(requests_seen)} requests; "
+                   f"static fields served from cache past the market TTL", "green")
+            return True
+        except Exception as e:
+            cprint(f"  ❌ Error testing batched token data lookups: {str(e)}", "red")
+            self.logger.exception("Error in test_batched_token_data_lookups")
+            return False
+    
     async def run_all_tests(self) -> Dict[str, Dict[str, Any]]:
         """
         Run all GMGN module tests.
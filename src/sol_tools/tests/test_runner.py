@@ -89,10 +89,10 @@ MENU_STRUCTURE = {
         "GMGN Tools": ["GMGN"]
     },
     "Eth Tools": {
-        "Wallet Profiler 🐉": ["Dragon"],
-        "Top Trader Finder 🐉": ["Dragon"],
-        "TX Scanner 🐉": ["Dragon"],
-        "Time-Based TX Finder 🐉": ["Dragon"]
+        "Wallet Profiler 🐉": ["Dragon", "Ethereum"],
+        "Top Trader Finder 🐉": ["Dragon", "Ethereum"],
+        "TX Scanner 🐉": ["Dragon", "Ethereum"],
+        "Time-Based TX Finder 🐉": ["Dragon", "Ethereum"]
     }
 }
 
@@ -118,6 +118,14 @@ AVAILABLE_MODULES = {
         "description": "Tests for GMGN token data retrieval",
         "required_env_vars": []
     },
+    "Ethereum": {
+        "module_path": "src.sol_tools.tests.test_modules.test_ethereum",
+        "run_func": "run_tests",
+        "submodules": ["Streaming Trade Crawl", "Time Window Search", "Concurrent Address Search", "Wallet Pipeline", "Balance Batching", "Etherscan Key Pool", "Transfer History Crawl", "Streaming Trader Aggregation", "Incremental Trader State", "Wallet History Cache", "Block Time Index", "Wallet Enrichment Fan-out"],
+        "category": "Eth Tools",
+        "description": "Tests for Ethereum data collection against local stand-in servers",
+        "required_env_vars": []
+    },
     "Dune": {
         "module_path": "src.sol_tools.tests.test_modules.test_dune",
         "run_func": "run_dune_tests",
@@ -156,6 +164,64 @@ AVAILABLE_MODULES = {
         "category": "Settings",
         "description": "Tests for Telegram notification integration",
         "required_env_vars": ["TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID"]
+    },
+    
+    # Shared core services
+    "HTTP Client": {
+        "module_path": "src.sol_tools.tests.test_core.test_http_client",
+        "run_func": "run_http_client_tests",
+        "submodules": ["Retry Policy", "Session Borrowing", "JSON Retries"],
+        "category": "Core",
+        "description": "Tests for the shared HTTP client layer",
+        "required_env_vars": []
+    },
+    "Token Cache": {
+        "module_path": "src.sol_tools.tests.test_core.test_token_cache",
+        "run_func": "run_token_cache_tests",
+        "submodules": ["TTL Split", "LRU Eviction", "Persistence"],
+        "category": "Core",
+        "description": "Tests for the token metadata cache",
+        "required_env_vars": []
+    },
+    "Single Flight": {
+        "module_path": "src.sol_tools.tests.test_core.test_single_flight",
+        "run_func": "run_single_flight_tests",
+        "submodules": ["Thread Coalescing", "Async Coalescing", "Errors Propagate", "Cancelled Waiter"],
+        "category": "Core",
+        "description": "Tests for in-flight request coalescing",
+        "required_env_vars": []
+    },
+    "Proxy Pool": {
+        "module_path": "src.sol_tools.tests.test_core.test_proxy_pool",
+        "run_func": "run_proxy_pool_tests",
+        "submodules": ["Reload On Change", "Health Weighting", "Shared Pool"],
+        "category": "Core",
+        "description": "Tests for the shared proxy pool",
+        "required_env_vars": []
+    },
+    "TLS Pool": {
+        "module_path": "src.sol_tools.tests.test_core.test_tls_pool",
+        "run_func": "run_tls_pool_tests",
+        "submodules": ["Connection Reuse", "Recycling"],
+        "category": "Core",
+        "description": "Tests for the warm TLS session pool",
+        "required_env_vars": []
+    },
+    "Rate Limiter": {
+        "module_path": "src.sol_tools.tests.test_core.test_rate_limiter",
+        "run_func": "run_rate_limiter_tests",
+        "submodules": ["Pacing", "Shared Across Threads"],
+        "category": "Core",
+        "description": "Tests for the shared rate limiter",
+        "required_env_vars": []
+    },
+    "Request Batcher": {
+        "module_path": "src.sol_tools.tests.test_core.test_request_batcher",
+        "run_func": "run_request_batcher_tests",
+        "submodules": ["Batching", "Errors"],
+        "category": "Core",
+        "description": "Tests for the request batcher",
+        "required_env_vars": []
     }
 }
 
@@ -300,6 +366,21 @@ async def run_module_tests(module_name, module_info):
             "message": str(e)
         }
 
+def module_failed(result: Dict[str, Any]) -> bool:
+    """
+    Check whether a module's test run failed.
+    
+    Modules that return a status code report failure through their status
+    rather than a has_failures flag.
+    
+    Args:
+        result: Dictionary with test results
+        
+    Returns:
+        True if any of the module's tests failed or the module could not run
+    """
+    return result.get("has_failures", False) or result.get("status") in ("failed", "error")
+
 def get_module_status_indicator(result: Dict[str, Any]) -> str:
     """
     Get a status indicator for a module based on its test results.
@@ -310,7 +391,7 @@ def get_module_status_indicator(result: Dict[str, Any]) -> str:
     Returns:
         Status indicator string
     """
-    if result.get("has_failures", False):
+    if module_failed(result):
         return STATUS_INDICATORS["failed"]
     elif result.get("has_skips", False) or result.get("status") == "skipped":
         return STATUS_INDICATORS["skipped"]
@@ -358,7 +439,7 @@ def get_menu_item_status(menu_section: str, submenu: str, results: Dict[str, Dic
         return "", []
     
     # Check if any module has failures
-    has_failures = any(result.get("has_failures", False) for result in module_results)
+    has_failures = any(module_failed(result) for result in module_results)
     
     # Check if any module has skips but no failures
     has_skips = any(result.get("has_skips", False) or result.get("status") == "skipped" for result in module_results)
@@ -664,7 +745,7 @@ def print_results_by_category(module_results):
                 
                 # Format module status
                 status_text = "All tests passed"
-                if result.get("has_failures", False):
+                if module_failed(result):
                     status_text = "Some tests failed"
                 elif result.get("has_skips", False) or result.get("status") == "skipped":
                     status_text = "Some tests skipped"